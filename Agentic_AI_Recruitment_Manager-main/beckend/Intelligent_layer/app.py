@@ -2,7 +2,8 @@ import os
 
 # Try to import ollama, but don't fail if it's not available
 try:
-    from ollama import chat
+    from ollama import chat, AsyncClient
+    async_client = AsyncClient()
     OLLAMA_AVAILABLE = True
 except ImportError:
     OLLAMA_AVAILABLE = False
@@ -59,40 +60,72 @@ We are seeking a talented {role} to join our growing team. This is an exciting o
 **Note:** This is a template job description. For AI-generated descriptions, please install Ollama with the llama2 model.
 """
 
+def _jd_from_response(response, prompt):
+    """(JD text, True) from an Ollama chat response, or (template, False)"""
+    if response and "message" in response and "content" in response["message"]:
+        return response["message"]["content"].strip(), True
+    print("⚠️ No valid response received from the model.")
+    return generate_fallback_jd(prompt), False
+
+def _jd_from_error(error, prompt):
+    """(template or None, False) when the Ollama call failed"""
+    error_msg = str(error)
+    print(f"❌ Error while generating JD with Ollama: {error_msg}")
+    
+    # If it's a model not found error, use fallback
+    if "404" in error_msg or "not found" in error_msg.lower():
+        print("⚠️ Ollama model not found. Using fallback generation.")
+        return generate_fallback_jd(prompt), False
+    
+    return None, False
+
+def generate_jd_result(prompt):
+    """
+    Generates a Job Description using the local Ollama LLaMA2 model.
+    Returns (jd_text, from_model): from_model is False when the template
+    fallback was used (Ollama missing, model not found, empty response).
+    """
+    # Ollama not installed, use fallback
+    if not OLLAMA_AVAILABLE:
+        return generate_fallback_jd(prompt), False
+    
+    try:
+        # Send the prompt to LLaMA2 model via Ollama
+        response = chat(
+            model="llama2",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return _jd_from_response(response, prompt)
+    except Exception as e:
+        return _jd_from_error(e, prompt)
+
 def generate_jd(prompt):
     """
     Generates a Job Description using the local Ollama LLaMA2 model.
     Falls back to template generation if Ollama is not available.
     """
-    # Try Ollama first if available
-    if OLLAMA_AVAILABLE:
-        try:
-            # Send the prompt to LLaMA2 model via Ollama
-            response = chat(
-                model="llama2",
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            # Extract the text content safely
-            if response and "message" in response and "content" in response["message"]:
-                return response["message"]["content"].strip()
-            else:
-                print("⚠️ No valid response received from the model.")
-                return generate_fallback_jd(prompt)
-
-        except Exception as e:
-            error_msg = str(e)
-            print(f"❌ Error while generating JD with Ollama: {error_msg}")
-            
-            # If it's a model not found error, use fallback
-            if "404" in error_msg or "not found" in error_msg.lower():
-                print("⚠️ Ollama model not found. Using fallback generation.")
-                return generate_fallback_jd(prompt)
-            
-            return None
-    else:
-        # Ollama not installed, use fallback
-        return generate_fallback_jd(prompt)
+    return generate_jd_result(prompt)[0]
+
+async def generate_jd_result_async(prompt):
+    """
+    Async variant of generate_jd_result for the ASGI backend.
+    Awaits the Ollama request instead of holding a worker thread for it.
+    """
+    if not OLLAMA_AVAILABLE:
+        return generate_fallback_jd(prompt), False
+    
+    try:
+        response = await async_client.chat(
+            model="llama2",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return _jd_from_response(response, prompt)
+    except Exception as e:
+        return _jd_from_error(e, prompt)
+
+async def generate_jd_async(prompt):
+    """Async variant of generate_jd for the ASGI backend"""
+    return (await generate_jd_result_async(prompt))[0]
 
 
 if __name__ == "__main__":
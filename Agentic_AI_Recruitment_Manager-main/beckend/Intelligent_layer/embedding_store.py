@@ -5,21 +5,26 @@ import os
 # Initialize embedding model
 model = SentenceTransformer("all-MiniLM-L6-v2")
 
-# Initialize Chroma client (creates local vector DB)
-chroma_client = chromadb.PersistentClient(path="chroma_store")
+# Initialize Chroma client (creates local vector DB next to this script,
+# where resume_ranker.py reads it)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+chroma_client = chromadb.PersistentClient(path=os.path.join(BASE_DIR, "chroma_store"))
 
 collection = chroma_client.get_or_create_collection("jd_docs")
 
 # Loop over all text files in /data
-data_folder = "data"
+data_folder = os.path.join(BASE_DIR, "data")
 for file in os.listdir(data_folder):
     if file.endswith(".txt"):
         with open(os.path.join(data_folder, file), "r", encoding="utf-8") as f:
             content = f.read()
             embedding = model.encode(content).tolist()
-            collection.add(
+            # upsert so re-running refreshes edited JDs; the role metadata lets
+            # resume_ranker.py fetch one JD without reading the collection
+            collection.upsert(
                 documents=[content],
                 embeddings=[embedding],
+                metadatas=[{"role": os.path.splitext(file)[0], "source": file}],
                 ids=[file]
             )
         print(f"✅ Embedded and stored: {file}")
@@ -1,26 +1,43 @@
 import os
-import numpy as np
+import argparse
 from sentence_transformers import SentenceTransformer
 from PyPDF2 import PdfReader
-from sklearn.metrics.pairwise import cosine_similarity
 import chromadb
 
-JD_PATH = r"Intelligent_layer\data\data_scientist.txt"
-resume_folder = r"Intelligent_layer\resumes"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHROMA_PATH = os.path.join(BASE_DIR, "chroma_store")
+resume_folder = os.path.join(BASE_DIR, "resumes")
 
+# JD to rank against: an id in the jd_docs collection (the file name
+# embedding_store.py stored it under), or a metadata filter such as
+# --role data_scientist
+DEFAULT_JD_ID = "data_scientist.txt"
+TOP_K = 10
 
-# Step 1: Initialize model and Chroma client
+parser = argparse.ArgumentParser(description="Rank resumes against a stored JD")
+parser.add_argument("--jd-id", default=None, help=f"JD id in the jd_docs collection (default {DEFAULT_JD_ID})")
+parser.add_argument("--role", help="pick the JD by its 'role' metadata instead of by id")
+parser.add_argument("--top", type=int, default=TOP_K, help="number of resumes to return")
+args = parser.parse_args()
+
+
+# Step 1: Initialize model and the persistent Chroma store embedding_store.py writes
 model = SentenceTransformer('all-MiniLM-L6-v2')
-chroma_client = chromadb.Client()
+chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
 collection = chroma_client.get_or_create_collection("jd_docs")
+# Cosine space, so query distances convert straight to similarity
+resume_collection = chroma_client.get_or_create_collection("resume_docs", metadata={"hnsw:space": "cosine"})
 
-# Step 2: Get the latest stored JD embedding from Chroma
-jd_data = collection.get(include=["documents", "embeddings"])
-if not jd_data["documents"]:
-    raise ValueError("No Job Description found. Please run JD Generator first!")
+# Step 2: Fetch only the target JD, by id or by metadata
+if args.role:
+    jd_data = collection.get(where={"role": args.role}, limit=1, include=["documents", "embeddings"])
+else:
+    jd_data = collection.get(ids=[args.jd_id or DEFAULT_JD_ID], include=["documents", "embeddings"])
+if not jd_data["ids"]:
+    raise ValueError("Job Description not found. Please run embedding_store.py (or the JD Generator) first!")
 
-jd_text = jd_data["documents"][-1]  # get the most recent JD
-jd_embedding = np.array(jd_data["embeddings"][-1]).reshape(1, -1)
+jd_id = jd_data["ids"][0]
+jd_embedding = list(jd_data["embeddings"][0])
 
 # Step 3: Extract text from resumes
 def extract_text_from_pdf(pdf_path):
@@ -31,23 +48,46 @@ def extract_text_from_pdf(pdf_path):
             text += page.extract_text() or ""
     return text
 
-# Step 4: Rank resumes
- 
-resume_scores = []
+# Step 4: Embed only resumes that are new or changed since the last run (file size + mtime)
+resume_files = [f for f in os.listdir(resume_folder) if f.endswith(".pdf")]
+known = resume_collection.get(ids=resume_files, include=["metadatas"]) if resume_files else {"ids": [], "metadatas": []}
+known_stamps = {i: (m or {}).get("stamp") for i, m in zip(known["ids"], known["metadatas"])}
 
-for resume_file in os.listdir(resume_folder):
-    if resume_file.endswith(".pdf"):
-        resume_path = os.path.join(resume_folder, resume_file)
-        resume_text = extract_text_from_pdf(resume_path)
-        resume_embedding = model.encode(resume_text).reshape(1, -1)
-        score = cosine_similarity(jd_embedding, resume_embedding)[0][0]
-        resume_scores.append((resume_file, score))
+for resume_file in resume_files:
+    resume_path = os.path.join(resume_folder, resume_file)
+    stat = os.stat(resume_path)
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+    if known_stamps.get(resume_file) == stamp:
+        continue
+    resume_text = extract_text_from_pdf(resume_path)
+    resume_collection.upsert(
+        ids=[resume_file],
+        embeddings=[model.encode(resume_text).tolist()],
+        metadatas=[{"stamp": stamp}],
+    )
+    print(f"✅ Embedded resume: {resume_file}")
 
-# Step 5: Sort resumes by match score
-resume_scores.sort(key=lambda x: x[1], reverse=True)
+# Forget resumes whose PDFs have been removed from the folder, so only what is there gets ranked
+stale = sorted(set(resume_collection.get(include=[])["ids"]) - set(resume_files))
+if stale:
+    resume_collection.delete(ids=stale)
+    print(f"✅ Removed {len(stale)} resume(s) no longer in {resume_folder}")
+
+# Step 5: Rank resumes with a nearest-neighbour query instead of scoring every one
+resume_count = resume_collection.count()
+resume_scores = []
+if resume_count == 0:
+    print(f"⚠️ No resumes found in {resume_folder}")
+else:
+    results = resume_collection.query(
+        query_embeddings=[jd_embedding],
+        n_results=min(args.top, resume_count),
+        include=["distances"],
+    )
+    resume_scores = [(name, 1 - distance) for name, distance in zip(results["ids"][0], results["distances"][0])]
 
 # Step 6: Display results
-print("\n--- Resume Ranking Results ---\n")
+print(f"\n--- Resume Ranking Results ({jd_id}) ---\n")
 for i, (name, score) in enumerate(resume_scores, 1):
     print(f"{i}. {name} --> Match Score: {score:.4f}")
 
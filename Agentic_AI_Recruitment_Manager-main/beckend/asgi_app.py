@@ -0,0 +1,371 @@
+import os
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Match
+from werkzeug.utils import secure_filename
+import metrics
+
+# ASGI counterpart of unified_app.py. It serves the same routes, but the
+# LLM-bound endpoints await Ollama instead of holding a worker thread, and
+# resume parsing/scoring runs in a process pool so it never blocks the loop.
+#
+# Run with:  uvicorn asgi_app:application --host 0.0.0.0 --port 8000
+# or:        gunicorn -w 4 -k uvicorn.workers.UvicornWorker asgi_app:application
+
+import interview_agent as interview
+from resume_ranker import (upload_path, discard_upload, _allowed, parse_resume_timed, score_text_timed, error_result,
+                           duplicate_result, collapse_duplicates, get_rank_job_queue, search_candidates, corpus_idf,
+                           jd_prompt_cache, cached_generated_jd, generate_jd_shared_async)
+from minhash import BatchDeduplicator
+from rank_jobs import FINISHED
+
+# Worker processes for CPU-heavy resume parsing and scoring
+RANK_WORKERS = int(os.environ.get("RANK_WORKERS", os.cpu_count() or 1))
+
+rank_executor = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Start the pool inside the serving process, not at import time, so
+    # pre-forking servers don't inherit (or duplicate) it
+    global rank_executor
+    rank_executor = ProcessPoolExecutor(max_workers=RANK_WORKERS)
+    get_rank_job_queue().ensure_started()
+    try:
+        yield
+    finally:
+        rank_executor.shutdown(wait=False, cancel_futures=True)
+
+
+application = FastAPI(title="Agentic AI Recruitment Manager", lifespan=lifespan)
+application.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+
+def _route_for(scope):
+    """Route template for metric labels, e.g. /api/interview/results/{session_id}"""
+    for route in application.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class RequestMetrics:
+    """Same per-route request metrics that MergedApp records for the WSGI backend.
+
+    A plain ASGI middleware that wraps send, so a request is finished only
+    when its last body message goes out: streamed responses such as the job
+    event stream are timed and sized to the end, like MeteredBody.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        route = _route_for(scope)
+        try:
+            request_size = int(dict(scope["headers"]).get(b"content-length") or 0)
+        except ValueError:
+            request_size = 0
+        started = time.perf_counter()
+        response = {"status": 500, "size": 0, "finished": False}
+        metrics.http_in_flight.inc(method=method, route=route)
+
+        def finish(failed=False):
+            if response["finished"]:
+                return
+            response["finished"] = True
+            metrics.http_in_flight.dec(method=method, route=route)
+            metrics.record_request(method, route, response["status"], time.perf_counter() - started,
+                                   request_size, response["size"], failed)
+
+        async def metered_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, metered_send)
+        except Exception:
+            finish(failed=True)
+            raise
+        finally:
+            # Client went away mid-stream, or the app returned without a final body
+            finish()
+
+
+application.add_middleware(RequestMetrics)
+
+
+def _respond(body, status=200):
+    return JSONResponse(body, status_code=status)
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def _write_upload(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# ---------- unified routes ----------
+
+@application.get("/")
+async def index():
+    return PlainTextResponse("Agentic AI Recruitment Manager Backend is Running!")
+
+
+@application.get("/metrics")
+async def serve_metrics():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@application.get("/health")
+async def health():
+    return {"status": "ok", "service": "unified-backend", "ollama": interview.OLLAMA_AVAILABLE,
+            "llm": interview.ollama_guard.stats(),
+            "idfSnapshot": corpus_idf["meta"]["version"] if corpus_idf else None,
+            "jdPromptCache": jd_prompt_cache.stats(), "evaluationCache": interview.evaluation_cache_stats()}
+
+
+# ---------- resume ranker routes ----------
+
+@application.post("/rank")
+async def rank(request: Request):
+    form = await request.form()
+    jd = (form.get("jd") or "").strip()
+    if not jd:
+        return _respond({"error": "Missing 'jd' in form-data"}, 400)
+
+    files = form.getlist("files")
+    if not files:
+        return _respond({"error": "Upload at least one file under 'files'"}, 400)
+
+    show_timings = metrics.wants_timings(request.query_params.get("timings") or form.get("timings"))
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    parse_jobs = []
+    names = []
+    save_times = []
+    paths = []
+    for f in files:
+        if not getattr(f, "filename", None) or not _allowed(f.filename):
+            continue
+        # Resumes are parsed in parallel (and other requests may upload the
+        # same names), so each gets its own file; the name is only displayed
+        name = secure_filename(f.filename)
+        save_started = time.perf_counter()
+        data = await f.read()
+        path = await loop.run_in_executor(None, upload_path, name)
+        await loop.run_in_executor(None, _write_upload, path, data)
+        save_times.append(time.perf_counter() - save_started)
+        names.append(name)
+        paths.append(path)
+        parse_jobs.append(loop.run_in_executor(rank_executor, parse_resume_timed, path))
+
+    # Resumes are parsed in parallel, checked against each other for
+    # near-duplicates here, and only the originals are scored. Stage timings
+    # come back from the worker processes and are recorded here.
+    file_timers = []
+    results = [None] * len(names)
+    score_jobs = {}
+    dedup = BatchDeduplicator()
+    try:
+        parsed = await asyncio.gather(*parse_jobs)
+    finally:
+        for path in paths:
+            discard_upload(path)
+    for i, (text, sig, stages, error) in enumerate(parsed):
+        file_timer = metrics.StageTimer()
+        file_timer.add("save", save_times[i])
+        file_timer.merge(stages)
+        file_timers.append(file_timer)
+        if error is not None:
+            results[i] = error_result(names[i], error)
+            continue
+        duplicate = dedup.check(i, sig)
+        if duplicate:
+            results[i] = duplicate_result(names[i], duplicate)
+        else:
+            score_jobs[i] = loop.run_in_executor(rank_executor, score_text_timed, text, names[i], jd)
+    for i, (result, stages) in zip(score_jobs, await asyncio.gather(*score_jobs.values())):
+        file_timers[i].merge(stages)
+        results[i] = result
+
+    timer = metrics.StageTimer()
+    for result, file_timer in zip(results, file_timers):
+        file_timer.observe(metrics.rank_stage_latency)
+        timer.merge(file_timer.stages)
+        if show_timings:
+            result["timings"] = file_timer.as_ms()
+
+    results = collapse_duplicates(results)
+    results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
+    timer.add("total", time.perf_counter() - started)
+
+    body = {"rankings": results, "count": len(results)}
+    if show_timings:
+        body["timings"] = timer.as_ms()
+    return JSONResponse(body, headers={"Server-Timing": timer.server_timing()})
+
+
+@application.post("/rank/jobs")
+async def submit_rank_job(request: Request):
+    form = await request.form()
+    jd = (form.get("jd") or "").strip()
+    if not jd:
+        return _respond({"error": "Missing 'jd' in form-data"}, 400)
+
+    uploads = []
+    for f in form.getlist("files"):
+        if getattr(f, "filename", None) and _allowed(f.filename):
+            data = await f.read()
+            uploads.append((secure_filename(f.filename), lambda path, data=data: _write_upload(path, data)))
+    if not uploads:
+        return _respond({"error": "Upload at least one file under 'files'"}, 400)
+
+    job_id = await asyncio.get_running_loop().run_in_executor(None, get_rank_job_queue().submit, jd, uploads)
+    return _respond({"jobId": job_id, "status": "queued", "total": len(uploads)}, 202)
+
+
+@application.get("/rank/jobs/{job_id}")
+async def get_rank_job(job_id: str, results: str = "true"):
+    job = await asyncio.get_running_loop().run_in_executor(
+        None, get_rank_job_queue().get, job_id, results.lower() != "false")
+    if job is None:
+        return _respond({"error": "Job not found"}, 404)
+    return _respond(job)
+
+
+@application.get("/rank/jobs/{job_id}/events")
+async def stream_rank_job(job_id: str):
+    """Server-sent progress events until the job finishes"""
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(None, get_rank_job_queue().get, job_id, False) is None:
+        return _respond({"error": "Job not found"}, 404)
+
+    async def events():
+        last = None
+        while True:
+            job = await loop.run_in_executor(None, get_rank_job_queue().get, job_id, False)
+            if (job["status"], job["completed"]) != last:
+                last = (job["status"], job["completed"])
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+            if job["status"] in FINISHED:
+                final = await loop.run_in_executor(None, get_rank_job_queue().get, job_id)
+                yield f"event: done\ndata: {json.dumps(final)}\n\n"
+                return
+            await asyncio.sleep(1)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@application.post("/candidates/search")
+async def search_candidates_route(request: Request, timings: str = None):
+    data = await _json_body(request) or {}
+    body, status, timer = await asyncio.get_running_loop().run_in_executor(None, search_candidates, data)
+    if metrics.wants_timings(timings):
+        body["timings"] = timer.as_ms()
+    response = _respond(body, status)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+
+@application.post("/generate-jd")
+async def generate_jd_route(request: Request):
+    data = await _json_body(request) or {}
+    prompt = data.get("prompt", "")
+    if not prompt:
+        return _respond({"error": "Missing 'prompt'"}, 400)
+
+    cached = cached_generated_jd(prompt)
+    if cached:
+        return _respond(cached)
+
+    jd_text = await generate_jd_shared_async(prompt)
+    if not jd_text:
+        return _respond({"error": "Failed to generate JD"}, 500)
+
+    return _respond({"markdown": jd_text, "cached": False})
+
+
+# ---------- interview agent routes ----------
+
+@application.post("/api/interview/start")
+async def start_interview(request: Request):
+    params, error = interview.prepare_start(await _json_body(request) or {})
+    if error:
+        return _respond(*error)
+
+    first_question = await interview.generate_ai_question_async(
+        params["firstSkill"], session_id=params["sessionId"]
+    )
+    return _respond(interview.open_session(params, first_question))
+
+
+@application.post("/api/interview/answer")
+async def submit_answer(request: Request):
+    turn, error = interview.prepare_answer(await _json_body(request) or {})
+    if error:
+        return _respond(*error)
+
+    evaluation = await interview.grade_turn_async(turn)
+    completion = interview.apply_evaluation(turn, evaluation)
+    if completion:
+        return _respond(completion)
+
+    next_question = await interview.generate_ai_question_async(
+        turn["nextSkill"], turn["previousQa"], turn["session"]["id"]
+    )
+    return _respond(interview.add_next_question(turn, evaluation, next_question))
+
+
+@application.get("/api/interview/session/{session_id}")
+async def get_session(session_id: str):
+    return _respond(*interview.session_details(session_id))
+
+
+@application.post("/api/interview/end")
+async def end_interview(request: Request):
+    data = await _json_body(request) or {}
+    session = interview.session_to_finish(data)
+    if session:
+        await interview.grade_transcript_async(session)
+    return _respond(*interview.finish_session(data))
+
+
+@application.get("/api/interview/results/{session_id}")
+async def get_interview_results(session_id: str):
+    return _respond(*interview.interview_results(session_id))
+
+
+@application.get("/api/interview/all-results")
+async def get_all_results(request: Request):
+    """One page of results (default 100); see interview_agent.get_all_results for the query args"""
+    return _respond(*interview.query_all_results(request.query_params))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    print("Starting Unified ASGI Backend on port 8000...")
+    uvicorn.run(application, host="0.0.0.0", port=8000)
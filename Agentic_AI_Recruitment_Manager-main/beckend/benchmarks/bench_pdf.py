@@ -0,0 +1,89 @@
+"""Compare PDF text-extraction backends.
+
+Run from the beckend directory:
+
+    python -m benchmarks.bench_pdf
+    python -m benchmarks.bench_pdf --size 200 --paragraphs 60 --max-pages 2
+
+Uses the sample resumes in uploads/ plus a synthetic corpus (long CVs with
+--paragraphs), and reports per-file p50/p95 latency, throughput and the
+characters extracted for every installed backend, with and without the
+page/character limits.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+from pdf_extractors import PDF_BACKENDS, extract_pdf_text
+from benchmarks.corpus import build_corpus
+from benchmarks.bench_ranker import DEFAULT_CORPUS_DIR
+from benchmarks.stats import percentile
+
+SAMPLE_DIR = "uploads"
+
+
+def bench_backend(backend, paths, max_pages, max_chars):
+    latencies, chars, failures = [], 0, 0
+    started = time.perf_counter()
+    for path in paths:
+        t = time.perf_counter()
+        try:
+            chars += len(extract_pdf_text(path, backend, max_pages, max_chars))
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    return {
+        "files": len(paths),
+        "failures": failures,
+        "files_per_s": round(len(paths) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "avg_chars": round(chars / len(paths)) if paths else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("--size", type=int, default=100, help="synthetic resumes to add to the samples")
+    parser.add_argument("--paragraphs", type=int, default=30, help="experience paragraphs per synthetic resume")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--max-pages", type=int, default=2, help="page limit for the limited runs")
+    parser.add_argument("--max-chars", type=int, default=8000, help="character limit for the limited runs")
+    parser.add_argument("--output", help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    paths = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.pdf")))
+    if args.size:
+        synthetic, _ = build_corpus(args.corpus_dir, args.size, "pdf", args.seed, args.paragraphs)
+        paths += synthetic
+    if not paths:
+        print("❌ No PDFs to benchmark")
+        return 1
+
+    results = {}
+    for backend in PDF_BACKENDS:
+        for label, max_pages, max_chars in (("full", 0, 0), ("limited", args.max_pages, args.max_chars)):
+            print(f"▶ {backend} ({label})...", flush=True)
+            results[f"{backend}/{label}"] = bench_backend(backend, paths, max_pages, max_chars)
+
+    print(f"\n{'backend':<20} {'files/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'avg chars':>10} {'fail':>6}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['files_per_s']:>10} {r['p50_ms']:>10} {r['p95_ms']:>10} "
+              f"{r['avg_chars']:>10} {r['failures']:>6}")
+    missing = {"pypdfium2", "pdfminer"} - set(PDF_BACKENDS)
+    if missing:
+        print(f"\n⚠️ Not installed: {', '.join(sorted(missing))}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"files": len(paths), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
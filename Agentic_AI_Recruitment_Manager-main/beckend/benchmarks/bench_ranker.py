@@ -0,0 +1,211 @@
+"""Benchmarks for resume_ranker.py.
+
+Run from the beckend directory:
+
+    python -m benchmarks.bench_ranker --sizes 10 100 --formats pdf docx
+    python -m benchmarks.bench_ranker --sizes 1000 --save-baseline
+    python -m benchmarks.bench_ranker --sizes 1000 --compare
+
+Each scenario times the parsing, vectorizing and analysis functions in
+isolation, then drives /rank end to end through the Flask test client.
+Results report throughput, p50/p95 latency and peak RSS; --save-baseline
+stores them and --compare flags p95 or throughput regressions against
+the stored baseline (exit status 1).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import resume_ranker
+from benchmarks.corpus import build_corpus
+from benchmarks.stats import percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "ranker_bench_corpus")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies, items, elapsed):
+    return {
+        "items": items,
+        "seconds": round(elapsed, 4),
+        "throughput_per_s": round(items / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def time_calls(fn, args_list):
+    """Call fn once per argument tuple; returns the summary of per-call latency"""
+    latencies = []
+    started = time.perf_counter()
+    for args in args_list:
+        t = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, len(args_list), time.perf_counter() - started)
+
+
+def bench_functions(paths, jd):
+    """Time each pipeline function on its own over the whole corpus"""
+    texts = [resume_ranker.read_any(p) for p in paths]
+    scores = [resume_ranker.score_similarity(t, jd) for t in texts]
+    return {
+        "read_any": time_calls(resume_ranker.read_any, [(p,) for p in paths]),
+        "score_similarity": time_calls(resume_ranker.score_similarity, [(t, jd) for t in texts]),
+        "extract_skills": time_calls(resume_ranker.extract_skills, [(t, jd) for t in texts]),
+        "extract_experience": time_calls(resume_ranker.extract_experience, [(t,) for t in texts]),
+        "analyze_resume": time_calls(resume_ranker.analyze_resume, [(t, jd, s) for t, s in zip(texts, scores)]),
+    }
+
+
+def bench_rank_endpoint(paths, jd, batch_size):
+    """Drive /rank through the Flask test client in batches of batch_size files"""
+    client = resume_ranker.app.test_client()
+    upload_dir = tempfile.mkdtemp(prefix="ranker_bench_uploads_")
+    original_upload_dir = resume_ranker.UPLOAD_DIR
+    resume_ranker.UPLOAD_DIR = upload_dir
+    try:
+        latencies = []
+        started = time.perf_counter()
+        for i in range(0, len(paths), batch_size):
+            batch = paths[i:i + batch_size]
+            files = [(open(p, "rb"), os.path.basename(p)) for p in batch]
+            t = time.perf_counter()
+            try:
+                response = client.post("/rank", data={"jd": jd, "files": files},
+                                       content_type="multipart/form-data")
+            finally:
+                for f, _ in files:
+                    f.close()
+            latencies.append(time.perf_counter() - t)
+            if response.status_code != 200:
+                raise RuntimeError(f"/rank returned {response.status_code}: {response.get_data(as_text=True)}")
+        elapsed = time.perf_counter() - started
+    finally:
+        resume_ranker.UPLOAD_DIR = original_upload_dir
+
+    result = summarize(latencies, len(paths), elapsed)
+    result["batch_size"] = batch_size
+    return result
+
+
+def run(sizes, formats, batch_size, corpus_dir, seed, paragraphs):
+    results = {}
+    for fmt in formats:
+        for size in sizes:
+            print(f"▶ {fmt} x {size}: building corpus...", flush=True)
+            paths, jd = build_corpus(corpus_dir, size, fmt, seed, paragraphs)
+            print(f"▶ {fmt} x {size}: benchmarking functions...", flush=True)
+            scenario = {"functions": bench_functions(paths, jd)}
+            print(f"▶ {fmt} x {size}: benchmarking /rank...", flush=True)
+            scenario["rank_endpoint"] = bench_rank_endpoint(paths, jd, batch_size)
+            results[f"{fmt}-{size}"] = scenario
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Regressions where p95 grew or throughput dropped by more than tolerance"""
+    regressions = []
+    for scenario, benches in results.items():
+        old_benches = baseline.get("results", {}).get(scenario)
+        if not old_benches:
+            continue
+        flat = dict(benches["functions"], rank_endpoint=benches["rank_endpoint"])
+        old_flat = dict(old_benches["functions"], rank_endpoint=old_benches["rank_endpoint"])
+        for name, new in flat.items():
+            old = old_flat.get(name)
+            if not old:
+                continue
+            if old["p95_ms"] and new["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{scenario} {name}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+            if old["throughput_per_s"] and new["throughput_per_s"] < old["throughput_per_s"] * (1 - tolerance):
+                regressions.append(
+                    f"{scenario} {name}: throughput {old['throughput_per_s']}/s -> {new['throughput_per_s']}/s")
+    return regressions
+
+
+def print_table(results):
+    print(f"\n{'scenario':<12} {'benchmark':<20} {'items/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'peak MB':>9}")
+    for scenario, benches in results.items():
+        rows = list(benches["functions"].items()) + [("/rank", benches["rank_endpoint"])]
+        for name, r in rows:
+            print(f"{scenario:<12} {name:<20} {r['throughput_per_s']:>10} {r['p50_ms']:>10} "
+                  f"{r['p95_ms']:>10} {str(r['peak_rss_mb']):>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume ranking pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100],
+                        help="corpus sizes to run, e.g. 10 100 1000 10000")
+    parser.add_argument("--formats", nargs="+", default=["pdf", "docx"], choices=["pdf", "docx"])
+    parser.add_argument("--batch-size", type=int, default=10, help="resumes per /rank request")
+    parser.add_argument("--paragraphs", type=int, default=6, help="experience paragraphs per resume")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    parser.add_argument("--name", default="default", help="baseline name under benchmarks/baselines/")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed fractional slowdown before --compare reports a regression")
+    parser.add_argument("--output", help="also write the raw results JSON here")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.formats, args.batch_size, args.corpus_dir, args.seed, args.paragraphs)
+    print_table(results)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "config": {"batch_size": args.batch_size, "paragraphs": args.paragraphs, "seed": args.seed},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.name}.json")
+    status = 0
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"\n⚠️ No baseline at {baseline_path}; run with --save-baseline first.")
+        else:
+            with open(baseline_path) as f:
+                regressions = compare(results, json.load(f), args.tolerance)
+            if regressions:
+                print("\n❌ Regressions against baseline:")
+                for line in regressions:
+                    print(f"  - {line}")
+                status = 1
+            else:
+                print("\n✅ No regressions against baseline.")
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
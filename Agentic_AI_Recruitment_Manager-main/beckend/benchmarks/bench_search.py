@@ -0,0 +1,117 @@
+"""Benchmark two-stage candidate search at pool sizes up to 100k.
+
+Run from the beckend directory:
+
+    python -m benchmarks.bench_search --pool 100000 --queries 200
+
+Fills a throwaway candidate store with synthetic resumes, builds the
+indexes and times BM25 retrieval plus rerank per query, unfiltered and
+with broad and narrow facet filters. Without
+sentence-transformers (or with --synthetic-embeddings) the embedding
+matrix and query vectors are random unit vectors: the rerank cost is the
+same, only the ordering is meaningless.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+
+import candidate_index
+from resume_ranker import extract_experience
+from skills import resume_skills
+from candidate_store import CandidateStore, vectorize
+from facet_index import parse_filters
+from metrics import StageTimer
+from benchmarks.corpus import resume_lines, jd_text
+from benchmarks.stats import percentile
+
+EMBEDDING_DIM = 384
+FILTER_SCENARIOS = [
+    ("unfiltered", None),
+    ("python, 3+ years", parse_filters({"skills": ["python"], "minYears": 3})),
+    ("python AND kubernetes, 5+ years, Master's+",
+     parse_filters({"skills": ["python", "kubernetes"], "minYears": 5, "minEducation": "master"})),
+]
+
+
+def fill_store(store, size, seed, batch_size=1000):
+    rng = random.Random(seed)
+    batch = []
+    for i in range(size):
+        text = "\n".join(resume_lines(rng, paragraphs=4))
+        experience = extract_experience(text)
+        years = experience["years"].split("+")[0]
+        batch.append({"id": f"{i:08d}", "source": "synthetic", "name": f"resume_{i:06d}.pdf", "text": text,
+                      "skills": resume_skills(text), "experience_years": int(years) if years.isdigit() else None,
+                      "education": experience["education"], "vector": vectorize(text)})
+        if len(batch) >= batch_size:
+            store.upsert_many(batch)
+            batch = []
+    if batch:
+        store.upsert_many(batch)
+
+
+def random_unit_vectors(texts):
+    vectors = np.random.default_rng(len(texts)).standard_normal((len(texts), EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark two-stage candidate search")
+    parser.add_argument("--pool", type=int, default=100000, help="synthetic candidates in the pool")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--retrieve", type=int, default=candidate_index.DEFAULT_RETRIEVE)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "candidate_search_bench"))
+    parser.add_argument("--synthetic-embeddings", action="store_true", help="use random vectors instead of MiniLM")
+    args = parser.parse_args(argv)
+
+    synthetic = args.synthetic_embeddings or not candidate_index.EMBEDDINGS_AVAILABLE
+    encode = random_unit_vectors if synthetic else candidate_index.embed_texts
+    store_path = os.path.join(args.workdir, f"pool-{args.pool}-s{args.seed}.sqlite3")
+    index_dir = os.path.join(args.workdir, f"index-{args.pool}-s{args.seed}{'-synthetic' if synthetic else ''}")
+
+    store = CandidateStore(store_path)
+    if store.count() < args.pool:
+        print(f"▶ Filling store with {args.pool} synthetic candidates...", flush=True)
+        fill_store(store, args.pool, args.seed)
+    if not os.path.exists(os.path.join(index_dir, "manifest.json")):
+        print("▶ Building indexes...", flush=True)
+        started = time.perf_counter()
+        candidate_index.build_index(store, index_dir, encode)
+        print(f"  built in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    index = candidate_index.CandidateIndex(index_dir)
+    print(f"▶ Loaded index in {(time.perf_counter() - started) * 1000:.0f} ms", flush=True)
+
+    rng = random.Random(args.seed + 1)
+    queries = [jd_text(rng) for _ in range(args.queries)]
+    # JD embeddings are cached per JD in the server, so they are computed up front here
+    query_vectors = encode(queries)
+    print(f"\n{args.pool} candidates, {args.queries} queries, retrieve {args.retrieve}")
+    for label, filters in FILTER_SCENARIOS:
+        samples = {"filter": [], "bm25": [], "rerank": [], "total": []}
+        matched = len(index.facets.match(filters)) if filters else len(index.ids)
+        for query, query_vector in zip(queries, query_vectors):
+            timer = StageTimer()
+            started = time.perf_counter()
+            index.search(query, args.limit, args.retrieve, query_vector, timer, filters)
+            samples["total"].append(time.perf_counter() - started)
+            for stage in ("filter", "bm25", "rerank"):
+                samples[stage].append(timer.stages.get(stage, 0.0))
+        print(f"\n{label} ({matched} candidates pass)")
+        for stage, values in samples.items():
+            print(f"  {stage:<8} p50 {percentile(values, 50) * 1000:7.2f} ms   p95 {percentile(values, 95) * 1000:7.2f} ms")
+    if synthetic:
+        print("⚠️ Rerank used random embeddings in place of MiniLM.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
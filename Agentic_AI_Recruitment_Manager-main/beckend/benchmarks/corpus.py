@@ -0,0 +1,118 @@
+import os
+import random
+import docx
+
+# Synthetic resumes and JDs for benchmarks. Generation is seeded, so a
+# given (seed, size, format) always produces the same corpus, and corpora
+# are cached on disk because building 10,000 documents takes a while.
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "vue",
+    "node.js", "express", "django", "flask", "spring", "sql", "mongodb",
+    "postgresql", "mysql", "redis", "docker", "kubernetes", "aws", "azure",
+    "gcp", "git", "ci/cd", "jenkins", "terraform", "machine learning",
+    "data science", "deep learning", "html", "css", "rest api", "graphql",
+    "microservices", "agile", "scrum", "jira", "linux", "bash", "c++", "c#",
+    "go", "rust", "php", "ruby", "rails", "scala", "kotlin", "swift"
+]
+
+FIRST_NAMES = ["Asha", "Rohan", "Maya", "Arjun", "Priya", "Kabir", "Neha", "Vikram", "Sara", "Ishaan"]
+LAST_NAMES = ["Sharma", "Gupta", "Iyer", "Khan", "Patel", "Rao", "Mehta", "Singh", "Das", "Nair"]
+DEGREES = ["Bachelor of Technology", "Master of Science", "PhD in Computer Science", "MBA", "B.Tech", "M.Tech"]
+ROLES = ["Software Engineer", "Backend Developer", "Data Scientist", "Frontend Engineer", "DevOps Engineer"]
+FILLER = [
+    "Designed and shipped features used by thousands of customers.",
+    "Led code reviews and mentored junior engineers on the team.",
+    "Improved service latency by profiling hot paths and caching results.",
+    "Collaborated with product managers to scope and deliver releases.",
+    "Automated deployments and monitoring for production services.",
+    "Wrote technical documentation and onboarding guides.",
+]
+
+
+def resume_lines(rng, paragraphs=6):
+    """Plain-text lines of one synthetic resume"""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, rng.randint(4, 14))
+    lines = [
+        name,
+        f"{rng.choice(ROLES)} with {rng.randint(1, 15)}+ years of experience",
+        f"Education: {rng.choice(DEGREES)}",
+        "Skills: " + ", ".join(skills),
+    ]
+    for _ in range(paragraphs):
+        lines.append(f"Worked with {', '.join(rng.sample(skills, min(3, len(skills))))}.")
+        lines.extend(rng.sample(FILLER, 2))
+    return lines
+
+
+def jd_text(rng):
+    """One synthetic job description"""
+    skills = rng.sample(SKILLS, 8)
+    return "\n".join([
+        f"We are hiring a {rng.choice(ROLES)}.",
+        f"Requirements: {', '.join(skills)}.",
+        f"At least {rng.randint(2, 8)} years of experience and a {rng.choice(DEGREES)}.",
+    ] + rng.sample(FILLER, 3))
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, lines, lines_per_page=50):
+    """Write a minimal text-only PDF that PyPDF2 can extract"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in page) + " ET"
+        stream = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path, lines):
+    d = docx.Document()
+    for line in lines:
+        d.add_paragraph(line)
+    d.save(path)
+
+
+def build_corpus(root, size, fmt="pdf", seed=42, paragraphs=6):
+    """Create (or reuse) a corpus directory; returns (resume paths, jd text)"""
+    if fmt not in ("pdf", "docx"):
+        raise ValueError("fmt must be 'pdf' or 'docx'")
+    rng = random.Random(f"{seed}-{fmt}-{paragraphs}")
+    folder = os.path.join(root, f"{fmt}-{size}-p{paragraphs}-s{seed}")
+    os.makedirs(folder, exist_ok=True)
+
+    writer = write_pdf if fmt == "pdf" else write_docx
+    paths = []
+    for i in range(size):
+        lines = resume_lines(rng, paragraphs)
+        path = os.path.join(folder, f"resume_{i:05d}.{fmt}")
+        if not os.path.exists(path):
+            writer(path, lines)
+        paths.append(path)
+    return paths, jd_text(random.Random(seed))
@@ -0,0 +1,235 @@
+"""Local stand-in for the Ollama HTTP API, for load tests without a real llama2.
+
+    python -m benchmarks.fake_ollama --port 11500 --latency lognormal:0.8,0.5 \
+        --error-rate 0.02 --stall-rate 0.01
+
+Then point the backend at it with OLLAMA_HOST=http://127.0.0.1:11500.
+
+Implements /api/chat (streaming and non-streaming), /api/generate,
+/api/tags and /api/version. Replies are canned but shaped like the real
+thing: interview questions, "Score: X / Feedback: ..." evaluations, an
+{"evaluations": [...]} JSON object for batch grading (or any request that
+sends a "format" schema), or a markdown JD, depending on the prompt.
+
+Latency specs (seconds):
+    fixed:S | uniform:LO,HI | normal:MEAN,STDDEV | lognormal:MEDIAN,SIGMA
+"""
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTIONS = [
+    "How would you design a rate limiter for a public API?",
+    "Explain how you would debug a memory leak in a long-running service.",
+    "What trade-offs do you consider when choosing between SQL and NoSQL stores?",
+    "How do you make a flaky integration test deterministic?",
+    "Describe how you would roll out a risky schema migration.",
+]
+
+JD_TEMPLATE = """# {role}
+
+## About the Role
+We are looking for a {role} to build reliable, well-tested services.
+
+## Key Responsibilities
+- Design and ship features end to end
+- Review code and mentor teammates
+
+## Requirements
+- 3+ years of relevant experience
+- Strong fundamentals in data structures and system design
+"""
+
+
+def parse_latency(spec):
+    """Turn a latency spec into a zero-argument sampler returning seconds"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        lo, hi = values
+        return lambda: random.uniform(lo, hi)
+    if kind == "normal":
+        mean, stddev = values
+        return lambda: max(0.0, random.gauss(mean, stddev))
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class FakeOllamaConfig:
+    def __init__(self, latency="fixed:0.2", token_delay=0.01, error_rate=0.0,
+                 stall_rate=0.0, stall_seconds=60.0, seed=None):
+        self.sample_latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "stalls": 0}
+
+    def roll(self):
+        """Pick this request's fate: 'error', 'stall' or 'ok'"""
+        with self.lock:
+            self.stats["requests"] += 1
+            r = self.rng.random()
+            if r < self.error_rate:
+                self.stats["errors"] += 1
+                return "error"
+            if r < self.error_rate + self.stall_rate:
+                self.stats["stalls"] += 1
+                return "stall"
+            return "ok"
+
+
+FEEDBACK = "Clear answer with reasonable depth. Could mention trade-offs."
+
+
+def batch_evaluations(prompt):
+    """{"evaluations": [...]} JSON grading every "Question N" in a batch grading prompt"""
+    count = len(set(re.findall(r"^Question (\d+)\b", prompt, re.MULTILINE))) or 1
+    return json.dumps({"evaluations": [
+        {"question": n, "score": random.randint(4, 9), "feedback": FEEDBACK} for n in range(1, count + 1)
+    ]})
+
+
+def reply_for(prompt, schema=None):
+    """Canned model output matching what the backend prompt (or format schema) asks for"""
+    if schema is not None or "evaluating the answers from a technical interview" in prompt:
+        return batch_evaluations(prompt)
+    if "evaluating a technical interview answer" in prompt:
+        return f"Score: {random.randint(4, 9)}\nFeedback: {FEEDBACK}"
+    if "interview question" in prompt:
+        return random.choice(QUESTIONS)
+    role = "Software Engineer"
+    if "role:" in prompt.lower():
+        role = prompt.lower().split("role:", 1)[1].split("\n")[0].strip().rstrip(".").title() or role
+    return JD_TEMPLATE.format(role=role)
+
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/api/version":
+                return self._send_json(200, {"version": "0.0.0-fake"})
+            if self.path == "/api/tags":
+                return self._send_json(200, {"models": [{"name": "llama2:latest", "model": "llama2:latest"}]})
+            if self.path == "/stats":
+                with config.lock:
+                    return self._send_json(200, dict(config.stats))
+            self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path not in ("/api/chat", "/api/generate"):
+                return self._send_json(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/api/chat":
+                prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+            else:
+                prompt = payload.get("prompt", "")
+
+            fate = config.roll()
+            if fate == "stall":
+                time.sleep(config.stall_seconds)
+            time.sleep(config.sample_latency())
+            if fate == "error":
+                return self._send_json(500, {"error": "injected failure"})
+
+            text = reply_for(prompt, payload.get("format"))
+            model = payload.get("model", "llama2")
+            if payload.get("stream", True) is False:
+                return self._send_json(200, self._message(model, text, done=True))
+            self._stream(model, text)
+
+        def _message(self, model, text, done):
+            body = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+            if self.path == "/api/chat":
+                body["message"] = {"role": "assistant", "content": text}
+            else:
+                body["response"] = text
+            if done:
+                body.update({"done_reason": "stop", "eval_count": len(text.split())})
+            return body
+
+        def _stream(self, model, text):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            tokens = [t + " " for t in text.split(" ")]
+            for token in tokens:
+                self._chunk(self._message(model, token, done=False))
+                time.sleep(config.token_delay)
+            self._chunk(self._message(model, "", done=True))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _chunk(self, body):
+            data = json.dumps(body).encode("utf-8") + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+    return Handler
+
+
+def start_server(host="127.0.0.1", port=11500, config=None):
+    """Start the fake server on a background thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), make_handler(config or FakeOllamaConfig()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", default="fixed:0.2", help="per-request latency spec, see module docstring")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of requests that stall")
+    parser.add_argument("--stall-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+
+
+def config_from_args(args):
+    return FakeOllamaConfig(args.latency, args.token_delay, args.error_rate,
+                            args.stall_rate, args.stall_seconds, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Ollama server for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config_from_args(args)))
+    print(f"🦙 Fake Ollama listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Load generator for the interview agent.
+
+Drives many concurrent start -> answer x N -> results flows and reports
+per-operation latency percentiles, throughput and session-memory growth.
+
+In-process, against interview_agent.py with a fake Ollama on a thread:
+
+    python -m benchmarks.load_interviews --fake-ollama --sessions 200 --concurrency 50 \
+        --latency lognormal:0.5,0.4 --error-rate 0.02
+
+Against a running backend (start it with OLLAMA_HOST pointing at
+benchmarks.fake_ollama):
+
+    python -m benchmarks.load_interviews --url http://127.0.0.1:8000 --sessions 500 --concurrency 100
+
+To compare grading modes, --grading-mode both runs the sessions once with
+"gradingMode": "per-turn" and once with "deferred", and reports each run
+with the model time and requests the results payloads record per
+interview:
+
+    python -m benchmarks.load_interviews --fake-ollama --grading-mode both --sessions 100
+
+Memory growth is only measured in-process, where the sessions live in
+this interpreter.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import tracemalloc
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fake_ollama
+from benchmarks.stats import percentile
+
+GRADING_MODES = ("per-turn", "deferred")
+SKILL_SETS = [["python", "sql"], ["react", "javascript"], ["node.js", "typescript"], ["java", "general"]]
+ANSWERS = [
+    "I would start by measuring, then look at the hot path.",
+    "Closures capture variables from the enclosing scope, which lets callbacks keep state "
+    "without globals. I use them for memoization and event handlers.",
+    "Indexes speed up reads at the cost of slower writes and extra storage, so I add them "
+    "for the queries that matter and check the plan with EXPLAIN.",
+]
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, if it can be read"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def call(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=600) as resp:
+                return resp.status, json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            return e.code, {}
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def call(self, method, path, body=None):
+        # Flask test clients keep per-request state, so each thread gets its own
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True) or {}
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.failures = {}
+        self.grading = []
+
+    def timed(self, op, client, method, path, body=None):
+        started = time.perf_counter()
+        status, payload = client.call(method, path, body)
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.latencies.setdefault(op, []).append(elapsed)
+            if status >= 400:
+                self.failures[op] = self.failures.get(op, 0) + 1
+        return status, payload
+
+    def graded(self, grading):
+        with self.lock:
+            self.grading.append(grading)
+
+
+def run_session(client, recorder, num_questions, rng, grading_mode=None):
+    skills = rng.choice(SKILL_SETS)
+    body = {
+        "candidateId": f"load-{rng.randrange(10**9)}",
+        "candidateName": "Load Test",
+        "skills": skills,
+        "numQuestions": num_questions,
+    }
+    if grading_mode:
+        body["gradingMode"] = grading_mode
+    status, started = recorder.timed("start", client, "POST", "/api/interview/start", body)
+    if status != 200:
+        return
+    session_id = started["sessionId"]
+    for _ in range(num_questions):
+        status, turn = recorder.timed("answer", client, "POST", "/api/interview/answer",
+                                      {"sessionId": session_id, "answer": rng.choice(ANSWERS)})
+        if status != 200 or turn.get("completed"):
+            break
+    status, results = recorder.timed("results", client, "GET", f"/api/interview/results/{session_id}")
+    if status == 200 and results.get("grading"):
+        recorder.graded(results["grading"])
+
+
+def run_mode(client, args, grading_mode, seed_rng):
+    """Run args.sessions interviews with one grading mode; returns its report"""
+    recorder = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(run_session, client, recorder, args.questions,
+                               random.Random(seed_rng.random()), grading_mode)
+                   for _ in range(args.sessions)]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "seconds": round(elapsed, 3),
+        "turns_per_s": round(len(recorder.latencies.get("answer", [])) / elapsed, 2),
+        "sessions_per_s": round(args.sessions / elapsed, 2),
+        "operations": {},
+    }
+    for op, samples in recorder.latencies.items():
+        report["operations"][op] = {
+            "count": len(samples),
+            "failures": recorder.failures.get(op, 0),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+            "max_ms": round(max(samples) * 1000, 2),
+        }
+    if recorder.grading:
+        # Model time and requests per interview, as each session recorded them
+        seconds = [g["seconds"] for g in recorder.grading]
+        report["grading"] = {
+            "interviews": len(recorder.grading),
+            "requests_per_interview": round(sum(g["requests"] for g in recorder.grading) / len(recorder.grading), 2),
+            "llm_seconds_per_interview": round(sum(seconds) / len(seconds), 4),
+            "llm_p50_s": round(percentile(seconds, 50), 4),
+            "llm_p95_s": round(percentile(seconds, 95), 4),
+            "llm_seconds_total": round(sum(seconds), 3),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the interview agent")
+    parser.add_argument("--url", help="base URL of a running backend; omit to run in-process")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--grading-mode", choices=GRADING_MODES + ("both",),
+                        help="gradingMode sent to /start; 'both' runs each mode in turn (default: the server's)")
+    parser.add_argument("--fake-ollama", action="store_true", help="start a fake Ollama on a background thread")
+    parser.add_argument("--fake-port", type=int, default=11500)
+    parser.add_argument("--tracemalloc", action="store_true", help="also count Python heap bytes per session")
+    parser.add_argument("--output", help="write the report JSON here")
+    fake_ollama.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    fake_server = fake_config = None
+    if args.fake_ollama:
+        fake_config = fake_ollama.config_from_args(args)
+        fake_server = fake_ollama.start_server(port=args.fake_port, config=fake_config)
+        # Must be set before anything imports ollama, whose default client reads it once
+        os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{args.fake_port}"
+
+    sessions_store = None
+    if args.url:
+        client = HttpClient(args.url)
+    else:
+        import interview_agent
+        sessions_store = interview_agent.interview_sessions
+        client = InProcessClient(interview_agent.app)
+        if not interview_agent.OLLAMA_AVAILABLE:
+            print("⚠️ ollama package not installed: the agent will use its rule-based path.")
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    rss_before = current_rss_mb()
+    heap_before = tracemalloc.get_traced_memory()[0] if args.tracemalloc else None
+    sessions_before = len(sessions_store) if sessions_store is not None else None
+
+    modes = GRADING_MODES if args.grading_mode == "both" else (args.grading_mode,)
+    seed_rng = random.Random(args.seed)
+    report = {"sessions": args.sessions, "concurrency": args.concurrency, "modes": {}}
+    for mode in modes:
+        fake_before = dict(fake_config.stats) if fake_config is not None else None
+        run = run_mode(client, args, mode, seed_rng)
+        if fake_config is not None:
+            run["fake_ollama"] = {k: v - fake_before[k] for k, v in fake_config.stats.items()}
+        report["modes"][mode or "default"] = run
+
+    if sessions_store is not None:
+        rss_after = current_rss_mb()
+        created = len(sessions_store) - sessions_before
+        memory = {"sessions_created": created, "rss_before_mb": rss_before, "rss_after_mb": rss_after}
+        if rss_before is not None and rss_after is not None and created:
+            memory["rss_kb_per_session"] = round((rss_after - rss_before) * 1024 / created, 2)
+        if args.tracemalloc and created:
+            memory["heap_bytes_per_session"] = round((tracemalloc.get_traced_memory()[0] - heap_before) / created)
+        report["memory"] = memory
+    if fake_server is not None:
+        fake_server.shutdown()
+
+    for mode, run in report["modes"].items():
+        print(f"\n[{mode}]")
+        print(f"{'operation':<10} {'count':>7} {'fail':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+        for op, r in run["operations"].items():
+            print(f"{op:<10} {r['count']:>7} {r['failures']:>6} {r['p50_ms']:>10} {r['p95_ms']:>10} "
+                  f"{r['p99_ms']:>10} {r['max_ms']:>10}")
+        print(f"{run['turns_per_s']} turns/s, {run['sessions_per_s']} sessions/s over {run['seconds']}s")
+        if "grading" in run:
+            g = run["grading"]
+            print(f"Grading: {g['requests_per_interview']} model requests and {g['llm_seconds_per_interview']}s "
+                  f"of model time per interview (p50 {g['llm_p50_s']}s, p95 {g['llm_p95_s']}s)")
+        if "fake_ollama" in run:
+            print(f"Fake Ollama: {run['fake_ollama']}")
+    if "memory" in report:
+        print(f"\nMemory: {report['memory']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Per-process memory of a gunicorn master and its workers (Linux only).
+
+Run from the beckend directory against the master's pid:
+
+    python -m benchmarks.memory_report $(pgrep -o -f "gunicorn -c gunicorn.conf.py")
+    python -m benchmarks.memory_report 1234 --output memory.json
+
+Reads /proc/<pid>/smaps_rollup for the master and every child. RSS counts
+a shared page in every process that maps it; PSS splits it between them,
+so the gap between summed RSS and summed PSS is memory the workers share
+instead of holding their own copies. With PRELOAD_MODELS set, each
+worker's shared pages should cover most of what the master loaded.
+"""
+import os
+import sys
+import json
+import argparse
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+# Share of the master's resident memory a worker must still share to count as sharing it
+SHARED_THRESHOLD = 0.5
+
+
+def read_rollup(pid):
+    """smaps_rollup fields for pid, in MB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0]) / 1024
+    return values
+
+
+def child_pids(pid):
+    """Direct children of pid, from the parent pid in each /proc/<pid>/stat"""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name is parenthesized and may contain spaces
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def build_report(master_pid):
+    master = read_rollup(master_pid)
+    workers = {}
+    for pid in child_pids(master_pid):
+        try:
+            workers[pid] = read_rollup(pid)
+        except OSError:  # exited meanwhile
+            continue
+
+    processes = [("master", master_pid, master)] + [("worker", pid, w) for pid, w in workers.items()]
+    total_rss = sum(p["Rss"] for _, _, p in processes)
+    total_pss = sum(p["Pss"] for _, _, p in processes)
+    shared = [w["Shared_Clean"] + w["Shared_Dirty"] for w in workers.values()]
+    return {
+        "processes": [{"role": role, "pid": pid, **{k: round(v, 1) for k, v in p.items()}}
+                      for role, pid, p in processes],
+        "total_rss_mb": round(total_rss, 1),
+        "total_pss_mb": round(total_pss, 1),
+        "shared_savings_mb": round(total_rss - total_pss, 1),
+        "min_worker_shared_mb": round(min(shared), 1) if shared else 0.0,
+        "sharing": bool(shared) and min(shared) >= SHARED_THRESHOLD * master["Rss"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report RSS/PSS of a gunicorn master and its workers")
+    parser.add_argument("pid", type=int, help="pid of the gunicorn master")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.exists(f"/proc/{args.pid}/smaps_rollup"):
+        print(f"❌ No /proc/{args.pid}/smaps_rollup (needs Linux 4.14+ and a live pid).")
+        return 1
+    report = build_report(args.pid)
+
+    print(f"{'role':<8} {'pid':>8} " + " ".join(f"{name + ' MB':>17}" for name in FIELDS))
+    for p in report["processes"]:
+        print(f"{p['role']:<8} {p['pid']:>8} " + " ".join(f"{p.get(name, 0):>17}" for name in FIELDS))
+    print(f"\nSum of RSS {report['total_rss_mb']} MB, sum of PSS {report['total_pss_mb']} MB: "
+          f"{report['shared_savings_mb']} MB counted once instead of per process")
+    workers = len(report["processes"]) - 1
+    if not workers:
+        print("⚠️ No worker processes found under this pid.")
+    elif report["sharing"]:
+        print(f"✅ Every worker shares at least {report['min_worker_shared_mb']} MB with the master "
+              f"(≥{SHARED_THRESHOLD:.0%} of its RSS); preloaded pages are shared copy-on-write.")
+    else:
+        print(f"⚠️ A worker shares only {report['min_worker_shared_mb']} MB with the master; "
+              "models are probably loaded per worker (is PRELOAD_MODELS set?).")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
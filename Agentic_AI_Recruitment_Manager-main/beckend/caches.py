@@ -0,0 +1,235 @@
+import re
+import json
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer
+
+from metrics import cache_requests, cache_saved_seconds, coalesced_requests
+
+# In-process caches (and coalescing) for work that repeats across requests
+
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive form of a document, used for cache keys"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def text_digest(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def key_digest(*parts):
+    """Digest of several texts as one key, each normalized like text_digest"""
+    return hashlib.sha256(json.dumps([normalize_text(p) for p in parts]).encode("utf-8")).hexdigest()
+
+
+# Small hashed word + word-pair space for short texts (prompts, answers).
+# Lexical on purpose: swapping the one word that matters ("Python" for
+# "Java") moves the vector far more than it moves a sentence embedding.
+# Negations and qualifiers stay in: "is not thread safe" must not look
+# like "is thread safe" to the evaluation cache.
+KEPT_STOP_WORDS = {"not", "no", "never", "nor", "neither", "none", "nothing", "nobody", "nowhere", "cannot",
+                   "cant", "without", "against", "except", "but", "few", "less"}
+_text_vectorizer = HashingVectorizer(n_features=2 ** 12, ngram_range=(1, 2),
+                                     stop_words=sorted(ENGLISH_STOP_WORDS - KEPT_STOP_WORDS),
+                                     token_pattern=r"[a-z0-9+#]+", alternate_sign=False, norm="l2")
+
+
+def text_vector(text):
+    """Unit-length float32 vector of text for SemanticCache lookups"""
+    return _text_vectorizer.transform([text.lower()]).toarray()[0].astype(np.float32)
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_size, name):
+        self.max_size = max_size
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        cache_requests.inc(cache=self.name, result="hit" if value is not None else "miss")
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """Cached value for key, computing it with factory() on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SemanticCache:
+    """Thread-safe bounded cache looked up by nearest embedding instead of an exact key.
+
+    embed maps a text to a unit-length vector; a lookup returns the value
+    stored for the most similar earlier text when the cosine similarity is
+    at least threshold. Vectors are rows of one preallocated matrix, so a
+    lookup is a single matrix-vector product over at most max_size rows.
+    An optional scope limits a lookup to entries put under the same scope
+    (e.g. answers to one question). Each entry remembers how long its value
+    took to produce, which is counted as time saved on every hit.
+    """
+
+    def __init__(self, max_size, threshold, name, embed):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.name = name
+        self.embed = embed
+        self._vectors = None
+        self._entries = []  # (scope, text, value, cost seconds), one per row of _vectors
+        self._last_used = np.zeros(max_size, dtype=np.int64)
+        self._scope_rows = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, text, scope=None):
+        """(value, similarity, matched text) for the nearest cached text above the threshold, else None"""
+        vector = self.embed(text)
+        match, cost = None, 0.0
+        with self._lock:
+            rows = self._scope_rows.get(scope)
+            if rows:
+                rows = np.fromiter(rows, dtype=np.int64, count=len(rows))
+                similarities = self._vectors[rows] @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    row = int(rows[best])
+                    self._clock += 1
+                    self._last_used[row] = self._clock
+                    _, matched_text, value, cost = self._entries[row]
+                    match = (value, float(similarities[best]), matched_text)
+            if match:
+                self.hits += 1
+                self.saved_seconds += cost
+            else:
+                self.misses += 1
+        cache_requests.inc(cache=self.name, result="hit" if match else "miss")
+        if match:
+            cache_saved_seconds.inc(cost, cache=self.name)
+        return match
+
+    def put(self, text, value, cost=0.0, scope=None):
+        """Cache value for text; cost is the seconds it took to produce"""
+        vector = self.embed(text)
+        with self._lock:
+            self._clock += 1
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, len(vector)), dtype=np.float32)
+            if len(self._entries) < self.max_size:
+                row = len(self._entries)
+                self._entries.append(None)
+            else:
+                row = int(np.argmin(self._last_used))
+                evicted_scope = self._entries[row][0]
+                self._scope_rows[evicted_scope].discard(row)
+                if not self._scope_rows[evicted_scope]:
+                    del self._scope_rows[evicted_scope]
+            self._vectors[row] = vector
+            self._entries[row] = (scope, text, value, cost)
+            self._last_used[row] = self._clock
+            self._scope_rows.setdefault(scope, set()).add(row)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "savedSeconds": round(self.saved_seconds, 3),
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls so only one runs and all callers share its result.
+
+    Keys identify the work (e.g. a prompt digest). A call made while one
+    with the same key is still running waits for it instead of starting
+    another; its exception, if any, is raised to every waiter. Nothing is
+    kept once the call finishes, so this bounds duplicate work without
+    caching anything.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """fn() once per key across concurrent threads"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+        if not leader:
+            coalesced_requests.inc(group=self.name)
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+        return call["result"]
+
+    async def do_async(self, key, factory):
+        """await factory() once per key across concurrent tasks of the running loop"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            coalesced_requests.inc(group=self.name)
+        # Shielded so one caller disconnecting does not cancel the others' result
+        return await asyncio.shield(task)
@@ -0,0 +1,355 @@
+"""Two-stage search over the candidate store.
+
+Near-duplicate resumes (flagged by the ingester) are left out of both
+indexes and reported with their original instead.
+
+Stage one scores every candidate with BM25 from an inverted index and keeps
+the top few hundred; stage two reranks only those by MiniLM cosine
+similarity with the JD. Both indexes are built offline from the candidate
+store and saved as numpy arrays, so a query never touches resume text.
+Embeddings go to an append-only memory-mapped matrix (embedding_matrix.py):
+a rebuild only embeds new candidates, and every worker maps the same file.
+
+Build (or rebuild) after ingesting resumes, from the beckend directory:
+
+    python candidate_index.py
+    python candidate_index.py --store uploads/candidates.sqlite3 --no-embeddings
+"""
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from array import array
+from collections import Counter
+from contextlib import nullcontext
+
+import numpy as np
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from candidate_store import CandidateStore, CANDIDATE_STORE_PATH
+from facet_index import FacetBuilder, FacetIndex, facets_path
+from skills import resume_skills
+from embedding_matrix import EmbeddingMatrix, map_matrix, remove_unused
+
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+    print("⚠️ sentence-transformers not installed: candidate search will use BM25 only.")
+
+CANDIDATE_INDEX_DIR = os.environ.get("CANDIDATE_INDEX_DIR", os.path.join("uploads", "candidate_index"))
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_RETRIEVE = 300
+
+# Below this fraction of the pool, BM25 scores filtered candidates one by one
+# instead of scoring everyone and masking
+SPARSE_FILTER_RATIO = 0.08
+
+# Keeps tokens like c++, c#, node.js and ci/cd whole
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./]*")
+
+_model = None
+_loaded = {}
+_load_lock = threading.Lock()
+_model_lock = threading.Lock()
+
+
+def tokenize(text):
+    tokens = (t.rstrip("./") for t in TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t and t not in ENGLISH_STOP_WORDS]
+
+
+def load_embedding_model():
+    """The MiniLM model, loaded once per process (or once in a preloading master, see model_preload.py)"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+
+def embed_texts(texts):
+    """Unit-length MiniLM embeddings (float32), loading the model on first use"""
+    model = load_embedding_model()
+    return model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+# ---------- building ----------
+
+def build_index(store, index_dir=CANDIDATE_INDEX_DIR, encode=None, batch_size=256):
+    """Write the BM25 postings, the facet index and (if encode is given) the embedding matrix for every stored candidate.
+
+    Candidates already in the embedding matrix keep their vectors; only new ones are encoded.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    previous = read_manifest(index_dir)
+    vocab = {}
+    ids = []
+    doc_len = array("i")
+    term_ids, doc_ids, tfs = array("i"), array("i"), array("H")
+    matrix = EmbeddingMatrix(index_dir, EMBEDDING_MODEL) if encode is not None else None
+    pending_ids, pending_texts = [], []
+    embedded = 0
+    facets = FacetBuilder()
+    duplicates = {}
+
+    for candidate in store.iter_candidates():
+        if candidate.get("duplicate_of"):
+            duplicates.setdefault(candidate["duplicate_of"], []).append(candidate["id"])
+            continue
+        doc = len(ids)
+        ids.append(candidate["id"])
+        tokens = tokenize(candidate["text"])
+        doc_len.append(len(tokens))
+        # Skills re-extracted from the text, so candidates ingested under older matching rules get current facets
+        facets.add(doc, resume_skills(candidate["text"]), candidate["experience_years"], candidate["education"])
+        for term, tf in Counter(tokens).items():
+            term_ids.append(vocab.setdefault(term, len(vocab)))
+            doc_ids.append(doc)
+            tfs.append(min(tf, 65535))
+        if matrix is not None and candidate["id"] not in matrix.rows:
+            pending_ids.append(candidate["id"])
+            pending_texts.append(candidate["text"])
+            if len(pending_texts) >= batch_size:
+                matrix.append(pending_ids, encode(pending_texts))
+                embedded += len(pending_ids)
+                pending_ids, pending_texts = [], []
+    if matrix is not None and pending_texts:
+        matrix.append(pending_ids, encode(pending_texts))
+        embedded += len(pending_ids)
+
+    # Group postings by term (CSR layout): term t owns rows offsets[t]:offsets[t + 1]
+    term_ids = np.frombuffer(term_ids, dtype=np.int32)
+    order = np.argsort(term_ids, kind="stable")
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_ids, minlength=len(vocab)), out=offsets[1:])
+
+    doc_len = np.frombuffer(doc_len, dtype=np.int32)
+    _save(index_dir, "postings.npz", lambda f: np.savez(
+        f, offsets=offsets, docs=np.frombuffer(doc_ids, dtype=np.int32)[order],
+        tfs=np.frombuffer(tfs, dtype=np.uint16)[order], doc_len=doc_len))
+    _save(index_dir, "facets.npz", facets.save)
+    _save(index_dir, "vocab.json", lambda f: f.write(json.dumps(vocab).encode("utf-8")))
+    _save(index_dir, "ids.json", lambda f: f.write(json.dumps(ids).encode("utf-8")))
+    _save(index_dir, "duplicates.json", lambda f: f.write(json.dumps(duplicates).encode("utf-8")))
+    # The matrix file and row map a build uses are named in its manifest, so
+    # a reader never pairs this build's files with an older manifest
+    has_embeddings = matrix is not None and len(ids) > 0
+    rows_file = None
+    if has_embeddings:
+        matrix.compact(ids)
+        rows_file = f"embedding_rows-{uuid.uuid4().hex[:12]}.npy"
+        _save(index_dir, rows_file, lambda f: np.save(f, matrix.rows_for(ids)))
+    if os.path.exists(os.path.join(index_dir, "embeddings.npy")):
+        os.remove(os.path.join(index_dir, "embeddings.npy"))  # in-memory matrix of older builds
+
+    manifest = {
+        "documents": len(ids),
+        "duplicates": sum(len(copies) for copies in duplicates.values()),
+        "terms": len(vocab),
+        "avg_doc_len": float(doc_len.mean()) if len(ids) else 0.0,
+        "embedding_model": EMBEDDING_MODEL if has_embeddings else None,
+        # Matrix shape for readers: rows appended after this build are not theirs to map
+        "embedding_rows": len(matrix) if has_embeddings else 0,
+        "embedding_dim": matrix.dim if has_embeddings else None,
+        "embedding_dtype": matrix.dtype.name if has_embeddings else None,
+        "embedding_file": matrix.vectors_file if has_embeddings else None,
+        "embedding_rows_file": rows_file,
+        "embedded": embedded,
+        "built_at": time.time(),
+    }
+    # Written last: readers only pick up a build once its manifest changes
+    _save(index_dir, "manifest.json", lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+
+    if matrix is not None:
+        # The previous build's files stay for readers that loaded its manifest
+        # just before this one replaced it; anything older goes
+        keep = {matrix.vectors_file, matrix.ids_file}
+        for built in (manifest, previous or {}):
+            keep.update(f for f in (built.get("embedding_file"), built.get("embedding_rows_file")) if f)
+        remove_unused(index_dir, keep)
+    return manifest
+
+
+def read_manifest(index_dir=CANDIDATE_INDEX_DIR):
+    """The manifest of the last build in index_dir, or None"""
+    try:
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save(index_dir, name, write):
+    """Write via a temp file and rename, so readers never see a half-written file"""
+    path = os.path.join(index_dir, name)
+    with open(path + ".tmp", "wb") as f:
+        write(f)
+    os.replace(path + ".tmp", path)
+
+
+# ---------- querying ----------
+
+class CandidateIndex:
+    """Loaded BM25 postings plus the optional (memory-mapped) embedding matrix"""
+
+    def __init__(self, index_dir=CANDIDATE_INDEX_DIR):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        with open(os.path.join(index_dir, "vocab.json")) as f:
+            self.vocab = json.load(f)
+        with open(os.path.join(index_dir, "ids.json")) as f:
+            self.ids = json.load(f)
+        duplicates_path = os.path.join(index_dir, "duplicates.json")
+        self.duplicates = {}
+        if os.path.exists(duplicates_path):
+            with open(duplicates_path) as f:
+                self.duplicates = json.load(f)
+        with np.load(os.path.join(index_dir, "postings.npz")) as postings:
+            self.offsets = postings["offsets"]
+            self.docs = postings["docs"]
+            self.tfs = postings["tfs"].astype(np.float32)
+            doc_len = postings["doc_len"]
+
+        n = len(self.ids)
+        avg_len = self.manifest["avg_doc_len"] or 1.0
+        # Per-document part of the BM25 denominator, precomputed once
+        self.length_norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)).astype(np.float32)
+        df = np.diff(self.offsets)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        # Mapped, not read: pages load on first use and are shared with every other process
+        self.embeddings = self.embedding_rows = None
+        if self.manifest.get("embedding_file"):
+            self.embedding_rows = np.load(os.path.join(index_dir, self.manifest["embedding_rows_file"]))
+            self.embeddings = map_matrix(os.path.join(index_dir, self.manifest["embedding_file"]),
+                                         self.manifest["embedding_rows"], self.manifest["embedding_dim"],
+                                         self.manifest["embedding_dtype"])
+        elif os.path.exists(os.path.join(index_dir, "embeddings.npy")):
+            # Built before the matrix file: one row per document
+            self.embeddings = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r")
+            self.embedding_rows = np.arange(len(self.ids))
+        self.facets = FacetIndex(facets_path(index_dir)) if os.path.exists(facets_path(index_dir)) else None
+
+    def bm25(self, query, k, allowed=None):
+        """Top-k (doc indexes, scores) by BM25, best first, optionally only over allowed (sorted doc indexes)"""
+        terms = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if allowed is not None and len(allowed) < SPARSE_FILTER_RATIO * len(self.ids):
+            return self._bm25_subset(terms, k, allowed)
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for t in terms:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs, tf = self.docs[start:end], self.tfs[start:end]
+            # Each doc appears once per term, so plain fancy-index += is safe
+            scores[docs] += self.idf[t] * tf * (BM25_K1 + 1) / (tf + self.length_norm[docs])
+        if allowed is not None:
+            mask = np.zeros(len(self.ids), dtype=bool)
+            mask[allowed] = True
+            scores[~mask] = 0.0
+        return self._top(scores, np.arange(len(self.ids)), k)
+
+    def _bm25_subset(self, terms, k, allowed):
+        """BM25 over a small allowed set: binary-search each term's postings (sorted by doc) for those docs"""
+        scores = np.zeros(len(allowed), dtype=np.float32)
+        for t in terms:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            postings = self.docs[start:end]
+            pos = np.searchsorted(postings, allowed)
+            hit = pos < len(postings)
+            hit[hit] = postings[pos[hit]] == allowed[hit]
+            tf = self.tfs[start:end][pos[hit]]
+            scores[hit] += self.idf[t] * tf * (BM25_K1 + 1) / (tf + self.length_norm[allowed[hit]])
+        return self._top(scores, allowed, k)
+
+    @staticmethod
+    def _top(scores, docs, k):
+        """Best k of docs (parallel to scores) with a nonzero score"""
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(scores[matched], -k)[-k:]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return docs[matched], scores[matched]
+
+    def search(self, query, limit=20, retrieve=DEFAULT_RETRIEVE, query_vector=None, timer=None, filters=None):
+        """Facet filtering, BM25 retrieval, then cosine rerank of the retrieved set by query_vector
+        (the query's unit-length embedding) when it and the embedding matrix exist.
+
+        Returns dicts with id, bm25, (when reranked) semantic scores and
+        the ids of any near-duplicates collapsed into the candidate.
+        """
+        allowed = None
+        if filters:
+            if self.facets is None:
+                raise ValueError("This index has no facets; rebuild it with candidate_index.py")
+            with timer.stage("filter") if timer else nullcontext():
+                allowed = self.facets.match(filters)
+            if not len(allowed):
+                return []
+        with timer.stage("bm25") if timer else nullcontext():
+            docs, bm25_scores = self.bm25(query, max(retrieve, limit), allowed)
+
+        semantic = None
+        if self.embeddings is not None and query_vector is not None and len(docs):
+            with timer.stage("rerank") if timer else nullcontext():
+                vectors = self.embeddings[self.embedding_rows[docs]].astype(np.float32, copy=False)
+                semantic = vectors @ query_vector
+                order = np.argsort(-semantic, kind="stable")
+                docs, bm25_scores, semantic = docs[order], bm25_scores[order], semantic[order]
+
+        results = []
+        for i in range(min(limit, len(docs))):
+            hit = {"id": self.ids[docs[i]], "bm25": round(float(bm25_scores[i]), 4)}
+            if semantic is not None:
+                hit["semantic"] = round(float(semantic[i]), 4)
+            if hit["id"] in self.duplicates:
+                hit["duplicates"] = self.duplicates[hit["id"]]
+            results.append(hit)
+        return results
+
+
+def current_index(index_dir=CANDIDATE_INDEX_DIR):
+    """The loaded index for index_dir, reloaded after a rebuild; None if it was never built"""
+    try:
+        built = os.stat(os.path.join(index_dir, "manifest.json")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _loaded.get(index_dir)
+    if cached is None or cached[0] != built:
+        with _load_lock:
+            cached = _loaded.get(index_dir)
+            if cached is None or cached[0] != built:
+                cached = _loaded[index_dir] = (built, CandidateIndex(index_dir))
+    return cached[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the candidate search indexes from the candidate store")
+    parser.add_argument("--store", default=CANDIDATE_STORE_PATH)
+    parser.add_argument("--index-dir", default=CANDIDATE_INDEX_DIR)
+    parser.add_argument("--no-embeddings", action="store_true", help="build the BM25 index only")
+    args = parser.parse_args(argv)
+
+    encode = embed_texts if EMBEDDINGS_AVAILABLE and not args.no_embeddings else None
+    started = time.perf_counter()
+    manifest = build_index(CandidateStore(args.store), args.index_dir, encode)
+    print(f"✅ Indexed {manifest['documents']} candidates, {manifest['duplicates']} near-duplicates collapsed "
+          f"({manifest['terms']} terms"
+          f"{', embeddings: ' + manifest['embedding_model'] if manifest['embedding_model'] else ', no embeddings'}"
+          f"{', ' + str(manifest['embedded']) + ' newly embedded' if manifest['embedding_model'] else ''}) "
+          f"in {time.perf_counter() - started:.1f}s -> {args.index_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from minhash import NEAR_DUPLICATE_THRESHOLD, band_keys, similarity, pack_signature, unpack_signature
+
+# Parsed resumes kept between requisitions: text, skills, experience and a
+# term vector per candidate, keyed by the SHA-256 of the original file so
+# re-ingesting the same resume (under any name) updates one row.
+#
+# Vectors come from a HashingVectorizer rather than a fitted TF-IDF: it
+# needs no shared vocabulary, so parallel ingest workers produce vectors
+# that are directly comparable with each other and with any JD.
+#
+# Each candidate also keeps a MinHash signature, bucketed by LSH band in
+# minhash_bands. A resume that nearly duplicates one already stored gets
+# duplicate_of set to that candidate's id, so indexes and rankings can
+# collapse the copies.
+
+CANDIDATE_STORE_PATH = os.environ.get("CANDIDATE_STORE_PATH", os.path.join("uploads", "candidates.sqlite3"))
+VECTOR_FEATURES = 2 ** 18
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    experience_years INTEGER,
+    education TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    ingested_at REAL NOT NULL,
+    minhash BLOB,
+    duplicate_of TEXT
+);
+CREATE TABLE IF NOT EXISTS minhash_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    candidate_id TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, candidate_id)
+);
+CREATE INDEX IF NOT EXISTS minhash_bands_candidate ON minhash_bands (candidate_id);
+"""
+
+# Columns added after the first release, created on open for older stores
+MIGRATIONS = {"minhash": "BLOB", "duplicate_of": "TEXT"}
+
+_vectorizer = HashingVectorizer(n_features=VECTOR_FEATURES, stop_words="english",
+                                alternate_sign=False, norm="l2")
+
+
+def vectorize(text):
+    """L2-normalized hashed term vector of text, packed for storage"""
+    row = _vectorizer.transform([text])
+    return pack_vector(row.indices, row.data)
+
+
+def pack_vector(indices, values):
+    """Sparse vector as count (uint32) + indices (int32) + values (float32)"""
+    count = np.array([len(indices)], dtype=np.uint32)
+    return (count.tobytes() + np.asarray(indices, dtype=np.int32).tobytes()
+            + np.asarray(values, dtype=np.float32).tobytes())
+
+
+def unpack_vector(blob):
+    """Inverse of pack_vector: (indices, values) arrays"""
+    count = int(np.frombuffer(blob, dtype=np.uint32, count=1)[0])
+    indices = np.frombuffer(blob, dtype=np.int32, count=count, offset=4)
+    values = np.frombuffer(blob, dtype=np.float32, count=count, offset=4 + 4 * count)
+    return indices, values
+
+
+class CandidateStore:
+    """SQLite table of parsed candidates"""
+
+    FIELDS = ("id", "source", "name", "text", "skills", "experience_years", "education", "vector", "ingested_at",
+              "minhash", "duplicate_of")
+
+    def __init__(self, path=CANDIDATE_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(candidates)")}
+            for column, kind in MIGRATIONS.items():
+                if column not in columns:
+                    db.execute(f"ALTER TABLE candidates ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection that commits on success and always closes"""
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def upsert_many(self, candidates):
+        """Insert or replace candidate dicts (see FIELDS) in one transaction.
+
+        Candidates carrying a "minhash" signature (numpy array) are checked
+        against the LSH buckets first; near-duplicates get "duplicate_of" set
+        on the dict as well as in the store.
+        """
+        now = time.time()
+        with self._connect() as db:
+            for c in candidates:
+                sig = c.get("minhash")
+                db.execute("DELETE FROM minhash_bands WHERE candidate_id = ?", (c["id"],))
+                if sig is not None:
+                    keys = band_keys(sig)
+                    c["duplicate_of"] = self._find_duplicate(db, c["id"], sig, keys)
+                db.execute(f"INSERT OR REPLACE INTO candidates ({', '.join(self.FIELDS)}) "
+                           f"VALUES ({', '.join('?' * len(self.FIELDS))})",
+                           (c["id"], c["source"], c["name"], c["text"], json.dumps(c["skills"]),
+                            c.get("experience_years"), c["education"], c["vector"], c.get("ingested_at", now),
+                            pack_signature(sig), c.get("duplicate_of")))
+                if sig is not None:
+                    db.executemany("INSERT OR IGNORE INTO minhash_bands (band, bucket, candidate_id) VALUES (?, ?, ?)",
+                                   [(band, key, c["id"]) for band, key in enumerate(keys)])
+        return len(candidates)
+
+    def _find_duplicate(self, db, candidate_id, sig, keys, threshold=NEAR_DUPLICATE_THRESHOLD):
+        """Id of the original this signature nearly duplicates, or None"""
+        values = ", ".join("(?, ?)" for _ in keys)
+        params = [v for band, key in enumerate(keys) for v in (band, key)]
+        rows = db.execute(
+            f"SELECT id, minhash, duplicate_of FROM candidates WHERE id IN ("
+            f"SELECT candidate_id FROM minhash_bands WHERE (band, bucket) IN (VALUES {values})) AND id != ?",
+            params + [candidate_id]).fetchall()
+        best, best_similarity = None, threshold
+        for other_id, blob, duplicate_of in rows:
+            # Point at the original, never at another copy (or back at this candidate)
+            original = duplicate_of or other_id
+            if original == candidate_id:
+                continue
+            score = similarity(sig, unpack_signature(blob))
+            if score >= best_similarity:
+                best, best_similarity = original, score
+        return best
+
+    def get(self, candidate_id):
+        with self._connect() as db:
+            row = db.execute(f"SELECT {', '.join(self.FIELDS)} FROM candidates WHERE id = ?",
+                             (candidate_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_many(self, candidate_ids, fields=FIELDS):
+        """Candidates by id, in the order given (unknown ids are skipped)"""
+        if not candidate_ids:
+            return []
+        columns = ["id"] + [f for f in fields if f != "id"]
+        with self._connect() as db:
+            rows = db.execute(f"SELECT {', '.join(columns)} FROM candidates WHERE id IN "
+                              f"({', '.join('?' * len(candidate_ids))})", list(candidate_ids)).fetchall()
+        by_id = {row[0]: self._to_dict(row, columns) for row in rows}
+        return [by_id[i] for i in candidate_ids if i in by_id]
+
+    def count(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def iter_candidates(self, batch_size=500):
+        """All candidates in id order, read in batches to bound memory"""
+        last_id = ""
+        while True:
+            with self._connect() as db:
+                rows = db.execute(f"SELECT {', '.join(self.FIELDS)} FROM candidates WHERE id > ? ORDER BY id LIMIT ?",
+                                  (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_dict(row)
+            last_id = rows[-1][0]
+
+    def _to_dict(self, row, fields=FIELDS):
+        candidate = dict(zip(fields, row))
+        if "skills" in candidate:
+            candidate["skills"] = json.loads(candidate["skills"])
+        if "minhash" in candidate:
+            candidate["minhash"] = unpack_signature(candidate["minhash"])
+        return candidate
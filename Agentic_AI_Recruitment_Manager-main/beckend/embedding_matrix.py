@@ -0,0 +1,155 @@
+import os
+import re
+import json
+import numpy as np
+
+# Candidate embeddings as one memory-mapped matrix file, shared by every
+# process that searches.
+#
+# The vectors are raw rows of float32 (or float16, EMBEDDING_DTYPE) with no
+# header, so a reader maps the file with np.memmap and starts without
+# reading or copying anything; all workers then share the same page-cache
+# pages, and a rerank only touches the rows it gathers. A sidecar text file
+# lists the candidate id of each row, in row order.
+#
+# The matrix only grows: a rebuild appends vectors for candidates it has not
+# embedded before and reuses the rows of the rest (ids are content hashes,
+# so a row never goes stale). Rows already written never change, so readers
+# can keep mapping the file while it is appended to. Anything that would
+# rewrite rows (compact() dropping candidates that left the store, or a
+# model change) starts a new generation of files instead; readers only move
+# to it through the index manifest, which names the file each build uses.
+
+EMBEDDING_DTYPE = os.environ.get("EMBEDDING_DTYPE", "float32")
+
+META_FILE = "embedding_matrix.json"
+GENERATION_FILE_RE = re.compile(r"^(embeddings|embedding_ids|embedding_rows)-[0-9a-z]+\.(bin|txt|npy)$")
+
+# Compact once fewer than this fraction of the rows belong to current candidates
+COMPACT_BELOW = 0.5
+
+
+def _path(directory, name):
+    return os.path.join(directory, name)
+
+
+def map_matrix(path, rows, dim, dtype):
+    """Read-only zero-copy view of the first rows of a matrix file"""
+    return np.memmap(path, dtype=np.dtype(dtype), mode="r", shape=(rows, dim))
+
+
+def remove_unused(directory, keep):
+    """Delete generation files (vectors, ids, row maps) in directory not named in keep; returns how many"""
+    removed = 0
+    for name in os.listdir(directory):
+        if GENERATION_FILE_RE.match(name) and name not in keep:
+            os.remove(_path(directory, name))
+            removed += 1
+    return removed
+
+
+class EmbeddingMatrix:
+    """Append-only matrix file of unit-length vectors with an id -> row map"""
+
+    def __init__(self, directory, model, dtype=EMBEDDING_DTYPE):
+        self.directory = directory
+        self.model = model
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"EMBEDDING_DTYPE must be float32 or float16, not {dtype}")
+        os.makedirs(directory, exist_ok=True)
+
+        meta = {}
+        if os.path.exists(_path(directory, META_FILE)):
+            with open(_path(directory, META_FILE)) as f:
+                meta = json.load(f)
+        self.generation = meta.get("generation", 0)
+        self.dim = meta.get("dim")
+        self.ids = []
+        if meta and (meta["model"] != model or meta["dtype"] != self.dtype.name):
+            # Vectors from another model (or precision) are no use: start a new generation
+            print(f"⚠️ Embedding matrix was built with {meta['model']} ({meta['dtype']}); re-embedding everyone.")
+            self._start_generation(self.generation + 1, None)
+        elif os.path.exists(_path(directory, self.ids_file)):
+            with open(_path(directory, self.ids_file)) as f:
+                self.ids = f.read().split()
+        self.rows = {candidate_id: row for row, candidate_id in enumerate(self.ids)}
+        # Vectors are appended before their ids, so an interrupted append can
+        # leave rows nobody has committed; cut them off
+        if self.dim is not None and os.path.exists(_path(directory, self.vectors_file)):
+            committed = len(self.ids) * self.dim * self.dtype.itemsize
+            if os.path.getsize(_path(directory, self.vectors_file)) > committed:
+                os.truncate(_path(directory, self.vectors_file), committed)
+
+    @property
+    def vectors_file(self):
+        return f"embeddings-{self.generation}.bin"
+
+    @property
+    def ids_file(self):
+        return f"embedding_ids-{self.generation}.txt"
+
+    def _write_meta(self):
+        path = _path(self.directory, META_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"model": self.model, "dtype": self.dtype.name, "dim": self.dim,
+                       "generation": self.generation}, f)
+        os.replace(path + ".tmp", path)
+
+    def _start_generation(self, generation, dim, ids=(), vectors=None):
+        """Write a complete new generation of files, then point the metadata at it"""
+        self.generation, self.dim = generation, dim
+        for name, data in ((self.vectors_file, b"" if vectors is None else vectors.tobytes()),
+                           (self.ids_file, "".join(f"{i}\n" for i in ids).encode("utf-8"))):
+            with open(_path(self.directory, name), "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        self._write_meta()
+        self.ids = list(ids)
+        self.rows = {candidate_id: row for row, candidate_id in enumerate(self.ids)}
+
+    def append(self, ids, vectors):
+        """Add one row per id; returns their row numbers"""
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError(f"Expected {len(ids)} vectors, got an array of shape {vectors.shape}")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._write_meta()
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        with open(_path(self.directory, self.vectors_file), "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(_path(self.directory, self.ids_file), "a") as f:
+            f.write("".join(f"{candidate_id}\n" for candidate_id in ids))
+
+        start = len(self.ids)
+        self.ids.extend(ids)
+        for row, candidate_id in enumerate(ids, start):
+            self.rows[candidate_id] = row
+        return list(range(start, len(self.ids)))
+
+    def rows_for(self, ids):
+        """Row of each id (int32), -1 where it has no vector"""
+        return np.fromiter((self.rows.get(i, -1) for i in ids), dtype=np.int32, count=len(ids))
+
+    def compact(self, keep_ids):
+        """Move keep_ids' rows to a new generation, if enough of the matrix is dead weight; returns whether it did.
+
+        The old generation's files stay on disk for readers of earlier builds (see remove_unused).
+        """
+        keep = [i for i in dict.fromkeys(keep_ids) if i in self.rows]
+        if not self.ids or len(keep) >= COMPACT_BELOW * len(self.ids):
+            return False
+        old = map_matrix(_path(self.directory, self.vectors_file), len(self.ids), self.dim, self.dtype)
+        vectors = np.asarray(old[self.rows_for(keep)])
+        del old
+        self._start_generation(self.generation + 1, self.dim, keep, vectors)
+        return True
+
+    def __len__(self):
+        return len(self.ids)
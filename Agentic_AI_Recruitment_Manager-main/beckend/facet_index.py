@@ -0,0 +1,145 @@
+import os
+import json
+import numpy as np
+
+# Facet filters for candidate search ("python AND kubernetes, 5+ years,
+# Master's or above"), evaluated before any scoring.
+#
+# Built by candidate_index.build_index from each resume's skills (matched as
+# whole tokens, see skills.py) and the years and education the ingester
+# already extracted, with the same document numbering as the
+# BM25 index. Each skill is a bitset over documents (one bit per candidate,
+# packed into bytes, compressed on disk), so AND/OR/NOT across skills are
+# byte-wise numpy ops. Years and education levels are kept as sorted
+# arrays, turning "at least N" into a binary search.
+
+# Ordinal levels for the labels extract_experience produces
+EDUCATION_LEVELS = {"Not specified": 0, "Bachelor's Degree": 1, "Master's Degree": 2, "MBA": 2, "PhD": 3}
+EDUCATION_ALIASES = {
+    "bachelor": 1, "bachelors": 1, "bachelor's": 1, "bachelor's degree": 1,
+    "master": 2, "masters": 2, "master's": 2, "master's degree": 2, "mba": 2,
+    "phd": 3,
+}
+
+
+def _skill_key(skill):
+    return skill.strip().lower()
+
+
+class FacetBuilder:
+    """Collects per-candidate facet values during an index build"""
+
+    def __init__(self):
+        self.skill_docs = {}
+        self.years = []
+        self.education = []
+
+    def add(self, doc, skills, years, education):
+        for skill in skills:
+            self.skill_docs.setdefault(_skill_key(skill), []).append(doc)
+        self.years.append(-1 if years is None else years)
+        self.education.append(EDUCATION_LEVELS.get(education, 0))
+
+    def save(self, f):
+        """Write the facet arrays as a compressed .npz to the open binary file f"""
+        n = len(self.years)
+        skills = sorted(self.skill_docs)
+        bits = np.zeros((len(skills), n), dtype=bool)
+        for row, skill in enumerate(skills):
+            bits[row, self.skill_docs[skill]] = True
+
+        years = np.array(self.years, dtype=np.int16)
+        education = np.array(self.education, dtype=np.int8)
+        years_order = np.argsort(years, kind="stable").astype(np.int32)
+        education_order = np.argsort(education, kind="stable").astype(np.int32)
+        np.savez_compressed(
+            f, skills=np.array(json.dumps(skills)), skill_bits=np.packbits(bits, axis=1),
+            years_order=years_order, years_sorted=years[years_order],
+            education_order=education_order, education_sorted=education[education_order])
+
+
+def parse_filters(data):
+    """Validate a filters object from a request; raises ValueError with a client-facing message"""
+    if not data:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError("'filters' must be an object")
+
+    filters = {}
+    for field in ("skills", "anySkills", "excludeSkills"):
+        value = data.get(field)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list) or not all(isinstance(s, str) for s in value):
+            raise ValueError(f"'{field}' must be a list of skill names")
+        filters[field] = [_skill_key(s) for s in value if s.strip()]
+
+    if data.get("minYears") is not None:
+        try:
+            filters["minYears"] = int(data["minYears"])
+        except (TypeError, ValueError):
+            raise ValueError("'minYears' must be an integer")
+
+    if data.get("minEducation") is not None:
+        level = EDUCATION_ALIASES.get(str(data["minEducation"]).strip().lower())
+        if level is None:
+            raise ValueError("'minEducation' must be one of Bachelor's Degree, Master's Degree, MBA, PhD")
+        filters["minEducation"] = level
+    return filters
+
+
+class FacetIndex:
+    """Loaded facet bitsets and sorted year/education indexes"""
+
+    def __init__(self, path):
+        with np.load(path) as facets:
+            skills = json.loads(str(facets["skills"]))
+            self.skill_bits = facets["skill_bits"]
+            self.years_order = facets["years_order"]
+            self.years_sorted = facets["years_sorted"]
+            self.education_order = facets["education_order"]
+            self.education_sorted = facets["education_sorted"]
+        self.skill_rows = {skill: row for row, skill in enumerate(skills)}
+        self.size = len(self.years_order)
+        self.empty = np.zeros(self.skill_bits.shape[1], dtype=np.uint8)
+
+    def _skill(self, skill):
+        row = self.skill_rows.get(skill)
+        return self.empty if row is None else self.skill_bits[row]
+
+    def _at_least(self, order, values, minimum):
+        """Packed bitset of documents whose value is >= minimum"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[order[np.searchsorted(values, minimum, side="left"):]] = True
+        return np.packbits(mask)
+
+    def match(self, filters):
+        """Sorted document indexes passing all filters, or None when nothing is filtered"""
+        if not filters:
+            return None
+        bits = None
+
+        def narrow(other):
+            nonlocal bits
+            bits = other.copy() if bits is None else np.bitwise_and(bits, other, out=bits)
+
+        for skill in filters.get("skills", ()):
+            narrow(self._skill(skill))
+        if filters.get("anySkills"):
+            narrow(np.bitwise_or.reduce([self._skill(s) for s in filters["anySkills"]]))
+        if "minYears" in filters:
+            narrow(self._at_least(self.years_order, self.years_sorted, filters["minYears"]))
+        if "minEducation" in filters:
+            narrow(self._at_least(self.education_order, self.education_sorted, filters["minEducation"]))
+        if bits is None:
+            bits = np.packbits(np.ones(self.size, dtype=bool))
+        for skill in filters.get("excludeSkills", ()):
+            np.bitwise_and(bits, np.invert(self._skill(skill)), out=bits)
+
+        return np.flatnonzero(np.unpackbits(bits, count=self.size)).astype(np.int32)
+
+
+def facets_path(index_dir):
+    return os.path.join(index_dir, "facets.npz")
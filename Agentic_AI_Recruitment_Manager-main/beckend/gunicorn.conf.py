@@ -0,0 +1,23 @@
+import os
+
+from model_preload import PRELOAD_MODELS, preload_models, after_fork
+
+# gunicorn settings for the unified backend:
+#   gunicorn -c gunicorn.conf.py unified_app:application
+# With PRELOAD_MODELS set (e.g. "minilm,sentiment"), the app and those
+# models are loaded once in the master and shared copy-on-write by every
+# worker; check with `python -m benchmarks.memory_report <master pid>`.
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+preload_app = bool(PRELOAD_MODELS)
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded (preload_app) and before any worker forks
+    if PRELOAD_MODELS:
+        preload_models()
+
+
+def post_fork(server, worker):
+    after_fork()
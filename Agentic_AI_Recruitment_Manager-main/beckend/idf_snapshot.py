@@ -0,0 +1,112 @@
+"""Corpus-wide IDF snapshots for /rank scoring.
+
+Fitting IDF on a single (resume, JD) pair gives nearly every term the same
+weight. This job computes document frequencies over the whole candidate
+store instead and saves them as a compressed, versioned snapshot that the
+ranker loads once at startup.
+
+Run from the beckend directory after ingesting resumes:
+
+    python idf_snapshot.py
+    python idf_snapshot.py --store uploads/candidates.sqlite3 --min-df 2
+
+Snapshots are written as idf-<version>.npz under IDF_SNAPSHOT_DIR and the
+newest one is loaded; set IDF_SNAPSHOT to pin a specific file.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from candidate_store import CandidateStore, CANDIDATE_STORE_PATH
+
+IDF_SNAPSHOT_DIR = os.environ.get("IDF_SNAPSHOT_DIR", os.path.join("uploads", "idf"))
+IDF_SNAPSHOT = os.environ.get("IDF_SNAPSHOT")
+
+# Tokenization shared by the snapshot and by score_similarity; bump
+# ANALYZER_VERSION whenever it changes so stale snapshots are refused
+TFIDF_ANALYZER = TfidfVectorizer(stop_words="english").build_analyzer()
+ANALYZER_VERSION = "sklearn-english-1"
+
+
+def build_snapshot(texts, min_df=2):
+    """Smoothed IDF (as TfidfVectorizer computes it) over texts, keeping terms in at least min_df documents"""
+    df = {}
+    documents = 0
+    for text in texts:
+        documents += 1
+        for term in set(TFIDF_ANALYZER(text)):
+            df[term] = df.get(term, 0) + 1
+
+    terms = sorted(t for t, count in df.items() if count >= min_df)
+    counts = np.array([df[t] for t in terms], dtype=np.float64)
+    idf = np.log((1 + documents) / (1 + counts)) + 1
+    meta = {
+        "version": time.strftime("%Y%m%dT%H%M%S"),
+        "analyzer": ANALYZER_VERSION,
+        "documents": documents,
+        "terms": len(terms),
+        "min_df": min_df,
+        # Terms below min_df (or never seen) are treated as seen in no documents
+        "default_idf": float(np.log(1 + documents) + 1),
+    }
+    return terms, idf.astype(np.float32), meta
+
+
+def save_snapshot(out_dir, terms, idf, meta):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"idf-{meta['version']}.npz")
+    with open(path + ".tmp", "wb") as f:
+        np.savez_compressed(f, terms=np.array("\n".join(terms)), idf=idf, meta=np.array(json.dumps(meta)))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def latest_snapshot_path(snapshot_dir=IDF_SNAPSHOT_DIR):
+    if not os.path.isdir(snapshot_dir):
+        return None
+    names = sorted(n for n in os.listdir(snapshot_dir) if n.startswith("idf-") and n.endswith(".npz"))
+    return os.path.join(snapshot_dir, names[-1]) if names else None
+
+
+def load_snapshot(path=None):
+    """The pinned or newest snapshot as {"idf": {term: idf}, "meta": {...}}, or None if there is none"""
+    path = path or IDF_SNAPSHOT or latest_snapshot_path()
+    if not path:
+        return None
+    with np.load(path) as snapshot:
+        meta = json.loads(str(snapshot["meta"]))
+        if meta.get("analyzer") != ANALYZER_VERSION:
+            print(f"⚠️ IDF snapshot {path} was built with analyzer {meta.get('analyzer')}; ignoring it.")
+            return None
+        terms = str(snapshot["terms"]).split("\n") if meta["terms"] else []
+        idf = dict(zip(terms, snapshot["idf"].tolist()))
+    meta["path"] = path
+    return {"idf": idf, "meta": meta}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a corpus IDF snapshot from the candidate store")
+    parser.add_argument("--store", default=CANDIDATE_STORE_PATH)
+    parser.add_argument("--out-dir", default=IDF_SNAPSHOT_DIR)
+    parser.add_argument("--min-df", type=int, default=2, help="drop terms found in fewer documents")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    store = CandidateStore(args.store)
+    terms, idf, meta = build_snapshot((c["text"] for c in store.iter_candidates()), args.min_df)
+    if not meta["documents"]:
+        print(f"❌ No candidates in {args.store}; ingest resumes first.")
+        return 1
+    path = save_snapshot(args.out_dir, terms, idf, meta)
+    print(f"✅ IDF snapshot {meta['version']}: {meta['terms']} terms from {meta['documents']} resumes "
+          f"in {time.perf_counter() - started:.1f}s -> {path} ({os.path.getsize(path) // 1024} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
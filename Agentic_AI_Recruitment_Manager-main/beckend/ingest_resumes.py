@@ -0,0 +1,228 @@
+"""Bulk-ingest a resume archive into the candidate store.
+
+Run from the beckend directory:
+
+    python ingest_resumes.py /path/to/resumes
+    python ingest_resumes.py archive.zip --workers 8 --store uploads/candidates.sqlite3
+    python ingest_resumes.py /path/to/resumes --index
+
+Files are parsed in parallel with the same extractors /rank uses and
+written to the candidate store in batches; near-duplicates of resumes
+already stored (re-applications, the same CV under another name) are
+flagged there via MinHash/LSH. Each committed batch is also
+appended to a checkpoint file, so an interrupted run picks up where it
+stopped when started again with the same arguments (--restart ignores
+the checkpoint). --index rebuilds the search and facet indexes
+(candidate_index.py) once ingestion finishes.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import zipfile
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from resume_ranker import ALLOWED, read_any, extract_experience
+from skills import resume_skills
+from candidate_store import CandidateStore, CANDIDATE_STORE_PATH, vectorize
+from minhash import signature
+
+# Zip archives opened by this worker process, reused across its tasks
+_open_zips = {}
+
+
+def list_sources(source):
+    """Resumes under a directory or inside a zip, as (key, name, path, member) in a stable order.
+
+    The key identifies one version of one file, so a checkpointed file that
+    later changes on disk is ingested again.
+    """
+    def allowed(name):
+        return "." in name and name.rsplit(".", 1)[1].lower() in ALLOWED
+
+    tasks = []
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and allowed(info.filename):
+                    key = f"{info.filename}:{info.file_size}:{info.CRC}"
+                    tasks.append((key, os.path.basename(info.filename), source, info.filename))
+    else:
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if allowed(name):
+                    path = os.path.join(root, name)
+                    st = os.stat(path)
+                    key = f"{os.path.relpath(path, source)}:{st.st_size}:{st.st_mtime_ns}"
+                    tasks.append((key, name, path, None))
+    return tasks
+
+
+def _extract_text(path, member):
+    """File bytes and extracted text; zip members go through a temp file for read_any"""
+    if member is None:
+        with open(path, "rb") as f:
+            data = f.read()
+        return data, read_any(path)
+
+    archive = _open_zips.get(path)
+    if archive is None:
+        archive = _open_zips[path] = zipfile.ZipFile(path)
+    data = archive.read(member)
+    fd, tmp = tempfile.mkstemp(suffix="." + member.rsplit(".", 1)[1].lower())
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return data, read_any(tmp)
+    finally:
+        os.remove(tmp)
+
+
+def parse_one(task):
+    """Worker: parse one resume into a candidate row"""
+    key, name, path, member = task
+    try:
+        data, text = _extract_text(path, member)
+        if not text.strip():
+            return {"key": key, "status": "empty"}
+        experience = extract_experience(text)
+        years = experience["years"].split("+")[0]
+        return {"key": key, "status": "ok", "candidate": {
+            "id": hashlib.sha256(data).hexdigest(),
+            "source": f"{path}!{member}" if member else path,
+            "name": name,
+            "text": text,
+            "skills": resume_skills(text),
+            "experience_years": int(years) if years.isdigit() else None,
+            "education": experience["education"],
+            "vector": vectorize(text),
+            "minhash": signature(text),
+        }}
+    except Exception as e:
+        return {"key": key, "status": "failed", "error": str(e)}
+
+
+def default_checkpoint(source, store_path):
+    """One checkpoint per (source, store) pair, next to the store"""
+    digest = hashlib.sha1(f"{os.path.abspath(source)}|{os.path.abspath(store_path)}".encode()).hexdigest()[:12]
+    return os.path.join(os.path.dirname(os.path.abspath(store_path)), f"ingest_{digest}.checkpoint")
+
+
+def load_checkpoint(path):
+    """Keys already handled by a previous run"""
+    done = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["key"])
+                except (ValueError, KeyError):
+                    pass  # torn last line from an interrupted write
+    return done
+
+
+class Progress:
+    def __init__(self, total, interval=1.0):
+        self.total = total
+        self.interval = interval
+        self.counts = {"ok": 0, "empty": 0, "failed": 0}
+        self.duplicates = 0
+        self.started = time.perf_counter()
+        self.last_print = 0.0
+
+    def update(self, status):
+        self.counts[status] += 1
+        now = time.perf_counter()
+        if now - self.last_print >= self.interval:
+            self.last_print = now
+            self.print(end="\r")
+
+    def print(self, end="\n"):
+        done = sum(self.counts.values())
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed else 0.0
+        eta = (self.total - done) / rate if rate else 0.0
+        print(f"📥 {done}/{self.total} files  {rate:.1f} files/s  ETA {eta:.0f}s  "
+              f"({self.counts['empty']} empty, {self.counts['failed']} failed, {self.duplicates} near-duplicates)",
+              end=end, flush=True)
+
+
+def ingest(source, store, checkpoint_path, workers=None, batch_size=50, restart=False):
+    """Parse every pending resume in source into store; returns the progress counts"""
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    done = load_checkpoint(checkpoint_path)
+    tasks = [t for t in list_sources(source) if t[0] not in done]
+    if done:
+        print(f"↩️ Resuming: {len(done)} files already ingested, {len(tasks)} to go")
+
+    progress = Progress(len(tasks))
+    batch = []
+
+    def commit(checkpoint):
+        # Store first, checkpoint second: a crash in between only re-parses the batch
+        candidates = [r["candidate"] for r in batch if r["status"] == "ok"]
+        store.upsert_many(candidates)
+        progress.duplicates += sum(1 for c in candidates if c.get("duplicate_of"))
+        for r in batch:
+            checkpoint.write(json.dumps({"key": r["key"], "status": r["status"], "error": r.get("error")}) + "\n")
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+        batch.clear()
+
+    with open(checkpoint_path, "a") as checkpoint, ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for result in pool.map(parse_one, tasks, chunksize=4):
+                batch.append(result)
+                progress.update(result["status"])
+                if result["status"] == "failed":
+                    print(f"\n⚠️ {result['key']}: {result['error']}")
+                if len(batch) >= batch_size:
+                    commit(checkpoint)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            commit(checkpoint)
+            progress.print()
+            print("⏸️ Interrupted; rerun the same command to resume.")
+            raise
+        commit(checkpoint)
+    progress.print()
+    return progress.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest a directory or zip of resumes into the candidate store")
+    parser.add_argument("source", help="directory or .zip of PDF/DOCX resumes")
+    parser.add_argument("--store", default=CANDIDATE_STORE_PATH, help="candidate store SQLite path")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: derived from source and store)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parser processes")
+    parser.add_argument("--batch-size", type=int, default=50, help="files per store commit")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and ingest everything")
+    parser.add_argument("--index", action="store_true", help="rebuild the candidate search and facet indexes afterwards")
+    parser.add_argument("--index-dir", help="index directory for --index (default: candidate_index.py's)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        print(f"❌ No such file or directory: {args.source}")
+        return 2
+
+    store = CandidateStore(args.store)
+    checkpoint = args.checkpoint or default_checkpoint(args.source, args.store)
+    try:
+        counts = ingest(args.source, store, checkpoint, args.workers, args.batch_size, args.restart)
+    except KeyboardInterrupt:
+        return 130
+    print(f"✅ Ingested {counts['ok']} resumes into {args.store} ({store.count()} candidates total)")
+    if args.index:
+        import candidate_index
+        index_args = ["--store", args.store] + (["--index-dir", args.index_dir] if args.index_dir else [])
+        return candidate_index.main(index_args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
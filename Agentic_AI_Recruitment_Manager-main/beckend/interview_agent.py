@@ -1,146 +1,184 @@
 import os
+import re
+import json
+import time
 import uuid
 import random
 from datetime import datetime
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from results_index import ResultsIndex
+from caches import LRUCache, SemanticCache, key_digest, text_vector
+from metrics import interview_grading_seconds, interview_context_tokens
+from interview_context import InterviewContext, estimate_tokens
+from llm_guard import LLMGuard, LLM_TIMEOUT
+
+# Latency budget for grading a whole transcript in one call (deferred mode)
+LLM_BATCH_TIMEOUT = float(os.environ.get("LLM_BATCH_TIMEOUT", 3 * LLM_TIMEOUT))
 
 # Try to import ollama for AI-powered interviews
 try:
-    from ollama import chat
+    from ollama import Client, AsyncClient
+    # The HTTP timeout only reclaims abandoned calls; callers stop waiting
+    # at their own budget through ollama_guard
+    client = Client(timeout=max(LLM_TIMEOUT, LLM_BATCH_TIMEOUT))
+    async_client = AsyncClient(timeout=max(LLM_TIMEOUT, LLM_BATCH_TIMEOUT))
     OLLAMA_AVAILABLE = True
 except ImportError:
     OLLAMA_AVAILABLE = False
     print("⚠️ Ollama not installed. Using rule-based interview system.")
 
+# Every model call goes through this budget and circuit breaker
+ollama_guard = LLMGuard("ollama")
+
 app = Flask(__name__)
 CORS(app)
 
 # In-memory storage for interview sessions
 interview_sessions = {}
 
-# Question bank organized by skill
-QUESTION_BANK = {
-    "react": [
-        "What is the difference between state and props in React?",
-        "Explain the concept of React hooks and give examples.",
-        "How does the Virtual DOM work in React?",
-        "What are React lifecycle methods? Name a few.",
-        "Explain the useEffect hook and its use cases.",
-        "What is the difference between controlled and uncontrolled components?",
-        "How do you optimize performance in React applications?",
-        "What is Redux and when would you use it?"
-    ],
-    "javascript": [
-        "Explain the difference between let, const, and var.",
-        "What is closure in JavaScript? Give an example.",
-        "Explain promises and async/await in JavaScript.",
-        "What is the event loop in JavaScript?",
-        "Explain the difference between == and === operators.",
-        "What are arrow functions and how do they differ from regular functions?",
-        "Explain prototypal inheritance in JavaScript.",
-        "What is the 'this' keyword in JavaScript?"
-    ],
-    "typescript": [
-        "What are the benefits of using TypeScript over JavaScript?",
-        "Explain interfaces and types in TypeScript.",
-        "What are generics in TypeScript?",
-        "How does TypeScript handle type inference?",
-        "What is the difference between 'any' and 'unknown' types?",
-        "Explain union and intersection types.",
-        "What are decorators in TypeScript?",
-        "How do you handle null and undefined in TypeScript?"
-    ],
-    "python": [
-        "Explain the difference between lists and tuples in Python.",
-        "What are decorators in Python?",
-        "Explain list comprehensions with an example.",
-        "What is the difference between deep copy and shallow copy?",
-        "Explain Python's GIL (Global Interpreter Lock).",
-        "What are generators in Python?",
-        "Explain the difference between @staticmethod and @classmethod.",
-        "What is the purpose of __init__ and __new__ methods?"
-    ],
-    "node.js": [
-        "What is Node.js and how does it work?",
-        "Explain the event-driven architecture of Node.js.",
-        "What is the difference between synchronous and asynchronous code?",
-        "Explain middleware in Express.js.",
-        "What is npm and what is package.json?",
-        "How do you handle errors in Node.js?",
-        "Explain streams in Node.js.",
-        "What is the purpose of the cluster module?"
-    ],
-    "sql": [
-        "What is the difference between INNER JOIN and OUTER JOIN?",
-        "Explain normalization and denormalization.",
-        "What are indexes and why are they important?",
-        "Explain the difference between DELETE, TRUNCATE, and DROP.",
-        "What is a primary key and foreign key?",
-        "Explain ACID properties in databases.",
-        "What are stored procedures?",
-        "Explain the difference between WHERE and HAVING clauses."
-    ],
-    "general": [
-        "Tell me about a challenging project you worked on.",
-        "How do you approach debugging complex issues?",
-        "Describe your experience with version control systems.",
-        "How do you stay updated with new technologies?",
-        "Explain your approach to code reviews.",
-        "How do you handle tight deadlines?",
-        "Describe a time when you had to learn a new technology quickly.",
-        "What's your experience with agile methodologies?"
-    ]
-}
+# Question/answer pairs per session, indexed as messages are appended
+session_transcripts = {}
+
+# Token-bounded conversation context (rolling summary + recent turns) per session
+session_contexts = {}
+
+# Memoized results payloads per session, dropped whenever the session changes
+results_cache = {}
+
+# Summary rows of completed interviews, sorted by completion time and score
+completed_results = ResultsIndex()
+
+# Model grades of answers, reused when the same answer to the same question
+# comes back. The semantic layer (off by default) also reuses the grade of
+# a near-identical answer, at or above EVAL_SEMANTIC_SIMILARITY
+EVAL_CACHE_SIZE = int(os.environ.get("EVAL_CACHE_SIZE", 4096))
+EVAL_SEMANTIC_CACHE = os.environ.get("EVAL_SEMANTIC_CACHE", "").lower() in ("1", "true", "yes")
+EVAL_SEMANTIC_CACHE_SIZE = int(os.environ.get("EVAL_SEMANTIC_CACHE_SIZE", 4096))
+EVAL_SEMANTIC_SIMILARITY = float(os.environ.get("EVAL_SEMANTIC_SIMILARITY", 0.95))
+
+evaluation_cache = LRUCache(EVAL_CACHE_SIZE, "evaluation")
+evaluation_semantic_cache = (SemanticCache(EVAL_SEMANTIC_CACHE_SIZE, EVAL_SEMANTIC_SIMILARITY,
+                                           "evaluation_semantic", text_vector)
+                             if EVAL_SEMANTIC_CACHE else None)
+
+# How answers are graded: "per-turn" asks the model after every answer;
+# "deferred" grades the whole transcript in one request when the interview
+# ends. A start request may pick either with "gradingMode"
+GRADING_MODES = ("per-turn", "deferred")
+INTERVIEW_GRADING_MODE = os.environ.get("INTERVIEW_GRADING_MODE", "per-turn")
+
+# Page size bounds for /api/interview/all-results. Without a limit it returns
+# the first 100 results, not every one; follow nextCursor for the rest
+DEFAULT_RESULTS_LIMIT = 100
+MAX_RESULTS_LIMIT = 1000
+
+# Question bank organized by skill, with the aliases each skill is known by
+QUESTION_BANK_PATH = os.environ.get(
+    "QUESTION_BANK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.json")
+)
+
+def normalize_skill(skill):
+    """Canonical form of a skill name ("Node.js", "node js" -> "nodejs")"""
+    return re.sub(r"[\s._\-/]+", "", skill.lower())
 
-def generate_ai_question(skill, previous_qa=None):
+def load_question_bank(path):
+    """Load the question bank file and build its normalized alias index"""
+    with open(path, "r", encoding="utf-8") as f:
+        skills = json.load(f)["skills"]
+    
+    bank = {key: entry["questions"] for key, entry in skills.items()}
+    aliases = {}
+    for key, entry in skills.items():
+        for alias in [key] + entry.get("aliases", []):
+            aliases[normalize_skill(alias)] = key
+    return bank, aliases
+
+QUESTION_BANK, SKILL_ALIASES = load_question_bank(QUESTION_BANK_PATH)
+
+# Per-session shuffled question decks, drawn from without replacement
+session_question_decks = {}
+
+def build_question_prompt(skill, previous_qa=None):
+    """Build the LLM prompt that asks for the next interview question"""
+    context = f"You are conducting a technical interview for a {skill} position."
+    if previous_qa:
+        context += f"\n\nPrevious conversation:\n{previous_qa}"
+    
+    return f"{context}\n\nGenerate one concise technical interview question about {skill}. Only return the question, nothing else."
+
+def parse_question_response(response):
+    """Extract the question from an Ollama chat response, or None"""
+    if response and "message" in response and "content" in response["message"]:
+        question = response["message"]["content"].strip()
+        # Remove any quotes or extra formatting
+        return question.strip('"\'')
+    return None
+
+def generate_ai_question(skill, previous_qa=None, session_id=None):
     """Generate a question using AI based on skill and conversation history"""
     if not OLLAMA_AVAILABLE:
-        return get_fallback_question(skill)
-    
-    try:
-        context = f"You are conducting a technical interview for a {skill} position."
-        if previous_qa:
-            context += f"\n\nPrevious conversation:\n{previous_qa}"
-        
-        prompt = f"{context}\n\nGenerate one concise technical interview question about {skill}. Only return the question, nothing else."
-        
-        response = chat(
-            model="llama2",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        if response and "message" in response and "content" in response["message"]:
-            question = response["message"]["content"].strip()
-            # Remove any quotes or extra formatting
-            question = question.strip('"\'')
-            return question
-        else:
-            return get_fallback_question(skill)
-    except Exception as e:
-        print(f"Error generating AI question: {e}")
-        return get_fallback_question(skill)
-
-def get_fallback_question(skill):
-    """Get a question from the question bank"""
-    skill_lower = skill.lower()
-    
-    # Find matching skill in question bank
-    for key in QUESTION_BANK.keys():
-        if key in skill_lower or skill_lower in key:
-            questions = QUESTION_BANK[key]
-            return random.choice(questions)
-    
-    # Default to general questions if skill not found
-    return random.choice(QUESTION_BANK["general"])
+        return get_fallback_question(skill, session_id)
+    
+    prompt = build_question_prompt(skill, previous_qa)
+    response = ollama_guard.call("question", lambda: client.chat(
+        model="llama2",
+        messages=[{"role": "user", "content": prompt}]
+    ), key=prompt)
+    return parse_question_response(response) or get_fallback_question(skill, session_id)
 
-def evaluate_answer_ai(question, answer, skill):
-    """Evaluate answer using AI"""
+async def generate_ai_question_async(skill, previous_qa=None, session_id=None):
+    """Async variant of generate_ai_question for the ASGI backend"""
     if not OLLAMA_AVAILABLE:
-        return evaluate_answer_fallback(answer)
+        return get_fallback_question(skill, session_id)
+    
+    prompt = build_question_prompt(skill, previous_qa)
+    response = await ollama_guard.call_async("question", lambda: async_client.chat(
+        model="llama2",
+        messages=[{"role": "user", "content": prompt}]
+    ), key=prompt)
+    return parse_question_response(response) or get_fallback_question(skill, session_id)
+
+def resolve_skill(skill):
+    """Map a free-form skill name to its question bank key"""
+    key = SKILL_ALIASES.get(normalize_skill(skill))
+    if key:
+        return key
+    
+    # Fall back to individual words, e.g. "Senior React Developer" -> react
+    for token in re.split(r"[\s,;/()]+", skill):
+        key = SKILL_ALIASES.get(normalize_skill(token))
+        if key:
+            return key
     
-    try:
-        prompt = f"""You are evaluating a technical interview answer.
+    # Default to general questions if skill not found
+    return "general"
+
+def get_fallback_question(skill, session_id=None):
+    """Get a question from the question bank, never repeating one within a session"""
+    key = resolve_skill(skill)
+    if session_id is None:
+        return random.choice(QUESTION_BANK[key])
+    
+    decks = session_question_decks.setdefault(session_id, {})
+    for bank in (key, "general"):
+        if bank not in decks:
+            deck = list(QUESTION_BANK[bank])
+            random.shuffle(deck)
+            decks[bank] = deck
+        if decks[bank]:
+            return decks[bank].pop()
+    
+    # Every question has been asked already; start a fresh deck for the skill
+    deck = list(QUESTION_BANK[key])
+    random.shuffle(deck)
+    decks[key] = deck
+    return deck.pop()
+
+def build_evaluation_prompt(question, answer, skill):
+    """Build the LLM prompt that grades one answer"""
+    return f"""You are evaluating a technical interview answer.
 Question: {question}
 Candidate's Answer: {answer}
 Skill being tested: {skill}
@@ -153,35 +191,301 @@ Format your response as:
 Score: X
 Feedback: Your feedback here"""
 
-        response = chat(
-            model="llama2",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        if response and "message" in response and "content" in response["message"]:
-            content = response["message"]["content"].strip()
-            
-            # Parse score and feedback
-            score = 5  # default
-            feedback = "Answer received."
-            
-            lines = content.split('\n')
-            for line in lines:
-                if line.startswith('Score:'):
-                    try:
-                        score = int(line.split(':')[1].strip())
-                        score = max(0, min(10, score))  # Clamp between 0-10
-                    except:
-                        pass
-                elif line.startswith('Feedback:'):
-                    feedback = line.split(':', 1)[1].strip()
-            
-            return {"score": score, "feedback": feedback}
-        else:
-            return evaluate_answer_fallback(answer)
-    except Exception as e:
-        print(f"Error evaluating answer: {e}")
+def parse_evaluation_response(response):
+    """Extract score and feedback from an Ollama chat response, or None"""
+    if not (response and "message" in response and "content" in response["message"]):
+        return None
+    
+    content = response["message"]["content"].strip()
+    
+    # Parse score and feedback
+    score = 5  # default
+    feedback = "Answer received."
+    
+    lines = content.split('\n')
+    for line in lines:
+        if line.startswith('Score:'):
+            try:
+                score = int(line.split(':')[1].strip())
+                score = max(0, min(10, score))  # Clamp between 0-10
+            except:
+                pass
+        elif line.startswith('Feedback:'):
+            feedback = line.split(':', 1)[1].strip()
+    
+    return {"score": score, "feedback": feedback}
+
+def cached_evaluation(question, answer, skill):
+    """Model grade of the same (or, with the semantic layer, a near-identical) answer to this question, or None"""
+    evaluation = evaluation_cache.get(key_digest(skill, question or "", answer))
+    if evaluation is None and evaluation_semantic_cache is not None:
+        hit = evaluation_semantic_cache.lookup(answer, scope=key_digest(skill, question or ""))
+        evaluation = hit[0] if hit else None
+    # Copies, since sessions keep the evaluation dicts they are given
+    return dict(evaluation) if evaluation else None
+
+def store_evaluation(question, answer, skill, evaluation, seconds):
+    """Cache a model grade; returns it, or the rule-based grade when the model gave none"""
+    if evaluation is None:
         return evaluate_answer_fallback(answer)
+    evaluation_cache.put(key_digest(skill, question or "", answer), dict(evaluation))
+    if evaluation_semantic_cache is not None:
+        evaluation_semantic_cache.put(answer, dict(evaluation), seconds, scope=key_digest(skill, question or ""))
+    return evaluation
+
+def evaluate_answer_ai(question, answer, skill):
+    """Evaluate answer using AI; returns (evaluation, requests that reached the model)"""
+    if not OLLAMA_AVAILABLE:
+        return evaluate_answer_fallback(answer), 0
+    
+    cached = cached_evaluation(question, answer, skill)
+    if cached:
+        return cached, 0
+    
+    started = time.perf_counter()
+    prompt = build_evaluation_prompt(question, answer, skill)
+    # The guard only runs chat() when the request really goes out (not
+    # short-circuited, rejected or coalesced into another session's call)
+    sent = []
+    def chat():
+        sent.append(prompt)
+        return client.chat(model="llama2", messages=[{"role": "user", "content": prompt}])
+    response = ollama_guard.call("evaluation", chat, key=prompt)
+    evaluation = parse_evaluation_response(response)
+    return store_evaluation(question, answer, skill, evaluation, time.perf_counter() - started), len(sent)
+
+async def evaluate_answer_ai_async(question, answer, skill):
+    """Async variant of evaluate_answer_ai for the ASGI backend"""
+    if not OLLAMA_AVAILABLE:
+        return evaluate_answer_fallback(answer), 0
+    
+    cached = cached_evaluation(question, answer, skill)
+    if cached:
+        return cached, 0
+    
+    started = time.perf_counter()
+    prompt = build_evaluation_prompt(question, answer, skill)
+    sent = []
+    def chat():
+        sent.append(prompt)
+        return async_client.chat(model="llama2", messages=[{"role": "user", "content": prompt}])
+    response = await ollama_guard.call_async("evaluation", chat, key=prompt)
+    evaluation = parse_evaluation_response(response)
+    return store_evaluation(question, answer, skill, evaluation, time.perf_counter() - started), len(sent)
+
+def evaluation_cache_stats():
+    return {
+        "exact": evaluation_cache.stats(),
+        "semantic": evaluation_semantic_cache.stats() if evaluation_semantic_cache is not None else None,
+    }
+
+# Structured output for batch grading; Ollama constrains the reply to it
+BATCH_EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evaluations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "question": {"type": "integer"},
+                    "score": {"type": "integer"},
+                    "feedback": {"type": "string"}
+                },
+                "required": ["question", "score", "feedback"]
+            }
+        }
+    },
+    "required": ["evaluations"]
+}
+
+def build_batch_evaluation_prompt(items):
+    """Build the LLM prompt that grades several (question, answer, skill) items at once"""
+    blocks = "\n\n".join(
+        f"Question {i} (skill: {skill}): {question}\nCandidate's Answer {i}: {answer}"
+        for i, (question, answer, skill) in enumerate(items, 1)
+    )
+    return f"""You are evaluating the answers from a technical interview.
+Grade each answer on its own, against its question and skill.
+
+{blocks}
+
+For every question give:
+1. A score from 0-10
+2. Brief feedback (2-3 sentences)
+
+Respond with JSON only, in the form:
+{{"evaluations": [{{"question": 1, "score": X, "feedback": "Your feedback here"}}]}}"""
+
+def parse_batch_evaluation_response(response, count):
+    """Per-item {score, feedback} from a batch grading response, None where an item is missing"""
+    evaluations = [None] * count
+    if not (response and "message" in response and "content" in response["message"]):
+        return evaluations
+    
+    content = response["message"]["content"].strip()
+    match = re.search(r"\{.*\}", content, re.DOTALL)
+    try:
+        items = json.loads(match.group(0) if match else content).get("evaluations", [])
+    except (ValueError, AttributeError):
+        return evaluations
+    
+    for position, item in enumerate(items if isinstance(items, list) else []):
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("question", position + 1)) - 1
+            score = max(0, min(10, int(item["score"])))  # Clamp between 0-10
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= index < count and evaluations[index] is None:
+            evaluations[index] = {"score": score, "feedback": str(item.get("feedback") or "Answer received.").strip()}
+    return evaluations
+
+def question_skill(session, number):
+    """Skill a question number tests, cycling through the session's skills"""
+    return session["skills"][min(number - 1, len(session["skills"]) - 1)]
+
+def ungraded_answers(session):
+    """(question, answer message, skill) for answers still waiting for a deferred grade"""
+    return [
+        (question_msg["content"], answer_msg, question_skill(session, question_msg["questionNumber"]))
+        for question_msg, answer_msg in session_transcripts.get(session["id"], [])
+        if answer_msg and answer_msg.get("evaluation") is None
+    ]
+
+def begin_batch_grading(session):
+    """Split ungraded answers into cached grades and the items the model must grade; None if nothing is pending"""
+    pending = ungraded_answers(session)
+    if not pending:
+        return None
+    batch = {"pending": pending, "evaluations": [], "items": [], "slots": []}
+    for slot, (question, answer_msg, skill) in enumerate(pending):
+        cached = cached_evaluation(question, answer_msg["content"], skill) if OLLAMA_AVAILABLE else None
+        batch["evaluations"].append(cached)
+        if cached is None:
+            batch["items"].append((question, answer_msg["content"], skill))
+            batch["slots"].append(slot)
+    return batch
+
+def finish_batch_grading(session, batch, results, seconds, requests):
+    """Store the batch grades on the answers and rebuild the session scores in question order"""
+    share = seconds / len(batch["items"]) if batch["items"] else 0.0
+    for slot, item, evaluation in zip(batch["slots"], batch["items"], results):
+        question, answer, skill = item
+        batch["evaluations"][slot] = (store_evaluation(question, answer, skill, evaluation, share)
+                                      if OLLAMA_AVAILABLE else evaluate_answer_fallback(answer))
+    for (_, answer_msg, _), evaluation in zip(batch["pending"], batch["evaluations"]):
+        answer_msg["evaluation"] = evaluation
+    
+    session["scores"] = [
+        answer_msg["evaluation"]["score"]
+        for _, answer_msg in session_transcripts.get(session["id"], [])
+        if answer_msg and answer_msg.get("evaluation")
+    ]
+    record_grading(session, seconds, requests)
+    invalidate_results(session["id"])
+
+def grade_transcript(session):
+    """Grade every ungraded answer of a deferred session in one LLM request; returns the model requests sent"""
+    batch = begin_batch_grading(session)
+    if batch is None:
+        return 0
+    results, started, sent = [None] * len(batch["items"]), time.perf_counter(), []
+    if batch["items"] and OLLAMA_AVAILABLE:
+        prompt = build_batch_evaluation_prompt(batch["items"])
+        def chat():
+            sent.append(prompt)
+            return client.chat(model="llama2", messages=[{"role": "user", "content": prompt}],
+                               format=BATCH_EVALUATION_SCHEMA)
+        response = ollama_guard.call("batch_grading", chat, LLM_BATCH_TIMEOUT, key=prompt)
+        results = parse_batch_evaluation_response(response, len(batch["items"]))
+    finish_batch_grading(session, batch, results, time.perf_counter() - started, len(sent))
+    return len(sent)
+
+async def grade_transcript_async(session):
+    """Async variant of grade_transcript for the ASGI backend"""
+    batch = begin_batch_grading(session)
+    if batch is None:
+        return 0
+    results, started, sent = [None] * len(batch["items"]), time.perf_counter(), []
+    if batch["items"] and OLLAMA_AVAILABLE:
+        prompt = build_batch_evaluation_prompt(batch["items"])
+        def chat():
+            sent.append(prompt)
+            return async_client.chat(model="llama2", messages=[{"role": "user", "content": prompt}],
+                                     format=BATCH_EVALUATION_SCHEMA)
+        response = await ollama_guard.call_async("batch_grading", chat, LLM_BATCH_TIMEOUT, key=prompt)
+        results = parse_batch_evaluation_response(response, len(batch["items"]))
+    finish_batch_grading(session, batch, results, time.perf_counter() - started, len(sent))
+    return len(sent)
+
+def record_grading(session, seconds, requests):
+    """Add grading time and the model requests it took to the session's running totals"""
+    grading = session["grading"]
+    grading["requests"] += requests
+    grading["seconds"] = round(grading["seconds"] + seconds, 4)
+
+def grade_turn(turn):
+    """Grade the answer just given, or None when the session is graded in one batch at the end"""
+    session = turn["session"]
+    if session["grading"]["mode"] == "deferred":
+        if turn["isLast"]:
+            grade_transcript(session)
+        return None
+    
+    started = time.perf_counter()
+    evaluation, requests = evaluate_answer_ai(turn["question"], turn["answer"], turn["skill"])
+    record_grading(session, time.perf_counter() - started, requests)
+    return evaluation
+
+async def grade_turn_async(turn):
+    """Async variant of grade_turn for the ASGI backend"""
+    session = turn["session"]
+    if session["grading"]["mode"] == "deferred":
+        if turn["isLast"]:
+            await grade_transcript_async(session)
+        return None
+    
+    started = time.perf_counter()
+    evaluation, requests = await evaluate_answer_ai_async(turn["question"], turn["answer"], turn["skill"])
+    record_grading(session, time.perf_counter() - started, requests)
+    return evaluation
+
+def session_to_finish(data):
+    """Session an end request refers to when it still has answers to grade, else None"""
+    session = interview_sessions.get((data or {}).get('sessionId'))
+    if not session or session["status"] == "completed":
+        return None
+    return session if ungraded_answers(session) else None
+
+def append_message(session, msg):
+    """Append a message to a session and index it into the Q&A transcript"""
+    session["messages"].append(msg)
+    pairs = session_transcripts.setdefault(session["id"], [])
+    if msg["role"] == "interviewer" and "questionNumber" in msg:
+        pairs.append([msg, None])
+    elif msg["role"] == "candidate" and pairs and pairs[-1][1] is None:
+        pairs[-1][1] = msg
+    invalidate_results(session["id"])
+
+def invalidate_results(session_id):
+    """Drop the memoized results payload after a session changes"""
+    results_cache.pop(session_id, None)
+
+def record_completion(session):
+    """Write the summary row for a completed session into the results index"""
+    avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else 0
+    completed_results.add({
+        "sessionId": session["id"],
+        "candidateId": session["candidateId"],
+        "candidateName": session["candidateName"],
+        "overallScore": round((avg_score / 10) * 100),
+        "questionsAnswered": len(session["scores"]),
+        "totalQuestions": session["totalQuestions"],
+        "completedAt": session["completedAt"]
+    })
+    interview_grading_seconds.observe(session["grading"]["seconds"], mode=session["grading"]["mode"])
 
 def evaluate_answer_fallback(answer):
     """Simple rule-based answer evaluation"""
@@ -196,87 +500,100 @@ def evaluate_answer_fallback(answer):
     else:
         return {"score": 9, "feedback": "Comprehensive and detailed answer."}
 
-@app.route('/api/interview/start', methods=['POST'])
-def start_interview():
-    """Start a new interview session"""
-    data = request.get_json()
+# ---------- request handling shared by the Flask and ASGI routes ----------
+# Each helper returns plain dicts (and a status code for errors) so both
+# frameworks can serialize them; LLM calls happen between the steps.
+
+def prepare_start(data):
+    """Validate a start request; returns (params, error)"""
     candidate_id = data.get('candidateId')
     candidate_name = data.get('candidateName', 'Candidate')
     skills = data.get('skills', [])
     num_questions = data.get('numQuestions', 5)
+    grading_mode = data.get('gradingMode', INTERVIEW_GRADING_MODE)
     
     if not candidate_id or not skills:
-        return jsonify({"error": "candidateId and skills are required"}), 400
+        return None, ({"error": "candidateId and skills are required"}, 400)
     
-    # Create new session
-    session_id = str(uuid.uuid4())
+    if grading_mode not in GRADING_MODES:
+        return None, ({"error": f"gradingMode must be one of {', '.join(GRADING_MODES)}"}, 400)
     
-    # Generate first question
-    first_skill = skills[0] if skills else "general"
-    first_question = generate_ai_question(first_skill)
+    return {
+        # Create new session
+        "sessionId": str(uuid.uuid4()),
+        "candidateId": candidate_id,
+        "candidateName": candidate_name,
+        "skills": skills,
+        "numQuestions": num_questions,
+        "gradingMode": grading_mode,
+        "firstSkill": skills[0] if skills else "general"
+    }, None
+
+def open_session(params, first_question):
+    """Create the session with its opening messages; returns the start response"""
+    session_id = params["sessionId"]
+    candidate_name = params["candidateName"]
+    skills = params["skills"]
+    num_questions = params["numQuestions"]
     
     session = {
         "id": session_id,
-        "candidateId": candidate_id,
+        "candidateId": params["candidateId"],
         "candidateName": candidate_name,
         "skills": skills,
-        "messages": [
-            {
-                "id": str(uuid.uuid4()),
-                "role": "interviewer",
-                "content": f"Hello {candidate_name}! I'll be conducting your interview today. We'll be focusing on {', '.join(skills)}. Let's begin!",
-                "timestamp": datetime.now().isoformat()
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "role": "interviewer",
-                "content": first_question,
-                "timestamp": datetime.now().isoformat(),
-                "questionNumber": 1
-            }
-        ],
+        "messages": [],
         "currentQuestion": 1,
         "totalQuestions": num_questions,
         "scores": [],
+        # Grading requests sent and seconds spent grading, for comparing modes
+        "grading": {"mode": params["gradingMode"], "requests": 0, "seconds": 0.0},
         "status": "active",
         "startedAt": datetime.now().isoformat()
     }
+    append_message(session, {
+        "id": str(uuid.uuid4()),
+        "role": "interviewer",
+        "content": f"Hello {candidate_name}! I'll be conducting your interview today. We'll be focusing on {', '.join(skills)}. Let's begin!",
+        "timestamp": datetime.now().isoformat()
+    })
+    append_message(session, {
+        "id": str(uuid.uuid4()),
+        "role": "interviewer",
+        "content": first_question,
+        "timestamp": datetime.now().isoformat(),
+        "questionNumber": 1
+    })
     
     interview_sessions[session_id] = session
     
-    return jsonify({
+    return {
         "sessionId": session_id,
         "message": session["messages"][-1],
         "progress": {
             "current": 1,
             "total": num_questions
         }
-    })
+    }
 
-@app.route('/api/interview/answer', methods=['POST'])
-def submit_answer():
-    """Submit an answer and get the next question"""
-    data = request.get_json()
+def prepare_answer(data):
+    """Validate an answer and add it to its session; returns (turn, error)"""
     session_id = data.get('sessionId')
     answer = data.get('answer', '').strip()
     
     if not session_id or session_id not in interview_sessions:
-        return jsonify({"error": "Invalid session ID"}), 404
+        return None, ({"error": "Invalid session ID"}, 404)
     
     if not answer:
-        return jsonify({"error": "Answer is required"}), 400
+        return None, ({"error": "Answer is required"}, 400)
     
     session = interview_sessions[session_id]
     
     if session["status"] != "active":
-        return jsonify({"error": "Interview session is not active"}), 400
+        return None, ({"error": "Interview session is not active"}, 400)
     
     # Get the last question
-    last_question = None
-    for msg in reversed(session["messages"]):
-        if msg["role"] == "interviewer" and "questionNumber" in msg:
-            last_question = msg["content"]
-            break
+    pairs = session_transcripts.get(session_id)
+    last_question = pairs[-1][0]["content"] if pairs else None
     
     # Add candidate's answer to messages
     answer_msg = {
@@ -285,15 +602,26 @@ def submit_answer():
         "content": answer,
         "timestamp": datetime.now().isoformat()
     }
-    session["messages"].append(answer_msg)
+    append_message(session, answer_msg)
     
-    # Evaluate the answer
-    current_skill = session["skills"][min(session["currentQuestion"] - 1, len(session["skills"]) - 1)]
-    evaluation = evaluate_answer_ai(last_question, answer, current_skill)
+    return {
+        "session": session,
+        "answerMsg": answer_msg,
+        "question": last_question,
+        "answer": answer,
+        "skill": question_skill(session, session["currentQuestion"]),
+        "isLast": session["currentQuestion"] >= session["totalQuestions"]
+    }, None
+
+def apply_evaluation(turn, evaluation):
+    """Store an answer's evaluation; returns the completion response, or None if another question follows"""
+    session = turn["session"]
     
-    # Store evaluation
-    answer_msg["evaluation"] = evaluation
-    session["scores"].append(evaluation["score"])
+    # Store evaluation (deferred sessions are graded in one batch instead)
+    if evaluation is not None:
+        turn["answerMsg"]["evaluation"] = evaluation
+        session["scores"].append(evaluation["score"])
+        invalidate_results(session["id"])
     
     # Check if interview is complete
     if session["currentQuestion"] >= session["totalQuestions"]:
@@ -311,29 +639,30 @@ def submit_answer():
             "content": f"Thank you for completing the interview! Your overall score is {final_score}%. We'll review your responses and get back to you soon.",
             "timestamp": datetime.now().isoformat()
         }
-        session["messages"].append(completion_msg)
+        append_message(session, completion_msg)
+        record_completion(session)
         
-        return jsonify({
+        return {
             "message": completion_msg,
             "evaluation": evaluation,
             "completed": True,
             "finalScore": final_score
-        })
+        }
     
-    # Generate next question
+    # Move on to the next question
     session["currentQuestion"] += 1
-    next_skill = session["skills"][min(session["currentQuestion"] - 1, len(session["skills"]) - 1)]
-    
-    # Build conversation context for AI
-    previous_qa = "\n".join([
-        f"Q: {msg['content']}" if msg['role'] == 'interviewer' and 'questionNumber' in msg
-        else f"A: {msg['content']}" if msg['role'] == 'candidate'
-        else ""
-        for msg in session["messages"][-6:]  # Last 3 Q&A pairs
-    ])
-    
-    next_question = generate_ai_question(next_skill, previous_qa)
-    
+    turn["nextSkill"] = session["skills"][min(session["currentQuestion"] - 1, len(session["skills"]) - 1)]
+    
+    # Build conversation context for AI, bounded however long the interview runs
+    context = session_contexts.setdefault(session["id"], InterviewContext())
+    context.add_turn(turn["question"], turn["answer"], turn["skill"], evaluation["score"] if evaluation else None)
+    turn["previousQa"] = context.render()
+    interview_context_tokens.observe(estimate_tokens(turn["previousQa"]))
+    return None
+
+def add_next_question(turn, evaluation, next_question):
+    """Append the generated follow-up question; returns the answer response"""
+    session = turn["session"]
     question_msg = {
         "id": str(uuid.uuid4()),
         "role": "interviewer",
@@ -341,9 +670,9 @@ def submit_answer():
         "timestamp": datetime.now().isoformat(),
         "questionNumber": session["currentQuestion"]
     }
-    session["messages"].append(question_msg)
+    append_message(session, question_msg)
     
-    return jsonify({
+    return {
         "message": question_msg,
         "evaluation": evaluation,
         "completed": False,
@@ -351,13 +680,12 @@ def submit_answer():
             "current": session["currentQuestion"],
             "total": session["totalQuestions"]
         }
-    })
+    }
 
-@app.route('/api/interview/session/<session_id>', methods=['GET'])
-def get_session(session_id):
-    """Get interview session details"""
+def session_details(session_id):
+    """Session details with the running score; returns (body, status)"""
     if session_id not in interview_sessions:
-        return jsonify({"error": "Session not found"}), 404
+        return {"error": "Session not found"}, 404
     
     session = interview_sessions[session_id]
     
@@ -367,46 +695,39 @@ def get_session(session_id):
         avg_score = sum(session["scores"]) / len(session["scores"])
         current_score = round((avg_score / 10) * 100)
     
-    return jsonify({
+    return {
         "session": session,
         "currentScore": current_score
-    })
+    }, 200
 
-@app.route('/api/interview/end', methods=['POST'])
-def end_interview():
-    """End an interview session early"""
-    data = request.get_json()
+def finish_session(data):
+    """Mark a session completed early; returns (body, status)"""
     session_id = data.get('sessionId')
     
     if not session_id or session_id not in interview_sessions:
-        return jsonify({"error": "Invalid session ID"}), 404
+        return {"error": "Invalid session ID"}, 404
     
     session = interview_sessions[session_id]
-    session["status"] = "completed"
-    session["completedAt"] = datetime.now().isoformat()
+    # Ending a completed session again changes nothing: it keeps its
+    # completedAt, results index row and grading observation
+    if session["status"] != "completed":
+        session["status"] = "completed"
+        session["completedAt"] = datetime.now().isoformat()
+        invalidate_results(session_id)
+        record_completion(session)
     
     # Calculate final score
     avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else 0
     final_score = round((avg_score / 10) * 100)
     
-    return jsonify({
+    return {
         "sessionId": session_id,
         "finalScore": final_score,
         "questionsAnswered": len(session["scores"])
-    })
-
-@app.route('/health', methods=['GET'])
-def health():
-    return jsonify({"status": "ok", "ollama": OLLAMA_AVAILABLE})
+    }, 200
 
-@app.route('/api/interview/results/<session_id>', methods=['GET'])
-def get_interview_results(session_id):
-    """Get detailed interview results with analysis"""
-    if session_id not in interview_sessions:
-        return jsonify({"error": "Session not found"}), 404
-    
-    session = interview_sessions[session_id]
-    
+def build_interview_results(session):
+    """Build the results payload for a session from its indexed transcript"""
     # Calculate overall score
     avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else 0
     overall_score = round((avg_score / 10) * 100)
@@ -458,36 +779,20 @@ def get_interview_results(session_id):
     else:
         recommendation = "Not Recommended - Weak Performance"
     
-    # Build transcript
+    # Build transcript from the indexed question/answer pairs
     transcript = []
-    question_num = 1
-    for msg in session["messages"]:
-        if msg["role"] == "interviewer" and "questionNumber" in msg:
-            question = msg["content"]
-            # Find corresponding answer
-            answer_msg = None
-            eval_data = None
-            for next_msg in session["messages"][session["messages"].index(msg)+1:]:
-                if next_msg["role"] == "candidate":
-                    answer_msg = next_msg
-                    eval_data = next_msg.get("evaluation")
-                    break
-            
-            if answer_msg:
-                transcript.append({
-                    "question": question,
-                    "answer": answer_msg["content"],
-                    "score": eval_data["score"] if eval_data else 0,
-                    "feedback": eval_data["feedback"] if eval_data else ""
-                })
-    
-    # Calculate duration
-    start_time = datetime.fromisoformat(session["startedAt"])
-    end_time = datetime.fromisoformat(session.get("completedAt", datetime.now().isoformat()))
-    duration_minutes = round((end_time - start_time).total_seconds() / 60)
+    for question_msg, answer_msg in session_transcripts.get(session["id"], []):
+        if answer_msg:
+            eval_data = answer_msg.get("evaluation")
+            transcript.append({
+                "question": question_msg["content"],
+                "answer": answer_msg["content"],
+                "score": eval_data["score"] if eval_data else 0,
+                "feedback": eval_data["feedback"] if eval_data else ""
+            })
     
-    return jsonify({
-        "sessionId": session_id,
+    return {
+        "sessionId": session["id"],
         "candidateId": session["candidateId"],
         "candidateName": session["candidateName"],
         "skills": session["skills"],
@@ -498,35 +803,139 @@ def get_interview_results(session_id):
         "strengths": strengths if strengths else ["Completed interview"],
         "weaknesses": weaknesses if weaknesses else ["No significant gaps identified"],
         "recommendation": recommendation,
-        "completedAt": session.get("completedAt", datetime.now().isoformat()),
-        "duration": f"{duration_minutes} minutes",
+        "grading": dict(session["grading"]),
         "transcript": transcript
-    })
+    }
+
+def interview_results(session_id):
+    """Detailed results for a session, memoized until it changes; returns (body, status)"""
+    if session_id not in interview_sessions:
+        return {"error": "Session not found"}, 404
+    
+    session = interview_sessions[session_id]
+    
+    # Reuse the memoized payload until the session changes
+    results = results_cache.get(session_id)
+    if results is None:
+        results = build_interview_results(session)
+        results_cache[session_id] = results
+    
+    # Duration keeps ticking until the interview completes, so it is never cached
+    completed_at = session.get("completedAt", datetime.now().isoformat())
+    start_time = datetime.fromisoformat(session["startedAt"])
+    end_time = datetime.fromisoformat(completed_at)
+    duration_minutes = round((end_time - start_time).total_seconds() / 60)
+    
+    return {
+        **results,
+        "completedAt": completed_at,
+        "duration": f"{duration_minutes} minutes"
+    }, 200
+
+def query_all_results(args):
+    """One page of completed interview summaries for the given query args; returns (body, status)"""
+    try:
+        limit = int(args.get('limit', DEFAULT_RESULTS_LIMIT))
+        min_score = int(args['minScore']) if 'minScore' in args else None
+        max_score = int(args['maxScore']) if 'maxScore' in args else None
+    except ValueError:
+        return {"error": "limit, minScore and maxScore must be integers"}, 400
+    
+    if limit < 1:
+        return {"error": "limit must be positive"}, 400
+    
+    try:
+        results, next_cursor = completed_results.query(
+            sort=args.get('sort', 'completedAt'),
+            order=args.get('order', 'desc'),
+            min_score=min_score,
+            max_score=max_score,
+            since=args.get('since'),
+            until=args.get('until'),
+            cursor=args.get('cursor'),
+            limit=min(limit, MAX_RESULTS_LIMIT)
+        )
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    return {
+        "results": results,
+        "count": len(results),
+        "total": len(completed_results),
+        "nextCursor": next_cursor
+    }, 200
+
+
+# ---------- Flask routes ----------
+
+@app.route('/api/interview/start', methods=['POST'])
+def start_interview():
+    """Start a new interview session"""
+    params, error = prepare_start(request.get_json())
+    if error:
+        return jsonify(error[0]), error[1]
+    
+    # Generate first question
+    first_question = generate_ai_question(params["firstSkill"], session_id=params["sessionId"])
+    return jsonify(open_session(params, first_question))
+
+@app.route('/api/interview/answer', methods=['POST'])
+def submit_answer():
+    """Submit an answer and get the next question"""
+    turn, error = prepare_answer(request.get_json())
+    if error:
+        return jsonify(error[0]), error[1]
+    
+    # Evaluate the answer
+    evaluation = grade_turn(turn)
+    completion = apply_evaluation(turn, evaluation)
+    if completion:
+        return jsonify(completion)
+    
+    # Generate next question
+    next_question = generate_ai_question(turn["nextSkill"], turn["previousQa"], turn["session"]["id"])
+    return jsonify(add_next_question(turn, evaluation, next_question))
+
+@app.route('/api/interview/session/<session_id>', methods=['GET'])
+def get_session(session_id):
+    """Get interview session details"""
+    body, status = session_details(session_id)
+    return jsonify(body), status
+
+@app.route('/api/interview/end', methods=['POST'])
+def end_interview():
+    """End an interview session early"""
+    data = request.get_json()
+    session = session_to_finish(data)
+    if session:
+        grade_transcript(session)
+    body, status = finish_session(data)
+    return jsonify(body), status
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({"status": "ok", "ollama": OLLAMA_AVAILABLE, "llm": ollama_guard.stats(),
+                    "evaluationCache": evaluation_cache_stats()})
+
+@app.route('/api/interview/results/<session_id>', methods=['GET'])
+def get_interview_results(session_id):
+    """Get detailed interview results with analysis"""
+    body, status = interview_results(session_id)
+    return jsonify(body), status
 
 @app.route('/api/interview/all-results', methods=['GET'])
 def get_all_results():
-    """Get all completed interview results"""
-    completed_sessions = [
-        session for session in interview_sessions.values()
-        if session["status"] == "completed"
-    ]
-    
-    results = []
-    for session in completed_sessions:
-        avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else 0
-        overall_score = round((avg_score / 10) * 100)
-        
-        results.append({
-            "sessionId": session["id"],
-            "candidateId": session["candidateId"],
-            "candidateName": session["candidateName"],
-            "overallScore": overall_score,
-            "questionsAnswered": len(session["scores"]),
-            "totalQuestions": session["totalQuestions"],
-            "completedAt": session.get("completedAt", "")
-        })
-    
-    return jsonify({"results": results, "count": len(results)})
+    """Get a page of completed interview results from the summary index.
+
+    Query args: sort (completedAt | overallScore), order (asc | desc),
+    minScore/maxScore (inclusive percentages), since (inclusive) and until
+    (exclusive) ISO timestamps, limit (default 100, at most 1000) and cursor.
+    Results come one page at a time, so callers that expect every result in
+    one response must pass each response's nextCursor back as cursor until
+    it is null.
+    """
+    body, status = query_all_results(request.args)
+    return jsonify(body), status
 
 if __name__ == '__main__':
     print("🎤 Interview Agent API starting...")
@@ -0,0 +1,111 @@
+import os
+import re
+from collections import Counter
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# Bounded conversation context for next-question prompts. The last few
+# question/answer turns are kept verbatim (clipped), and older turns are
+# folded into one summary line each as they leave that window, so the
+# context stays within a fixed token budget however long the interview
+# runs. Summary lines are extractive (question, answer key terms, score)
+# rather than model-written, so keeping them costs no extra LLM call.
+
+# Estimated tokens the previous-conversation block may use
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("INTERVIEW_CONTEXT_TOKENS", 384))
+# Turns kept verbatim before being summarized
+RECENT_TURNS = int(os.environ.get("INTERVIEW_RECENT_TURNS", 2))
+
+MAX_QUESTION_TOKENS = 60
+MAX_ANSWER_TOKENS = 120
+MIN_ANSWER_TOKENS = 60
+SUMMARY_QUESTION_TOKENS = 20
+MAX_SUMMARY_LINES = 8
+KEY_TERMS = 5
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English with llama2's tokenizer)"""
+    return (len(text) + 3) // 4
+
+
+def clip(text, max_tokens):
+    """text cut at a word boundary to about max_tokens, marked with an ellipsis when cut"""
+    text = " ".join(text.split())
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+
+
+def key_terms(text, limit=KEY_TERMS):
+    """Most frequent non-stopword terms of an answer, in first-seen order"""
+    words = [w for w in re.findall(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]", text.lower())
+             if len(w) > 2 and w not in ENGLISH_STOP_WORDS]
+    top = {w for w, _ in Counter(words).most_common(limit)}
+    return [w for w in dict.fromkeys(words) if w in top]
+
+
+class InterviewContext:
+    """Rolling summary plus recent turns for one interview session"""
+
+    def __init__(self, budget=CONTEXT_TOKEN_BUDGET, recent_turns=RECENT_TURNS):
+        self.budget = budget
+        self.recent_turns = max(1, recent_turns)
+        self.turns = 0
+        self.recent = []  # (number, question, answer, skill, score)
+        self.summary = []  # (skill, line), oldest first
+        self.earlier_skills = []  # skills of turns dropped from the summary
+
+    def add_turn(self, question, answer, skill, score=None):
+        """Record an answered question, summarizing whatever leaves the recent window"""
+        self.turns += 1
+        self.recent.append((self.turns, question or "", answer, skill, score))
+        while len(self.recent) > self.recent_turns:
+            self._summarize(self.recent.pop(0))
+
+    def _summarize(self, turn):
+        number, question, answer, skill, score = turn
+        terms = key_terms(answer)
+        line = f"Q{number} ({skill}): {clip(question, SUMMARY_QUESTION_TOKENS)}"
+        line += f" | answer covered: {', '.join(terms)}" if terms else " | answer was brief"
+        if score is not None:
+            line += f" | score {score}/10"
+        self.summary.append((skill, line))
+        while len(self.summary) > MAX_SUMMARY_LINES:
+            self._forget_oldest(self.summary, self.earlier_skills)
+
+    @staticmethod
+    def _forget_oldest(summary, earlier_skills):
+        skill, _ = summary.pop(0)
+        if skill not in earlier_skills:
+            earlier_skills.append(skill)
+
+    def _format(self, summary, earlier_skills, answer_tokens):
+        parts = []
+        if earlier_skills:
+            parts.append(f"Earlier topics: {', '.join(earlier_skills)}")
+        if summary:
+            parts.append("Summary of earlier questions:\n" + "\n".join(f"- {line}" for _, line in summary))
+        recent = "\n".join(f"Q: {clip(question, MAX_QUESTION_TOKENS)}\nA: {clip(answer, answer_tokens)}"
+                           for _, question, answer, _, _ in self.recent)
+        if recent:
+            parts.append(("Most recent:\n" if parts else "") + recent)
+        return "\n\n".join(parts)
+
+    def render(self):
+        """Previous-conversation text for the next question prompt, within the token budget"""
+        summary, earlier_skills = list(self.summary), list(self.earlier_skills)
+        answer_tokens = MAX_ANSWER_TOKENS
+        text = self._format(summary, earlier_skills, answer_tokens)
+        # Shrink recent answers first, then drop the oldest summary lines
+        while estimate_tokens(text) > self.budget:
+            if answer_tokens > MIN_ANSWER_TOKENS:
+                answer_tokens = max(MIN_ANSWER_TOKENS, answer_tokens // 2)
+            elif summary:
+                self._forget_oldest(summary, earlier_skills)
+            else:
+                return clip(text, self.budget)
+            text = self._format(summary, earlier_skills, answer_tokens)
+        return text
@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from caches import SingleFlight, key_digest
+from metrics import llm_calls, llm_call_latency, llm_breaker_state
+
+# Latency budgets and a circuit breaker for calls to the local model.
+#
+# Every call gets a deadline; when it passes (or the call raises) the
+# caller gets None and serves its rule-based fallback instead, so a slow
+# or stalled Ollama bounds a turn's latency rather than blocking it.
+# After LLM_BREAKER_FAILURES consecutive failures the breaker opens and
+# calls short-circuit straight to the fallback; after LLM_BREAKER_COOLDOWN
+# seconds one probe call is let through (half-open), and its outcome
+# closes the breaker again or restarts the cooldown.
+#
+# Calls given a key (their prompt) are also coalesced: identical requests
+# arriving while one is in flight wait for it rather than adding load.
+#
+# Blocking calls run on at most LLM_MAX_IN_FLIGHT threads. A call arriving
+# when all of them are busy is rejected at once (the caller falls back)
+# instead of queueing, so the budget only ever times the model itself and
+# local congestion is never counted against the breaker.
+
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 30))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", 3))
+LLM_BREAKER_COOLDOWN = float(os.environ.get("LLM_BREAKER_COOLDOWN", 30))
+# Threads available to blocking calls; a stalled call keeps its thread
+# until the HTTP client's own timeout ends it
+LLM_MAX_IN_FLIGHT = int(os.environ.get("LLM_MAX_IN_FLIGHT", 8))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, name, failures=LLM_BREAKER_FAILURES, cooldown=LLM_BREAKER_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failures
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        llm_breaker_state.set(STATE_VALUES[CLOSED], name=name)
+
+    def _set_state(self, state):
+        self.state = state
+        llm_breaker_state.set(STATE_VALUES[state], name=self.name)
+
+    def allow(self):
+        """Whether a call may go to the model now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != OPEN:
+                    print(f"⚠️ {self.name}: circuit open after {self.failures} failed calls; using fallbacks.")
+                self._set_state(OPEN)
+
+    def stats(self):
+        return {"state": self.state, "consecutiveFailures": self.failures}
+
+
+class LLMGuard:
+    """Runs model calls under a latency budget behind a circuit breaker"""
+
+    def __init__(self, name, timeout=LLM_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(name)
+        self.flights = SingleFlight(name)
+        self._executor = ThreadPoolExecutor(max_workers=LLM_MAX_IN_FLIGHT, thread_name_prefix=f"{name}-call")
+        # Held from submit until the call really ends (not just its budget), so
+        # a submitted call always has a thread and never waits in the pool queue
+        self._slots = threading.BoundedSemaphore(LLM_MAX_IN_FLIGHT)
+
+    def _finish(self, kind, result, started, error=None):
+        llm_calls.inc(kind=kind, result=result)
+        llm_call_latency.observe(time.perf_counter() - started, kind=kind)
+        if result == "ok":
+            self.breaker.record_success()
+            return
+        self.breaker.record_failure()
+        print(f"❌ {self.name} {kind} call failed ({result}): {error}")
+
+    def call(self, kind, fn, timeout=None, key=None):
+        """fn() within the budget, or None on timeout, error, an open circuit or no free call thread.
+
+        Concurrent calls with the same kind and key share one fn() call.
+        """
+        if key is not None:
+            return self.flights.do(key_digest(kind, key), lambda: self.call(kind, fn, timeout))
+        if not self._slots.acquire(blocking=False):
+            llm_calls.inc(kind=kind, result="rejected")
+            return None
+        if not self.breaker.allow():
+            self._slots.release()
+            llm_calls.inc(kind=kind, result="short_circuit")
+            return None
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        future = self._executor.submit(fn)
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            response = future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._finish(kind, "timeout", started, f"no response within {timeout:g}s")
+            return None
+        except Exception as e:
+            self._finish(kind, "error", started, e)
+            return None
+        self._finish(kind, "ok", started)
+        return response
+
+    async def call_async(self, kind, factory, timeout=None, key=None):
+        """Await factory() within the budget, or None on timeout, error or an open circuit"""
+        if key is not None:
+            return await self.flights.do_async(key_digest(kind, key), lambda: self.call_async(kind, factory, timeout))
+        if not self.breaker.allow():
+            llm_calls.inc(kind=kind, result="short_circuit")
+            return None
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(factory(), timeout)
+        except asyncio.TimeoutError:
+            self._finish(kind, "timeout", started, f"no response within {timeout:g}s")
+            return None
+        except Exception as e:
+            self._finish(kind, "error", started, e)
+            return None
+        self._finish(kind, "ok", started)
+        return response
+
+    def stats(self):
+        return {"timeoutSeconds": self.timeout, **self.breaker.stats()}
@@ -0,0 +1,269 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Minimal Prometheus-style metrics (counters, gauges, histograms) rendered
+# in the text exposition format. Each process keeps its own registry, so
+# with several gunicorn workers every scrape sees one worker's numbers.
+
+# Latency buckets in seconds, from fast dict lookups up to slow LLM turns
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Payload size buckets in bytes, up to multi-resume uploads
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# Estimated prompt token buckets, around the interview context budget
+TOKEN_BUCKETS = (32, 64, 128, 256, 384, 512, 1024, 2048, 4096)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = (("le", _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics by name and renders them for a /metrics scrape"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by the backends
+REGISTRY = Registry()
+
+# Content type Prometheus expects from a text-format scrape
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---------- HTTP request metrics ----------
+
+HTTP_LABELS = ("method", "route")
+
+http_requests = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status code", HTTP_LABELS + ("status",))
+http_errors = REGISTRY.counter(
+    "http_request_errors_total", "HTTP requests that raised or returned a 5xx", HTTP_LABELS)
+http_in_flight = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", HTTP_LABELS)
+http_latency = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is sent", HTTP_LABELS)
+http_request_size = REGISTRY.histogram(
+    "http_request_size_bytes", "HTTP request body size", HTTP_LABELS, SIZE_BUCKETS)
+http_response_size = REGISTRY.histogram(
+    "http_response_size_bytes", "HTTP response body size", HTTP_LABELS, SIZE_BUCKETS)
+
+
+def record_request(method, route, status, duration, request_size, response_size, failed=False):
+    """Record one finished HTTP request"""
+    http_requests.inc(method=method, route=route, status=str(status))
+    http_latency.observe(duration, method=method, route=route)
+    http_request_size.observe(request_size, method=method, route=route)
+    http_response_size.observe(response_size, method=method, route=route)
+    if failed or status >= 500:
+        http_errors.inc(method=method, route=route)
+
+
+# ---------- caches ----------
+
+cache_requests = REGISTRY.counter(
+    "cache_requests_total", "In-process cache lookups by cache and result (hit or miss)", ("cache", "result"))
+cache_saved_seconds = REGISTRY.counter(
+    "cache_saved_seconds_total", "Time the cached work originally took, summed over cache hits", ("cache",))
+coalesced_requests = REGISTRY.counter(
+    "coalesced_requests_total",
+    "Duplicate concurrent requests that joined an identical in-flight call instead of starting one; "
+    "rate() gives duplicates per second", ("group",))
+
+
+# ---------- LLM calls ----------
+
+llm_calls = REGISTRY.counter(
+    "llm_calls_total", "Model calls by kind and result (ok, timeout, error, short_circuit, rejected)", ("kind", "result"))
+llm_call_latency = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Time until a model call returned, failed or hit its latency budget", ("kind",))
+llm_breaker_state = REGISTRY.gauge(
+    "llm_circuit_state", "Circuit breaker state per model backend (0 closed, 1 open, 2 half-open)", ("name",))
+
+
+# ---------- interview prompts and grading ----------
+
+interview_context_tokens = REGISTRY.histogram(
+    "interview_context_tokens", "Estimated tokens of conversation context sent with each next-question prompt",
+    buckets=TOKEN_BUCKETS)
+
+interview_grading_seconds = REGISTRY.histogram(
+    "interview_grading_seconds", "Time spent grading answers per completed interview, by grading mode", ("mode",))
+
+
+# ---------- pipeline stage timing ----------
+
+rank_stage_latency = REGISTRY.histogram(
+    "rank_stage_duration_seconds", "Time spent per resume in each /rank pipeline stage", ("stage",))
+
+
+class StageTimer:
+    """Accumulates wall time per named stage of one request.
+
+    Only plain floats are kept, so a timer's ``stages`` can be sent back
+    from a worker process and merged into the request's timer.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, stages):
+        for name, seconds in stages.items():
+            self.add(name, seconds)
+
+    def observe(self, histogram):
+        """Feed each stage duration into a histogram labelled by stage"""
+        for name, seconds in self.stages.items():
+            histogram.observe(seconds, stage=name)
+
+    def as_ms(self):
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+
+    def server_timing(self):
+        """Value for a Server-Timing response header"""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items())
+
+
+def wants_timings(value):
+    """Whether a request flag such as ?timings=1 asks for timing details"""
+    return str(value or "").lower() in ("1", "true", "yes")
@@ -0,0 +1,112 @@
+import os
+import re
+import zlib
+import hashlib
+import numpy as np
+
+# Near-duplicate detection for resumes: MinHash signatures over word
+# shingles, bucketed by LSH bands so a lookup only compares against the few
+# resumes that share a band instead of the whole pool.
+#
+# With 16 bands of 8 rows, pairs above ~0.8 Jaccard similarity almost always
+# share a bucket and pairs below ~0.5 almost never do; bucket matches are
+# then confirmed against NEAR_DUPLICATE_THRESHOLD using the signatures.
+
+NUM_PERM = 128
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.85))
+
+# Universal hashing (a*x + b) mod p; with p < 2^31 the products fit in uint64.
+# The seed is fixed so signatures stay comparable across processes and runs.
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, (1 << 31) - 1, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, (1 << 31) - 1, NUM_PERM).astype(np.uint64)
+
+
+def shingles(text):
+    """Overlapping SHINGLE_SIZE-word sequences of the normalized text"""
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """MinHash signature (NUM_PERM uint32 values), or None for text without words"""
+    items = shingles(text)
+    if not items:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & 0x7FFFFFFF for s in items),
+                         dtype=np.uint64, count=len(items))
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of the two shingle sets"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def band_keys(sig):
+    """One signed 64-bit bucket key per band (fits an SQLite INTEGER)"""
+    keys = []
+    for band in range(LSH_BANDS):
+        chunk = sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def pack_signature(sig):
+    return None if sig is None else sig.astype(np.uint32).tobytes()
+
+
+def unpack_signature(blob):
+    return None if blob is None else np.frombuffer(blob, dtype=np.uint32)
+
+
+class BatchDeduplicator:
+    """In-memory LSH over the resumes of one request"""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = {}
+
+    def check(self, item, sig):
+        """(earlier item, similarity) if sig nearly duplicates one, else None; unique items are remembered"""
+        if sig is None:
+            return None
+        keys = band_keys(sig)
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self.buckets.get((band, key), ()))
+        best = max(((other, similarity(sig, self.signatures[other])) for other in candidates),
+                   key=lambda pair: pair[1], default=None)
+        if best is not None and best[1] >= self.threshold:
+            return best
+        self.signatures[item] = sig
+        for band, key in enumerate(keys):
+            self.buckets.setdefault((band, key), []).append(item)
+        return None
+
+
+def duplicate_result(name, duplicate):
+    """Placeholder for a resume that nearly duplicates file number duplicate[0] of the same batch"""
+    original, score = duplicate
+    return {"resume": name, "duplicateOf": original, "similarity": round(score, 3)}
+
+
+def collapse_duplicates(results):
+    """Fold duplicate placeholders into the result of the file they duplicate.
+
+    results is a batch's results in file order, or a {file number: result}
+    dict when only some of its files have results yet.
+    """
+    by_file = results if isinstance(results, dict) else dict(enumerate(results))
+    for result in by_file.values():
+        if "duplicateOf" in result and result["duplicateOf"] in by_file:
+            by_file[result["duplicateOf"]].setdefault("duplicates", []).append(
+                {"resume": result["resume"], "similarity": result["similarity"]})
+    return [r for r in by_file.values() if "duplicateOf" not in r]
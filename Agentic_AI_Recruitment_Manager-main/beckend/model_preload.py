@@ -0,0 +1,84 @@
+import gc
+import os
+import sys
+import time
+import importlib
+
+# Load ML models once in the gunicorn master so forked workers share them.
+#
+# Without preloading, each worker imports sentence-transformers/transformers
+# and reads its own copy of the weights, so memory grows with the worker
+# count. Loaded before fork, the weight tensors sit in pages every worker
+# maps copy-on-write; inference only reads them, so the pages stay shared.
+# What does get written after fork is Python object headers: the cyclic GC
+# touches every tracked object on each collection, which would copy the
+# pages holding them into each worker. gc.freeze() moves everything loaded
+# so far out of the collector's reach before the fork.
+#
+# Enabled by gunicorn.conf.py when PRELOAD_MODELS names models, e.g.
+#   PRELOAD_MODELS=minilm,sentiment gunicorn -c gunicorn.conf.py unified_app:application
+
+PRELOAD_MODELS = [m.strip() for m in os.environ.get("PRELOAD_MODELS", "").split(",") if m.strip()]
+# Intra-op threads per worker; torch otherwise starts one per core in every worker
+TORCH_THREADS = int(os.environ.get("TORCH_THREADS", 1))
+
+
+def _load_minilm():
+    import candidate_index
+    if not candidate_index.EMBEDDINGS_AVAILABLE:
+        return None
+    return candidate_index.load_embedding_model()
+
+
+def _load_sentiment():
+    # Its pipeline is built at import time
+    return importlib.import_module("Intelligent_layer.sentiment_analyzer").analyzer.model
+
+
+MODEL_LOADERS = {
+    "minilm": _load_minilm,
+    "sentiment": _load_sentiment,
+}
+
+
+def _freeze_weights(model):
+    """Inference-only mode: no autograd state is ever written next to the weights"""
+    if hasattr(model, "eval"):
+        model.eval()
+    if hasattr(model, "parameters"):
+        for param in model.parameters():
+            param.requires_grad_(False)
+
+
+def preload_models(names=None):
+    """Load the named models (default PRELOAD_MODELS) and freeze the heap for fork; returns the names loaded"""
+    loaded = []
+    for name in names if names is not None else PRELOAD_MODELS:
+        loader = MODEL_LOADERS.get(name)
+        if loader is None:
+            print(f"⚠️ Unknown model '{name}' in PRELOAD_MODELS; expected one of {', '.join(MODEL_LOADERS)}.")
+            continue
+        started = time.perf_counter()
+        try:
+            model = loader()
+        except ImportError as e:
+            print(f"⚠️ Cannot preload {name}: {e}")
+            continue
+        if model is None:
+            print(f"⚠️ Cannot preload {name}: its dependencies are not installed.")
+            continue
+        _freeze_weights(model)
+        loaded.append(name)
+        print(f"✅ Preloaded {name} in {time.perf_counter() - started:.1f}s")
+
+    # Collect once, then keep the collector away from everything loaded so far
+    gc.collect()
+    gc.freeze()
+    return loaded
+
+
+def after_fork():
+    """Per-worker setup once forked from a preloading master"""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(TORCH_THREADS)
@@ -0,0 +1,85 @@
+import os
+import PyPDF2
+
+# PDF text extraction backends. Each backend is a generator of page texts,
+# so extract_pdf_text can stop reading as soon as the page or character
+# limit is reached instead of parsing the whole document.
+#
+# PyPDF2 is the default and always available; pypdfium2 (pip install
+# pypdfium2) is much faster, pdfminer.six (pip install pdfminer.six) is
+# slower but handles odd layouts well. Pick one with PDF_BACKEND.
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+try:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+except ImportError:
+    extract_pages = None
+
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pypdf2").lower()
+# 0 means no limit
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 0))
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", 0))
+
+
+def pages_pypdf2(path):
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for p in reader.pages:
+            yield p.extract_text() or ""
+
+
+def pages_pypdfium2(path):
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def pages_pdfminer(path):
+    for page in extract_pages(path):
+        yield "".join(el.get_text() for el in page if isinstance(el, LTTextContainer))
+
+
+PDF_BACKENDS = {"pypdf2": pages_pypdf2}
+if pypdfium2 is not None:
+    PDF_BACKENDS["pypdfium2"] = pages_pypdfium2
+if extract_pages is not None:
+    PDF_BACKENDS["pdfminer"] = pages_pdfminer
+
+if PDF_BACKEND not in PDF_BACKENDS:
+    print(f"⚠️ PDF backend '{PDF_BACKEND}' is not installed; using pypdf2. Available: {', '.join(PDF_BACKENDS)}")
+    PDF_BACKEND = "pypdf2"
+
+
+def extract_pdf_text(path, backend=None, max_pages=None, max_chars=None):
+    """Page texts joined by newlines, stopping early at max_pages / max_chars (0 = unlimited)"""
+    pages = PDF_BACKENDS[backend or PDF_BACKEND](path)
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+
+    text, size = [], 0
+    try:
+        for i, page_text in enumerate(pages):
+            if max_pages and i >= max_pages:
+                break
+            text.append(page_text)
+            size += len(page_text) + 1
+            if max_chars and size >= max_chars:
+                break
+    finally:
+        pages.close()  # release the document now when we stop early
+    joined = "\n".join(text)
+    return joined[:max_chars] if max_chars else joined
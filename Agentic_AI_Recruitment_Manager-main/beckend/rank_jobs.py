@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from minhash import BatchDeduplicator, duplicate_result, collapse_duplicates, pack_signature, unpack_signature
+
+# Background ranking jobs for batches too large for a single /rank request.
+# Jobs and their per-file results live in SQLite, so a restarted process
+# picks unfinished jobs back up and only ranks the files still pending.
+# Ranking runs in a small, low-priority process pool, separate from the
+# processes serving interactive requests. As in /rank, each file is parsed
+# first and only scored if it is not a near-duplicate of an earlier file of
+# the same job; the signatures of ranked files are stored, so a resumed job
+# still recognises copies of files ranked before the restart. A job's
+# uploaded files are
+# deleted once it completes or fails (its results stay in the table), and
+# a periodic sweep removes any folders a crashed process left behind.
+#
+# A running job whose heartbeat stops is queued again, but the dispatcher
+# that had it may only be slow, not dead. Each claim therefore stamps the
+# job with a fresh token, and progress and finish updates only apply while
+# the token is still the job's: a dispatcher that lost its claim stops
+# without touching the job or its files.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    jd TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    claim TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    signature BLOB,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+# Terminal job states
+FINISHED = ("completed", "failed")
+
+# Columns added after the first release, for job tables created before them
+ADDED_COLUMNS = (("jobs", "claim", "TEXT"), ("job_files", "signature", "BLOB"))
+
+
+def _lower_priority():
+    """Worker process initializer: yield CPU to interactive request handling"""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+class RankJobQueue:
+    """Persistent queue of ranking jobs served by a bounded worker pool.
+
+    parse_fn(path, name) returns (text, MinHash signature, error result or
+    None) and score_fn(text, name, jd) the ranking result; both run in the
+    worker pool.
+    """
+
+    def __init__(self, job_dir, parse_fn, score_fn, workers=1, stale_seconds=300, poll_interval=1.0):
+        self.job_dir = job_dir
+        self.db_path = os.path.join(job_dir, "jobs.sqlite3")
+        self.parse_fn = parse_fn
+        self.score_fn = score_fn
+        self.workers = workers
+        self.stale_seconds = stale_seconds
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._started_pid = None
+        self._last_sweep = 0.0
+        os.makedirs(job_dir, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            for table, column, kind in ADDED_COLUMNS:
+                if column not in {c[1] for c in db.execute(f"PRAGMA table_info({table})")}:
+                    db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection that commits on success and always closes"""
+        db = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ---------- lifecycle ----------
+
+    def ensure_started(self):
+        """Start the dispatcher threads once per process (safe to call per request)"""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_lower_priority)
+            for _ in range(self.workers):
+                threading.Thread(target=self._dispatch_loop, daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _dispatch_loop(self):
+        while True:
+            try:
+                if time.time() - self._last_sweep >= self.stale_seconds:
+                    self._last_sweep = time.time()
+                    self.sweep_files()
+                job = self._claim_next()
+                if job is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+                self._run(job)
+            except Exception as e:
+                print(f"❌ Rank job dispatcher error: {e}")
+                time.sleep(self.poll_interval)
+
+    # ---------- submission and status ----------
+
+    def submit(self, jd, uploads):
+        """Store uploaded files and queue a job; uploads are (name, save_fn) pairs"""
+        job_id = str(uuid.uuid4())
+        folder = os.path.join(self.job_dir, job_id)
+        os.makedirs(folder, exist_ok=True)
+
+        rows = []
+        for idx, (name, save) in enumerate(uploads):
+            # Prefix with the index so repeated names in one batch don't collide
+            path = os.path.join(folder, f"{idx:05d}_{name}")
+            save(path)
+            rows.append((job_id, idx, name, path, "pending"))
+
+        now = time.time()
+        with self._connect() as db:
+            db.executemany("INSERT INTO job_files (job_id, idx, name, path, status) VALUES (?, ?, ?, ?, ?)", rows)
+            db.execute("INSERT INTO jobs (id, jd, status, total, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                       (job_id, jd, len(rows), now, now))
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id, include_results=True):
+        """Job status with the rankings finished so far, or None if unknown"""
+        with self._connect() as db:
+            job = db.execute("SELECT status, total, completed, error, created_at, finished_at FROM jobs WHERE id = ?",
+                             (job_id,)).fetchone()
+            if job is None:
+                return None
+            results = {}
+            if include_results:
+                results = {idx: json.loads(r) for idx, r in db.execute(
+                    "SELECT idx, result FROM job_files WHERE job_id = ? AND status = 'done'", (job_id,))}
+
+        status, total, completed, error, created_at, finished_at = job
+        body = {
+            "jobId": job_id,
+            "status": status,
+            "total": total,
+            "completed": completed,
+            "progress": round(completed / total * 100, 1) if total else 100.0,
+            "createdAt": created_at,
+            "finishedAt": finished_at,
+        }
+        if error:
+            body["error"] = error
+        if include_results:
+            # Near-duplicates were not scored; list them under the file they copy
+            results = collapse_duplicates(results)
+            results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
+            body["rankings"] = results
+            body["count"] = len(results)
+        return body
+
+    # ---------- worker side ----------
+
+    def _claim_next(self):
+        """Atomically take the oldest queued job (or one whose heartbeat stopped); returns (id, jd, claim)"""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status = 'queued', claim = NULL WHERE status = 'running' AND updated_at < ?",
+                       (now - self.stale_seconds,))
+            row = db.execute("SELECT id, jd FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                return None
+            claim = uuid.uuid4().hex
+            claimed = db.execute("UPDATE jobs SET status = 'running', claim = ?, updated_at = ? "
+                                 "WHERE id = ? AND status = 'queued'", (claim, now, row[0])).rowcount
+        return (*row, claim) if claimed else None
+
+    def _still_pending(self, job_id, idx, claim):
+        """Whether this claim still holds the job and the file still needs ranking"""
+        with self._connect() as db:
+            return db.execute("SELECT 1 FROM job_files JOIN jobs ON jobs.id = job_files.job_id "
+                              "WHERE job_id = ? AND idx = ? AND job_files.status = 'pending' AND claim = ?",
+                              (job_id, idx, claim)).fetchone() is not None
+
+    def _run(self, job):
+        job_id, jd, claim = job
+        with self._connect() as db:
+            files = db.execute("SELECT idx, name, path, status, signature FROM job_files WHERE job_id = ? ORDER BY idx",
+                               (job_id,)).fetchall()
+        # Per-job near-duplicate index, seeded with the files already ranked
+        dedup = BatchDeduplicator()
+        for idx, _, _, status, sig in files:
+            if status == "done":
+                dedup.check(idx, unpack_signature(sig))
+        try:
+            for idx, name, path, status, _ in files:
+                if status == "done" or not self._still_pending(job_id, idx, claim):
+                    continue
+                text, sig, failed = self._executor.submit(self.parse_fn, path, name).result()
+                duplicate = dedup.check(idx, sig) if failed is None else None
+                if failed is not None:
+                    result, sig = failed, None
+                elif duplicate:
+                    result, sig = duplicate_result(name, duplicate), None
+                else:
+                    result = self._executor.submit(self.score_fn, text, name, jd).result()
+                with self._connect() as db:
+                    # Each finished file doubles as the job's heartbeat
+                    if not db.execute("UPDATE jobs SET completed = completed + 1, updated_at = ? WHERE id = ? AND claim = ?",
+                                      (time.time(), job_id, claim)).rowcount:
+                        return  # reclaimed by another dispatcher, which carries on from here
+                    # Only files that were ranked keep a signature for later duplicates to match
+                    db.execute("UPDATE job_files SET status = 'done', result = ?, signature = ? WHERE job_id = ? AND idx = ?",
+                               (json.dumps(result), pack_signature(sig), job_id, idx))
+            self._finish(job_id, claim, "completed")
+        except Exception as e:
+            self._finish(job_id, claim, "failed", str(e))
+
+    def _finish(self, job_id, claim, status, error=None):
+        now = time.time()
+        with self._connect() as db:
+            finished = db.execute("UPDATE jobs SET status = ?, error = ?, updated_at = ?, finished_at = ?, claim = NULL "
+                                  "WHERE id = ? AND claim = ?", (status, error, now, now, job_id, claim)).rowcount
+        if finished:
+            shutil.rmtree(os.path.join(self.job_dir, job_id), ignore_errors=True)
+
+    def sweep_files(self):
+        """Delete upload folders of finished jobs, and of jobs never queued, left by a crashed process"""
+        cutoff = time.time() - self.stale_seconds
+        folders = [name for name in os.listdir(self.job_dir) if os.path.isdir(os.path.join(self.job_dir, name))]
+        if not folders:
+            return 0
+        with self._connect() as db:
+            active = {job_id for (job_id,) in db.execute(
+                f"SELECT id FROM jobs WHERE status NOT IN ({', '.join('?' * len(FINISHED))})", FINISHED)}
+        removed = 0
+        for name in folders:
+            path = os.path.join(self.job_dir, name)
+            # submit() writes the files before inserting the job, so only old folders count as orphans
+            if name in active or os.path.getmtime(path) > cutoff:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        return removed
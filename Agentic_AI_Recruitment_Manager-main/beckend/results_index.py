@@ -0,0 +1,144 @@
+import base64
+import json
+import threading
+from bisect import bisect_left, insort
+
+# Sort orders supported by ResultsIndex.query
+SORT_FIELDS = ("completedAt", "overallScore")
+
+
+def encode_cursor(key):
+    """Turn an index key into an opaque pagination cursor"""
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Turn a pagination cursor back into an index key"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        return tuple(json.loads(raw))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class ResultsIndex:
+    """Completed-interview summary rows kept in sorted indexes.
+
+    Rows are written once when a session completes. Two sorted key lists
+    (by completion time and by score) let queries bisect straight to the
+    requested page instead of scanning every session. When a query also
+    filters on the field it does not sort by, it bisects whichever index
+    bounds fewer rows and only orders those.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._by_completed = []  # (completedAt, sessionId)
+        self._by_score = []      # (overallScore, completedAt, sessionId)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @staticmethod
+    def _keys(row):
+        return (
+            (row["completedAt"], row["sessionId"]),
+            (row["overallScore"], row["completedAt"], row["sessionId"]),
+        )
+
+    @staticmethod
+    def _span(keys, field, min_score, max_score, since, until):
+        """(lo, hi) positions of the keys, sorted by field, that the field's bounds allow"""
+        if field == "completedAt":
+            lo = bisect_left(keys, (since,)) if since else 0
+            hi = bisect_left(keys, (until,)) if until else len(keys)
+        else:
+            lo = bisect_left(keys, (min_score,)) if min_score is not None else 0
+            hi = bisect_left(keys, (max_score + 1,)) if max_score is not None else len(keys)
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _remove(keys, key):
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            del keys[pos]
+
+    def add(self, row):
+        """Insert or replace the summary row for a session"""
+        with self._lock:
+            old = self._rows.get(row["sessionId"])
+            if old:
+                completed_key, score_key = self._keys(old)
+                self._remove(self._by_completed, completed_key)
+                self._remove(self._by_score, score_key)
+            self._rows[row["sessionId"]] = row
+            completed_key, score_key = self._keys(row)
+            insort(self._by_completed, completed_key)
+            insort(self._by_score, score_key)
+
+    def query(self, sort="completedAt", order="desc", min_score=None, max_score=None,
+              since=None, until=None, cursor=None, limit=50):
+        """Return (rows, next_cursor) for one page of results.
+
+        ``since`` is inclusive and ``until`` exclusive (ISO timestamps);
+        score bounds are inclusive percentages.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        after = decode_cursor(cursor) if cursor else None
+        if after is not None and len(after) != (2 if sort == "completedAt" else 3):
+            raise ValueError("Cursor does not match the requested sort")
+
+        bounds = (min_score, max_score, since, until)
+        with self._lock:
+            position = SORT_FIELDS.index(sort)
+            indexes = (self._by_completed, self._by_score)
+            keys = indexes[position]
+            lo, hi = self._span(keys, sort, *bounds)
+
+            # A filter on the other field may bound far fewer rows than the
+            # sort field's own range: bisect that index instead and order
+            # just the rows it allows
+            other = SORT_FIELDS[1 - position]
+            other_lo, other_hi = self._span(indexes[1 - position], other, *bounds)
+            if other_hi - other_lo < hi - lo:
+                keys = sorted(self._keys(self._rows[key[-1]])[position]
+                              for key in indexes[1 - position][other_lo:other_hi])
+                lo, hi = self._span(keys, sort, *bounds)
+
+            # Resume strictly after the cursor key in the requested direction
+            if after is not None:
+                pos = bisect_left(keys, after)
+                if order == "asc":
+                    lo = max(lo, pos + 1 if pos < len(keys) and keys[pos] == after else pos)
+                else:
+                    hi = min(hi, pos)
+
+            positions = range(lo, hi) if order == "asc" else range(hi - 1, lo - 1, -1)
+            page = []
+            last_key = None
+            for i in positions:
+                row = self._rows[keys[i][-1]]
+                if sort == "completedAt":
+                    if min_score is not None and row["overallScore"] < min_score:
+                        continue
+                    if max_score is not None and row["overallScore"] > max_score:
+                        continue
+                else:
+                    if since and row["completedAt"] < since:
+                        continue
+                    if until and row["completedAt"] >= until:
+                        continue
+                if len(page) == limit:
+                    break
+                page.append(row)
+                last_key = keys[i]
+            else:
+                # Ran off the end of the range, so there is no further page
+                return page, None
+
+        return page, encode_cursor(last_key)
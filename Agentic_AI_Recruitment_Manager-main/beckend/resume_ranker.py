@@ -3,18 +3,50 @@
 
 import os
 import re
-from flask import Flask, request, jsonify
+import json
+import math
+import time
+import tempfile
+import threading
+from collections import Counter
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import PyPDF2
 import docx
-from Intelligent_layer.app import generate_jd
+from Intelligent_layer.app import generate_jd_result, generate_jd_result_async
+from pdf_extractors import extract_pdf_text
+from metrics import StageTimer, rank_stage_latency, wants_timings
+from rank_jobs import RankJobQueue, FINISHED
+from candidate_store import CandidateStore
+import candidate_index
+from facet_index import parse_filters
+from caches import LRUCache, SemanticCache, SingleFlight, normalize_text, text_digest, text_vector
+from idf_snapshot import TFIDF_ANALYZER, load_snapshot
+from minhash import BatchDeduplicator, signature, duplicate_result, collapse_duplicates
+from skills import find_skills
 
 UPLOAD_DIR = "uploads"
 ALLOWED = {"pdf", "docx"}
 
+# Background /rank jobs: where their files and job table live, and how many
+# low-priority worker processes each server process may run them on
+RANK_JOBS_DIR = os.environ.get("RANK_JOBS_DIR", os.path.join(UPLOAD_DIR, "jobs"))
+RANK_JOB_WORKERS = int(os.environ.get("RANK_JOB_WORKERS", 1))
+
+# Parsed JDs kept per process, keyed by normalized-JD digest
+JD_CACHE_SIZE = int(os.environ.get("JD_CACHE_SIZE", 256))
+
+# Generated JDs reused for near-identical /generate-jd prompts for the same
+# role (see prompt_scope), and the cosine similarity a new prompt needs to
+# reuse one; the same brief for another domain or city scores ~0.8
+JD_PROMPT_CACHE_SIZE = int(os.environ.get("JD_PROMPT_CACHE_SIZE", 256))
+JD_PROMPT_SIMILARITY = float(os.environ.get("JD_PROMPT_SIMILARITY", 0.85))
+
+# /candidates/search: results returned, and how many BM25 hits the rerank sees
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 200
+SEARCH_MAX_RETRIEVE = 2000
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -24,13 +56,22 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 def _allowed(name: str) -> bool:
     return "." in name and name.rsplit(".", 1)[1].lower() in ALLOWED
 
+def upload_path(name: str) -> str:
+    """Fresh file under UPLOAD_DIR for one uploaded resume; name (secure_filename'd) is only kept as
+    the suffix, for its extension, so same-named uploads never overwrite each other"""
+    fd, path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=f"_{name}")
+    os.close(fd)
+    return path
+
+def discard_upload(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 def read_pdf(path: str) -> str:
-    text = []
-    with open(path, "rb") as f:
-        reader = PyPDF2.PdfReader(f)
-        for p in reader.pages:
-            text.append(p.extract_text() or "")
-    return "\n".join(text)
+    # Backend and page/character limits come from PDF_BACKEND, PDF_MAX_PAGES, PDF_MAX_CHARS
+    return extract_pdf_text(path)
 
 def read_docx(path: str) -> str:
     d = docx.Document(path)
@@ -44,41 +85,74 @@ def read_any(path: str) -> str:
         return read_docx(path)
     return ""
 
-def score_similarity(resume_text: str, jd_text: str) -> float:
-    # simple, fast baseline: TF-IDF + cosine
-    vec = TfidfVectorizer(stop_words="english")
-    X = vec.fit_transform([resume_text, jd_text])
-    score = cosine_similarity(X[0], X[1])[0][0]
+# Smoothed IDF of a term that occurs in only one document of a (resume, JD) pair
+ONE_SIDED_IDF = math.log(3 / 2) + 1
+
+# Corpus IDF snapshot (idf_snapshot.py), loaded once per process
+corpus_idf = load_snapshot()
+if corpus_idf:
+    print(f"✅ Loaded IDF snapshot {corpus_idf['meta']['version']} "
+          f"({corpus_idf['meta']['terms']} terms, {corpus_idf['meta']['documents']} resumes)")
+else:
+    print("⚠️ No IDF snapshot found: scoring with per-pair IDF. Run idf_snapshot.py to build one.")
+
+def score_similarity(resume_text: str, jd_text: str, jd: dict = None) -> float:
+    # TF-IDF + cosine. Terms are weighted by corpus IDF from the snapshot when
+    # one is loaded, otherwise by IDF over just the (resume, JD) pair. The JD
+    # side always comes from the JD cache.
+    jd = jd or get_jd_analysis(jd_text)
+    resume_terms = Counter(TFIDF_ANALYZER(resume_text))
+    if corpus_idf is not None:
+        score = _corpus_idf_cosine(resume_terms, jd)
+    else:
+        score = _pair_idf_cosine(resume_terms, jd)
     return round(float(score) * 100, 2)  # 0–100
 
-def extract_skills(resume_text: str, jd_text: str) -> dict:
+def _corpus_idf_cosine(resume_terms: Counter, jd: dict) -> float:
+    idf, default_idf = corpus_idf["idf"], corpus_idf["meta"]["default_idf"]
+    jd_weights = jd["weights"]
+    dot = resume_sq = 0.0
+    for term, count in resume_terms.items():
+        weight = count * idf.get(term, default_idf)
+        resume_sq += weight * weight
+        jd_weight = jd_weights.get(term)
+        if jd_weight:
+            dot += weight * jd_weight
+    if not resume_sq or not jd["norm"]:
+        return 0.0
+    return dot / (math.sqrt(resume_sq) * jd["norm"])
+
+def _pair_idf_cosine(resume_terms: Counter, jd: dict) -> float:
+    # Same result as fitting TfidfVectorizer on the pair: shared terms have
+    # IDF 1, terms in only one document ONE_SIDED_IDF
+    jd_terms = jd["terms"]
+    dot = shared_resume_sq = shared_jd_sq = 0
+    for term, count in resume_terms.items():
+        jd_count = jd_terms.get(term)
+        if jd_count:
+            dot += count * jd_count
+            shared_resume_sq += count * count
+            shared_jd_sq += jd_count * jd_count
+    c2 = ONE_SIDED_IDF ** 2
+    resume_norm = math.sqrt(shared_resume_sq + c2 * (sum(c * c for c in resume_terms.values()) - shared_resume_sq))
+    jd_norm = math.sqrt(shared_jd_sq + c2 * (jd["sq_norm"] - shared_jd_sq))
+    if not resume_norm or not jd_norm:
+        return 0.0
+    return dot / (resume_norm * jd_norm)
+
+def extract_skills(resume_text: str, jd_text: str, jd: dict = None) -> dict:
     """Extract and match skills between resume and JD"""
-    # Common technical skills and tools
-    common_skills = [
-        "python", "java", "javascript", "typescript", "react", "angular", "vue",
-        "node.js", "nodejs", "express", "django", "flask", "spring", "sql",
-        "mongodb", "postgresql", "mysql", "redis", "docker", "kubernetes",
-        "aws", "azure", "gcp", "git", "ci/cd", "jenkins", "terraform",
-        "machine learning", "ml", "ai", "data science", "deep learning",
-        "html", "css", "rest api", "graphql", "microservices", "agile",
-        "scrum", "jira", "linux", "bash", "powershell", "c++", "c#",
-        "go", "rust", "php", "ruby", "rails", "scala", "kotlin", "swift"
-    ]
-    
-    resume_lower = resume_text.lower()
-    jd_lower = jd_text.lower()
+    jd = jd or get_jd_analysis(jd_text)
+    in_resume = set(find_skills(resume_text))
     
     # Find skills in both resume and JD
     matched_skills = []
     missing_skills = []
     
-    for skill in common_skills:
-        in_jd = skill in jd_lower
-        in_resume = skill in resume_lower
-        
-        if in_jd and in_resume:
+    for skill in jd["skills"]:
+        if skill in in_resume:
             matched_skills.append(skill.title())
-        elif in_jd and not in_resume:
+        else:
             missing_skills.append(skill.title())
     
     return {
@@ -86,6 +160,110 @@ def extract_skills(resume_text: str, jd_text: str) -> dict:
         "missing": missing_skills[:5]     # Limit to top 5
     }
 
+jd_cache = LRUCache(JD_CACHE_SIZE, "jd_analysis")
+
+def analyze_jd(jd_text: str) -> dict:
+    """JD-side work shared by every resume ranked against the same JD"""
+    text = normalize_text(jd_text)
+    terms = Counter(TFIDF_ANALYZER(text))
+    analysis = {
+        "text": text,
+        "terms": terms,
+        "sq_norm": sum(c * c for c in terms.values()),
+        "skills": find_skills(text),
+    }
+    if corpus_idf is not None:
+        idf, default_idf = corpus_idf["idf"], corpus_idf["meta"]["default_idf"]
+        analysis["weights"] = {t: c * idf.get(t, default_idf) for t, c in terms.items()}
+        analysis["norm"] = math.sqrt(sum(w * w for w in analysis["weights"].values()))
+    return analysis
+
+def get_jd_analysis(jd_text: str) -> dict:
+    """Cached analyze_jd, keyed by the digest of the normalized JD"""
+    return jd_cache.get_or_create(text_digest(jd_text), lambda: analyze_jd(jd_text))
+
+def jd_embedding(jd: dict):
+    """MiniLM embedding of an analyzed JD, computed once and kept with the cached analysis"""
+    if "embedding" not in jd:
+        jd["embedding"] = candidate_index.embed_texts([jd["text"]])[0]
+    return jd["embedding"]
+
+# Abbreviations recruiters use in JD prompts, expanded before comparing them
+PROMPT_ALIASES = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "dev": "developer", "devs": "developers",
+    "eng": "engineer", "engr": "engineer", "mgr": "manager", "swe": "software engineer",
+    "sde": "software engineer", "pm": "product manager", "ml": "machine learning", "ai": "artificial intelligence",
+}
+
+# Words that decide which JD a prompt is asking for. The vector alone can't
+# tell them apart in a long prompt: swapping "Senior" for "Junior" or
+# "Python" for "Java" changes one word of fifty and still scores ~0.85
+SENIORITY_WORDS = {"intern", "junior", "entry", "graduate", "associate", "mid", "senior", "lead", "staff",
+                   "principal", "head", "chief", "director", "vp"}
+ROLE_WORDS = {"developer", "engineer", "programmer", "scientist", "analyst", "architect", "manager", "designer",
+              "administrator", "consultant", "researcher", "tester", "specialist", "owner", "officer"}
+SPECIALTY_WORDS = {"frontend", "backend", "fullstack", "mobile", "ios", "android", "devops", "data", "cloud",
+                   "security", "qa", "embedded", "web", "platform", "infrastructure", "network", "database",
+                   "product", "project", "ux", "ui", "game", "software", "hardware", "sre", "reliability"}
+
+def prompt_words(prompt: str) -> list:
+    """Lowercased words of a JD prompt with abbreviations expanded ("Sr. front-end dev" -> senior frontend developer)"""
+    text = re.sub(r"\b(front|back|full)[\s-]+(end|stack)\b", r"\1\2", prompt.lower())
+    return " ".join(PROMPT_ALIASES.get(w, w) for w in re.findall(r"[a-z0-9+#]+", text)).split()
+
+def prompt_scope(prompt: str) -> str:
+    """The seniority, role, specialty and technology words of a prompt; a cached JD is only
+    reused for a prompt with exactly the same ones"""
+    words = prompt_words(prompt)
+    role = {w[:-1] if w.endswith("s") and w[:-1] in ROLE_WORDS else w for w in words}
+    role &= SENIORITY_WORDS | ROLE_WORDS | SPECIALTY_WORDS
+    return " ".join(sorted(role) + find_skills(" ".join(words)))
+
+def embed_prompt(prompt: str):
+    """Unit-length vector of a JD prompt for the semantic cache.
+
+    Only compared between prompts with the same prompt_scope, where it
+    separates paraphrases (~0.9) from prompts that differ in the rest of
+    the brief (domain, location, benefits).
+    """
+    return text_vector(" ".join(prompt_words(prompt)))
+
+jd_prompt_cache = SemanticCache(JD_PROMPT_CACHE_SIZE, JD_PROMPT_SIMILARITY, "jd_prompt", embed_prompt)
+
+def cached_generated_jd(prompt: str) -> dict:
+    """/generate-jd response body reused from a near-identical earlier prompt for the same role, or None"""
+    hit = jd_prompt_cache.lookup(prompt, scope=prompt_scope(prompt))
+    if hit is None:
+        return None
+    jd_text, similarity, _ = hit
+    return {"markdown": jd_text, "cached": True, "similarity": round(similarity, 4)}
+
+def remember_generated_jd(prompt: str, jd_text: str, from_model: bool, seconds: float):
+    # Template fallbacks echo the prompt and cost nothing, so only model output is kept
+    if jd_text and from_model:
+        jd_prompt_cache.put(prompt, jd_text, seconds, scope=prompt_scope(prompt))
+
+# Identical prompts arriving while a generation is running wait for it
+jd_flights = SingleFlight("generate_jd")
+
+def generate_jd_shared(prompt: str) -> str:
+    """generate_jd with concurrent identical prompts sharing one generation, which is then cached"""
+    def generate():
+        started = time.perf_counter()
+        jd_text, from_model = generate_jd_result(prompt)
+        remember_generated_jd(prompt, jd_text, from_model, time.perf_counter() - started)
+        return jd_text
+    return jd_flights.do(text_digest(prompt), generate)
+
+async def generate_jd_shared_async(prompt: str) -> str:
+    """Async variant of generate_jd_shared for the ASGI backend"""
+    async def generate():
+        started = time.perf_counter()
+        jd_text, from_model = await generate_jd_result_async(prompt)
+        remember_generated_jd(prompt, jd_text, from_model, time.perf_counter() - started)
+        return jd_text
+    return await jd_flights.do_async(text_digest(prompt), generate)
+
 def extract_experience(resume_text: str) -> dict:
     """Extract experience information from resume"""
     # Look for years of experience patterns
@@ -124,10 +302,13 @@ def extract_experience(resume_text: str) -> dict:
         "education": education
     }
 
-def analyze_resume(resume_text: str, jd_text: str, score: float) -> dict:
+def analyze_resume(resume_text: str, jd_text: str, score: float, timer: StageTimer = None, jd: dict = None) -> dict:
     """Perform comprehensive resume analysis"""
-    skills = extract_skills(resume_text, jd_text)
-    experience = extract_experience(resume_text)
+    timer = timer or StageTimer()
+    with timer.stage("skills"):
+        skills = extract_skills(resume_text, jd_text, jd)
+    with timer.stage("experience"):
+        experience = extract_experience(resume_text)
     
     # Generate strengths based on matched skills and score
     strengths = []
@@ -169,12 +350,180 @@ def analyze_resume(resume_text: str, jd_text: str, score: float) -> dict:
         "recommendation": recommendation
     }
 
+def score_text(text: str, name: str, jd: str, timer: StageTimer = None, jd_analysis: dict = None) -> dict:
+    """Score and analyze one resume's extracted text against a JD"""
+    timer = timer or StageTimer()
+    jd_analysis = jd_analysis or get_jd_analysis(jd)
+    with timer.stage("score"):
+        score = score_similarity(text, jd, jd_analysis)
+    analysis = analyze_resume(text, jd, score, timer, jd_analysis)
+    return {
+        "resume": name, 
+        "score": score,
+        "analysis": analysis
+    }
+
+def error_result(name: str, error: str) -> dict:
+    return {
+        "resume": name, 
+        "score": 0.0, 
+        "error": error,
+        "analysis": {
+            "matched_skills": [],
+            "missing_skills": [],
+            "experience_years": "Not specified",
+            "education": "Not specified",
+            "strengths": ["Error processing resume"],
+            "weaknesses": ["Could not analyze resume"],
+            "recommendation": "Error - Review Manually"
+        }
+    }
+
+def rank_resume(path: str, name: str, jd: str, timer: StageTimer = None,
+                dedup: BatchDeduplicator = None, position: int = None) -> dict:
+    """Parse, score and analyze one saved resume against a JD.
+
+    With a dedup index, a resume that nearly duplicates an earlier file of
+    the batch is not scored; position is this file's index in the batch.
+    """
+    timer = timer or StageTimer()
+    try:
+        with timer.stage("jd"):
+            jd_analysis = get_jd_analysis(jd)
+        with timer.stage("parse"):
+            text = read_any(path)
+        if dedup is not None:
+            with timer.stage("dedup"):
+                duplicate = dedup.check(position, signature(text))
+            if duplicate:
+                return duplicate_result(name, duplicate)
+        return score_text(text, name, jd, timer, jd_analysis)
+    except Exception as e:
+        return error_result(name, str(e))
+
+def parse_resume_timed(path: str) -> tuple:
+    """Worker-process half of rank_resume: (text, MinHash signature, stage timings, error)"""
+    timer = StageTimer()
+    try:
+        with timer.stage("parse"):
+            text = read_any(path)
+        with timer.stage("dedup"):
+            sig = signature(text)
+        return text, sig, timer.stages, None
+    except Exception as e:
+        return None, None, timer.stages, str(e)
+
+def score_text_timed(text: str, name: str, jd: str) -> tuple:
+    """Worker-process score_text: returns the result and its stage timings"""
+    timer = StageTimer()
+    try:
+        with timer.stage("jd"):
+            jd_analysis = get_jd_analysis(jd)
+        return score_text(text, name, jd, timer, jd_analysis), timer.stages
+    except Exception as e:
+        return error_result(name, str(e)), timer.stages
+
+
+def parse_job_file(path: str, name: str) -> tuple:
+    """Worker-process parse for /rank/jobs: (text, MinHash signature, error result or None)"""
+    text, sig, _, error = parse_resume_timed(path)
+    return text, sig, None if error is None else error_result(name, error)
+
+def score_job_file(text: str, name: str, jd: str) -> dict:
+    """Worker-process scoring for /rank/jobs"""
+    return score_text_timed(text, name, jd)[0]
+
+
+def search_candidates(data: dict) -> tuple:
+    """Two-stage search of the candidate pool for a JD; returns (body, status, timer)"""
+    timer = StageTimer()
+    jd = (data.get("jd") or "").strip()
+    if not jd:
+        return {"error": "Missing 'jd'"}, 400, timer
+    try:
+        limit = min(max(int(data.get("limit", SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+        retrieve = min(max(int(data.get("retrieve", candidate_index.DEFAULT_RETRIEVE)), limit), SEARCH_MAX_RETRIEVE)
+    except (TypeError, ValueError):
+        return {"error": "'limit' and 'retrieve' must be integers"}, 400, timer
+    try:
+        filters = parse_filters(data.get("filters"))
+    except ValueError as e:
+        return {"error": str(e)}, 400, timer
+
+    with timer.stage("load"):
+        index = candidate_index.current_index()
+    if index is None:
+        return {"error": "Candidate index not built; run candidate_index.py"}, 503, timer
+
+    query_vector = None
+    if index.embeddings is not None and candidate_index.EMBEDDINGS_AVAILABLE:
+        with timer.stage("embed"):
+            query_vector = jd_embedding(get_jd_analysis(jd))
+    try:
+        hits = index.search(jd, limit, retrieve, query_vector, timer, filters)
+    except ValueError as e:
+        return {"error": str(e)}, 503, timer
+    with timer.stage("fetch"):
+        rows = get_candidate_store().get_many([h["id"] for h in hits],
+                                        ("id", "source", "name", "skills", "experience_years", "education"))
+        copies = {row["id"]: row for row in get_candidate_store().get_many(
+            [d for h in hits for d in h.get("duplicates", ())], ("id", "name", "source"))}
+    details = {row["id"]: row for row in rows}
+    results = [dict(details.get(h["id"], {}), **h) for h in hits]
+    for result in results:
+        if "duplicates" in result:
+            result["duplicates"] = [copies.get(d, {"id": d}) for d in result["duplicates"]]
+    return {
+        "candidates": results,
+        "count": len(results),
+        "reranked": bool(results) and "semantic" in results[0],
+        "poolSize": len(index.ids),
+    }, 200, timer
+
+
+# Created on first use, so importing this module (as ingest_resumes.py
+# does) opens no databases
+_rank_job_queue = None
+_candidate_store = None
+_shared_lock = threading.Lock()
+
+def get_rank_job_queue() -> RankJobQueue:
+    """The background /rank job queue for this process, creating its job table on first use"""
+    global _rank_job_queue
+    if _rank_job_queue is None:
+        with _shared_lock:
+            if _rank_job_queue is None:
+                _rank_job_queue = RankJobQueue(RANK_JOBS_DIR, parse_job_file, score_job_file, workers=RANK_JOB_WORKERS)
+    return _rank_job_queue
+
+def started_rank_job_queue() -> RankJobQueue:
+    """get_rank_job_queue() with its workers running in this process.
+
+    Only the /rank/jobs routes start them, on their first request, so
+    forking servers start the workers in each child and other routes
+    (/health, /rank) never do. A restarted process resumes its unfinished
+    jobs once a client submits or polls one.
+    """
+    queue = get_rank_job_queue()
+    queue.ensure_started()
+    return queue
+
+def get_candidate_store() -> CandidateStore:
+    """The candidate store searched by /candidates/search, opened on first use"""
+    global _candidate_store
+    if _candidate_store is None:
+        with _shared_lock:
+            if _candidate_store is None:
+                _candidate_store = CandidateStore()
+    return _candidate_store
+
 
 # ---------- routes ----------
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", "idfSnapshot": corpus_idf["meta"]["version"] if corpus_idf else None,
+            "jdPromptCache": jd_prompt_cache.stats()}
 
 @app.post("/rank")
 def rank():
@@ -186,41 +535,93 @@ def rank():
     if not files:
         return jsonify(error="Upload at least one file under 'files'"), 400
 
+    show_timings = wants_timings(request.args.get("timings") or request.form.get("timings"))
+    started = time.perf_counter()
+    timer = StageTimer()
+    dedup = BatchDeduplicator()
     results = []
     for f in files:
         if not f or not _allowed(f.filename):
             continue
         name = secure_filename(f.filename)
-        path = os.path.join(UPLOAD_DIR, name)
-        f.save(path)
-
+        path = upload_path(name)
+        file_timer = StageTimer()
+        with file_timer.stage("save"):
+            f.save(path)
         try:
-            text = read_any(path)
-            score = score_similarity(text, jd)
-            analysis = analyze_resume(text, jd, score)
-            results.append({
-                "resume": name, 
-                "score": score,
-                "analysis": analysis
-            })
-        except Exception as e:
-            results.append({
-                "resume": name, 
-                "score": 0.0, 
-                "error": str(e),
-                "analysis": {
-                    "matched_skills": [],
-                    "missing_skills": [],
-                    "experience_years": "Not specified",
-                    "education": "Not specified",
-                    "strengths": ["Error processing resume"],
-                    "weaknesses": ["Could not analyze resume"],
-                    "recommendation": "Error - Review Manually"
-                }
-            })
+            result = rank_resume(path, name, jd, file_timer, dedup, len(results))
+        finally:
+            discard_upload(path)
+        file_timer.observe(rank_stage_latency)
+        timer.merge(file_timer.stages)
+        if show_timings:
+            result["timings"] = file_timer.as_ms()
+        results.append(result)
 
+    # Near-duplicates were not scored; list them under the resume they copy
+    results = collapse_duplicates(results)
     results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-    return jsonify(rankings=results, count=len(results))
+    timer.add("total", time.perf_counter() - started)
+
+    body = {"rankings": results, "count": len(results)}
+    if show_timings:
+        body["timings"] = timer.as_ms()
+    response = jsonify(body)
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
+
+@app.post("/rank/jobs")
+def submit_rank_job():
+    jd = request.form.get("jd", "").strip()
+    if not jd:
+        return jsonify(error="Missing 'jd' in form-data"), 400
+
+    uploads = [(secure_filename(f.filename), f.save)
+               for f in request.files.getlist("files") if f and _allowed(f.filename)]
+    if not uploads:
+        return jsonify(error="Upload at least one file under 'files'"), 400
+
+    job_id = started_rank_job_queue().submit(jd, uploads)
+    return jsonify(jobId=job_id, status="queued", total=len(uploads)), 202
+
+@app.get("/rank/jobs/<job_id>")
+def get_rank_job(job_id):
+    include_results = request.args.get("results", "true").lower() != "false"
+    job = started_rank_job_queue().get(job_id, include_results)
+    if job is None:
+        return jsonify(error="Job not found"), 404
+    return jsonify(job)
+
+@app.get("/rank/jobs/<job_id>/events")
+def stream_rank_job(job_id):
+    """Server-sent progress events until the job finishes"""
+    if started_rank_job_queue().get(job_id, include_results=False) is None:
+        return jsonify(error="Job not found"), 404
+
+    def events():
+        last = None
+        while True:
+            job = get_rank_job_queue().get(job_id, include_results=False)
+            if (job["status"], job["completed"]) != last:
+                last = (job["status"], job["completed"])
+                yield f"event: progress\ndata: {json.dumps(job)}\n\n"
+            if job["status"] in FINISHED:
+                yield f"event: done\ndata: {json.dumps(get_rank_job_queue().get(job_id))}\n\n"
+                return
+            time.sleep(1)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache"})
+
+@app.post("/candidates/search")
+def search_candidates_route():
+    body, status, timer = search_candidates(request.get_json(silent=True) or {})
+    if wants_timings(request.args.get("timings")):
+        body["timings"] = timer.as_ms()
+    response = jsonify(body)
+    response.status_code = status
+    response.headers["Server-Timing"] = timer.server_timing()
+    return response
 
 @app.post("/generate-jd")
 def generate_jd_route():
@@ -229,11 +630,15 @@ def generate_jd_route():
     if not prompt:
         return jsonify(error="Missing 'prompt'"), 400
     
-    jd_text = generate_jd(prompt)
+    cached = cached_generated_jd(prompt)
+    if cached:
+        return jsonify(cached)
+
+    jd_text = generate_jd_shared(prompt)
     if not jd_text:
         return jsonify(error="Failed to generate JD"), 500
-        
-    return jsonify(markdown=jd_text)
+
+    return jsonify(markdown=jd_text, cached=False)
 
 if __name__ == "__main__":
     app.run(debug=True, port=5001)
@@ -0,0 +1,34 @@
+import re
+
+# Known technical skills, matched in resumes and JDs as whole tokens: "go"
+# is not in "good" or "google", "ai" not in "email", "ml" not in "html".
+# Shared by ranking (resume_ranker), ingestion and the facet index build.
+
+# Common technical skills and tools
+COMMON_SKILLS = [
+    "python", "java", "javascript", "typescript", "react", "angular", "vue",
+    "node.js", "nodejs", "express", "django", "flask", "spring", "sql",
+    "mongodb", "postgresql", "mysql", "redis", "docker", "kubernetes",
+    "aws", "azure", "gcp", "git", "ci/cd", "jenkins", "terraform",
+    "machine learning", "ml", "ai", "data science", "deep learning",
+    "html", "css", "rest api", "graphql", "microservices", "agile",
+    "scrum", "jira", "linux", "bash", "powershell", "c++", "c#",
+    "go", "rust", "php", "ruby", "rails", "scala", "kotlin", "swift"
+]
+
+# One alternation, longest first; a match may not touch another token character
+SKILL_RE = re.compile(
+    r"(?<![a-z0-9+#])("
+    + "|".join(re.escape(s) for s in sorted(COMMON_SKILLS, key=len, reverse=True))
+    + r")(?![a-z0-9+#])")
+
+
+def find_skills(text: str) -> list:
+    """COMMON_SKILLS mentioned in text as whole tokens, in COMMON_SKILLS order"""
+    found = set(SKILL_RE.findall(text.lower()))
+    return [skill for skill in COMMON_SKILLS if skill in found]
+
+
+def resume_skills(resume_text: str) -> list:
+    """Known skills mentioned in a resume, independent of any JD"""
+    return [skill.title() for skill in find_skills(resume_text)]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run from the beckend directory (python -m pytest tests); the modules import each other flat
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,16 @@
+from caches import SemanticCache, text_vector
+
+AFFIRMED = "A Python list is mutable and it is thread safe for appends"
+NEGATED = "A Python list is not mutable and it is not thread safe for appends"
+
+
+def test_negation_changes_the_vector():
+    assert float(text_vector(AFFIRMED) @ text_vector(NEGATED)) < 0.9
+
+
+def test_negated_answer_misses_the_evaluation_cache():
+    cache = SemanticCache(8, 0.95, "evaluation_semantic_test", text_vector)
+    cache.put(AFFIRMED, {"score": 8}, scope="python:lists")
+    assert cache.lookup(NEGATED, scope="python:lists") is None
+    assert cache.lookup("a python list is mutable, and it is thread-safe for appends",
+                        scope="python:lists")[0] == {"score": 8}
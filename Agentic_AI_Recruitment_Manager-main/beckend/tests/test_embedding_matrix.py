@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+
+from embedding_matrix import EmbeddingMatrix, map_matrix, remove_unused
+
+MODEL = "test-model"
+
+
+def unit_vectors(n, seed):
+    vectors = np.random.default_rng(seed).standard_normal((n, 8)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_compact_leaves_mapped_generation_intact(tmp_path):
+    directory = str(tmp_path)
+    ids = [f"c{i}" for i in range(10)]
+    vectors = unit_vectors(10, 0)
+    matrix = EmbeddingMatrix(directory, MODEL)
+    matrix.append(ids, vectors)
+
+    # A reader mapped the old generation before compaction
+    old_file = matrix.vectors_file
+    reader = map_matrix(os.path.join(directory, old_file), len(matrix), matrix.dim, matrix.dtype)
+
+    assert matrix.compact(["c7", "c2"])
+    assert matrix.vectors_file != old_file
+    assert np.array_equal(reader, vectors)
+    new = map_matrix(os.path.join(directory, matrix.vectors_file), len(matrix), matrix.dim, matrix.dtype)
+    assert np.array_equal(new[matrix.rows_for(["c7", "c2"])], vectors[[7, 2]])
+
+    # Reopening picks up the new generation; the old one goes once nothing names it
+    reopened = EmbeddingMatrix(directory, MODEL)
+    assert reopened.vectors_file == matrix.vectors_file and reopened.ids == ["c7", "c2"]
+    del reader
+    assert remove_unused(directory, {matrix.vectors_file, matrix.ids_file}) == 2
+    assert sorted(os.listdir(directory)) == sorted([matrix.vectors_file, matrix.ids_file, "embedding_matrix.json"])
+
+
+def test_compact_skips_mostly_live_matrix(tmp_path):
+    matrix = EmbeddingMatrix(str(tmp_path), MODEL)
+    matrix.append(["a", "b", "c"], unit_vectors(3, 1))
+    generation = matrix.generation
+
+    assert not matrix.compact(["a", "b"])
+    assert matrix.generation == generation
@@ -0,0 +1,34 @@
+from facet_index import FacetBuilder, FacetIndex, parse_filters
+from skills import find_skills, resume_skills
+
+# Mentions "go", "ai", "ml" and "java" only inside longer words
+LOOKALIKE_RESUME = ("Good communicator with a Google certificate. Answered support email daily, "
+                    "built HTML pages and wrote JavaScript for the team.")
+GO_RESUME = "Backend developer: Go, gRPC and PostgreSQL; some machine learning (ML) with Python."
+
+
+def build_facets(tmp_path, resumes):
+    builder = FacetBuilder()
+    for doc, text in enumerate(resumes):
+        builder.add(doc, resume_skills(text), None, "Not specified")
+    path = tmp_path / "facets.npz"
+    with open(path, "wb") as f:
+        builder.save(f)
+    return FacetIndex(str(path))
+
+
+def test_skills_match_whole_tokens_only():
+    assert find_skills(LOOKALIKE_RESUME) == ["javascript", "html"]
+    assert find_skills(GO_RESUME) == ["python", "postgresql", "machine learning", "ml", "go"]
+    assert find_skills("Shipped Node.js services; CI/CD with Jenkins, C++ and C#.") == [
+        "node.js", "ci/cd", "jenkins", "c++", "c#"]
+
+
+def test_facet_filters_ignore_skills_inside_other_words(tmp_path):
+    facets = build_facets(tmp_path, [LOOKALIKE_RESUME, GO_RESUME])
+
+    assert facets.match(parse_filters({"skills": ["go"]})).tolist() == [1]
+    assert facets.match(parse_filters({"skills": ["ai"]})).tolist() == []
+    assert facets.match(parse_filters({"anySkills": ["ml", "java"]})).tolist() == [1]
+    assert facets.match(parse_filters({"excludeSkills": ["go"]})).tolist() == [0]
+    assert facets.match(parse_filters({"excludeSkills": ["ml"]})).tolist() == [0]
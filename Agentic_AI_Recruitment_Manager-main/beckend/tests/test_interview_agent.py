@@ -0,0 +1,21 @@
+import interview_agent
+from metrics import interview_grading_seconds
+
+
+def test_ending_completed_session_changes_nothing():
+    client = interview_agent.app.test_client()
+    session_id = client.post("/api/interview/start", json={
+        "candidateId": "end-twice", "candidateName": "End Twice", "skills": ["python"], "numQuestions": 2,
+    }).get_json()["sessionId"]
+    client.post("/api/interview/answer", json={"sessionId": session_id, "answer": "Generators yield lazily."})
+
+    first = client.post("/api/interview/end", json={"sessionId": session_id})
+    session = interview_agent.interview_sessions[session_id]
+    completed_at, rows = session["completedAt"], len(interview_agent.completed_results)
+    observed = interview_grading_seconds.count(mode=session["grading"]["mode"])
+
+    second = client.post("/api/interview/end", json={"sessionId": session_id})
+    assert second.status_code == 200 and second.get_json() == first.get_json()
+    assert session["completedAt"] == completed_at
+    assert len(interview_agent.completed_results) == rows
+    assert interview_grading_seconds.count(mode=session["grading"]["mode"]) == observed
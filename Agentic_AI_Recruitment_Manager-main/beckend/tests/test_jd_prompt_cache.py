@@ -0,0 +1,48 @@
+import pytest
+
+import resume_ranker
+from caches import SemanticCache
+
+BRIEF = ("Write a job description for a {role} at a fast-growing fintech startup in Berlin. The team builds "
+         "payment APIs and internal tooling. Include responsibilities, required skills, experience level, "
+         "nice-to-haves, benefits such as remote work and a learning budget, and a short company overview.")
+PARAPHRASE = ("Write a job description for a Sr. Python dev at a fast-growing fintech startup in Berlin. The team "
+              "builds payment APIs and internal tooling. Include responsibilities, required skills, experience "
+              "level, nice to haves, benefits like remote work and a learning budget, plus a short company overview.")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SemanticCache(16, resume_ranker.JD_PROMPT_SIMILARITY, "jd_prompt_test", resume_ranker.embed_prompt)
+    monkeypatch.setattr(resume_ranker, "jd_prompt_cache", cache)
+    return cache
+
+
+def remember(role, jd_text):
+    resume_ranker.remember_generated_jd(BRIEF.format(role=role), jd_text, True, 5.0)
+
+
+def test_paraphrase_of_same_role_reuses_jd(cache):
+    remember("Senior Python Developer", "# Senior Python Developer")
+    hit = resume_ranker.cached_generated_jd(PARAPHRASE)
+    assert hit["markdown"] == "# Senior Python Developer"
+
+
+@pytest.mark.parametrize("cached_role, asked_role", [
+    ("Senior Python Developer", "Senior Java Developer"),
+    ("Senior Python Developer", "Junior Python Developer"),
+    ("Senior Python Developer", "Junior Java Developer"),
+    ("Data Scientist", "Data Engineer"),
+    ("Senior Frontend Engineer", "Senior Backend Engineer"),
+])
+def test_long_prompt_for_another_role_misses(cache, cached_role, asked_role):
+    remember(cached_role, f"# {cached_role}")
+    assert resume_ranker.cached_generated_jd(BRIEF.format(role=asked_role)) is None
+
+
+def test_template_fallback_is_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(resume_ranker, "generate_jd_result", lambda prompt: ("# Template", False))
+    prompt = BRIEF.format(role="Senior Python Developer")
+    assert resume_ranker.generate_jd_shared(prompt) == "# Template"
+    assert len(cache) == 0
+    assert resume_ranker.cached_generated_jd(prompt) is None
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from minhash import signature
+from rank_jobs import RankJobQueue
+
+
+def parse_file(path, name):
+    with open(path) as f:
+        text = f.read()
+    return text, signature(text), None
+
+
+def score_file(text, name, jd):
+    return {"resume": name, "score": float(len(text))}
+
+
+def write_resume(path, words):
+    with open(path, "w") as f:
+        f.write(" ".join(words))
+
+
+def resume_words(i, count=40):
+    return [f"w{i}x{n}" for n in range(count)]
+
+
+def make_queue(tmp_path, contents=None):
+    # Dispatchers are driven by hand here instead of by ensure_started's threads
+    queue = RankJobQueue(str(tmp_path), parse_file, score_file)
+    queue._executor = ThreadPoolExecutor(max_workers=1)
+    contents = contents or [resume_words(i, 10 * (i + 1)) for i in range(3)]
+    uploads = [(f"r{i}.txt", lambda path, words=words: write_resume(path, words)) for i, words in enumerate(contents)]
+    return queue, queue.submit("python developer", uploads)
+
+
+def expire_heartbeat(queue, job_id):
+    with queue._connect() as db:
+        db.execute("UPDATE jobs SET updated_at = 0 WHERE id = ?", (job_id,))
+
+
+def test_reclaimed_job_is_finished_once_by_its_new_claimant(tmp_path):
+    queue, job_id = make_queue(tmp_path)
+    stale = queue._claim_next()
+    expire_heartbeat(queue, job_id)
+    current = queue._claim_next()
+    assert current[0] == job_id and current[2] != stale[2]
+
+    # The first dispatcher turns out to be alive: it must leave the job alone
+    queue._run(stale)
+    assert queue.get(job_id)["completed"] == 0
+    assert os.path.isdir(os.path.join(str(tmp_path), job_id))
+
+    queue._run(current)
+    job = queue.get(job_id)
+    assert (job["status"], job["completed"], job["count"]) == ("completed", 3, 3)
+    assert not os.path.exists(os.path.join(str(tmp_path), job_id))
+
+    queue._finish(job_id, stale[2], "failed", "late")
+    assert queue.get(job_id)["status"] == "completed"
+
+
+def test_reclaimed_job_skips_files_already_done(tmp_path):
+    queue, job_id = make_queue(tmp_path)
+    first = queue._claim_next()
+    with queue._connect() as db:
+        db.execute("UPDATE job_files SET status = 'done', result = '{\"resume\": \"r0.txt\", \"score\": 1.0}' "
+                   "WHERE job_id = ? AND idx = 0", (job_id,))
+        db.execute("UPDATE jobs SET completed = 1, updated_at = 0 WHERE id = ?", (job_id,))
+    second = queue._claim_next()
+
+    queue._run(second)
+    queue._run(first)
+    job = queue.get(job_id)
+    assert (job["status"], job["completed"]) == ("completed", 3)
+    assert [r["resume"] for r in job["rankings"]] == ["r2.txt", "r1.txt", "r0.txt"]
+
+
+def test_near_duplicates_are_not_scored_and_fold_into_their_original(tmp_path):
+    original = resume_words(0)
+    copy = original[:-1] + ["changed"]
+    queue, job_id = make_queue(tmp_path, contents=[original, resume_words(1), copy])
+    queue._run(queue._claim_next())
+
+    job = queue.get(job_id)
+    assert (job["status"], job["completed"], job["count"]) == ("completed", 3, 2)
+    folded = next(r for r in job["rankings"] if r["resume"] == "r0.txt")
+    assert [d["resume"] for d in folded["duplicates"]] == ["r2.txt"]
+
+
+def test_resumed_job_matches_duplicates_of_files_ranked_before_restart(tmp_path):
+    original = resume_words(0)
+    queue, job_id = make_queue(tmp_path, contents=[original, original[:-1] + ["changed"]])
+    # Rank only the first file, then hand the rest to a new process's queue
+    with queue._connect() as db:
+        db.execute("UPDATE job_files SET status = 'held' WHERE job_id = ? AND idx = 1", (job_id,))
+    queue._run(queue._claim_next())
+    with queue._connect() as db:
+        db.execute("UPDATE job_files SET status = 'pending' WHERE job_id = ? AND idx = 1", (job_id,))
+        db.execute("UPDATE jobs SET status = 'queued' WHERE id = ?", (job_id,))
+    os.makedirs(os.path.join(str(tmp_path), job_id), exist_ok=True)
+    write_resume(os.path.join(str(tmp_path), job_id, "00001_r1.txt"), original[:-1] + ["changed"])
+
+    restarted = RankJobQueue(str(tmp_path), parse_file, score_file)
+    restarted._executor = queue._executor
+    restarted._run(restarted._claim_next())
+    assert [r["resume"] for r in restarted.get(job_id)["rankings"]] == ["r0.txt"]
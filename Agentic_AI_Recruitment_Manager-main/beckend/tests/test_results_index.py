@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from results_index import ResultsIndex
+
+SORT_KEYS = {
+    "completedAt": lambda row: (row["completedAt"], row["sessionId"]),
+    "overallScore": lambda row: (row["overallScore"], row["completedAt"], row["sessionId"]),
+}
+
+
+def make_index(count, seed=0):
+    rng = random.Random(seed)
+    index, rows = ResultsIndex(), []
+    for i in range(count):
+        row = {
+            "sessionId": f"s{i:05d}",
+            "overallScore": rng.randrange(101),
+            "completedAt": f"2026-01-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:00:00",
+        }
+        index.add(row)
+        rows.append(row)
+    return index, rows
+
+
+def all_pages(index, limit, **query):
+    rows, cursor = [], None
+    while True:
+        page, cursor = index.query(cursor=cursor, limit=limit, **query)
+        rows.extend(page)
+        if cursor is None:
+            return rows
+
+
+@pytest.mark.parametrize("sort", ["completedAt", "overallScore"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("filters", [
+    {},
+    {"min_score": 97},  # selective on score
+    {"since": "2026-01-27", "until": "2026-01-28"},  # selective on time
+    {"min_score": 20, "max_score": 80, "since": "2026-01-03", "until": "2026-01-05"},
+    {"min_score": 60, "since": "2026-01-10"},
+])
+def test_query_matches_a_full_scan(sort, order, filters):
+    index, rows = make_index(2000)
+    expected = sorted(
+        (row for row in rows
+         if row["overallScore"] >= filters.get("min_score", 0)
+         and row["overallScore"] <= filters.get("max_score", 100)
+         and row["completedAt"] >= filters.get("since", "")
+         and row["completedAt"] < filters.get("until", "9999")),
+        key=SORT_KEYS[sort], reverse=order == "desc")
+
+    assert all_pages(index, 37, sort=sort, order=order, **filters) == expected
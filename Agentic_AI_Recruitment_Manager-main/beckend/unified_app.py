@@ -1,6 +1,8 @@
+import time
 from flask import Flask
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
-from werkzeug.exceptions import NotFound
+from werkzeug.exceptions import HTTPException, NotFound
+import metrics
 
 # Import the two existing Flask apps
 # Note: These imports assume the files are in the same directory
@@ -40,24 +42,97 @@ def health():
 # and we can't have two default apps...
 # We will use a custom WSGI middleware to dispatch based on path prefix.
 
+class MeteredBody:
+    """Wraps a WSGI response body to count its bytes and report when it is closed"""
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close(self.size)
+
 class MergedApp:
-    def __init__(self, app1, app2):
+    def __init__(self, app1, app2, url_map1=None, url_map2=None):
         self.app1 = app1 # interview_agent (routes start with /api/interview)
         self.app2 = app2 # resume_ranker (routes are /rank, /generate-jd)
+        # Flask URL maps, used to label metrics by route template instead of raw path
+        self.url_map1 = url_map1
+        self.url_map2 = url_map2
 
     def __call__(self, environ, start_response):
         path = environ.get('PATH_INFO', '')
         
+        if path == '/metrics':
+            return self.serve_metrics(start_response)
+        
         # Dispatch logic
         if path.startswith('/api/interview'):
-            return self.app1(environ, start_response)
+            return self.metered(self.app1, self.url_map1, environ, start_response)
         else:
             # Default to resume_ranker for everything else (including /rank, /generate-jd)
-            return self.app2(environ, start_response)
+            return self.metered(self.app2, self.url_map2, environ, start_response)
+
+    def serve_metrics(self, start_response):
+        body = metrics.REGISTRY.render().encode('utf-8')
+        start_response('200 OK', [('Content-Type', metrics.CONTENT_TYPE), ('Content-Length', str(len(body)))])
+        return [body]
+
+    @staticmethod
+    def route_for(url_map, method, path):
+        """Route template for a request, e.g. /api/interview/results/<session_id>"""
+        if url_map is None:
+            return path
+        try:
+            rule, _ = url_map.bind('localhost').match(path, method=method, return_rule=True)
+            return rule.rule
+        except HTTPException:
+            # Unknown paths share one label so scanners can't blow up cardinality
+            return 'unmatched'
+
+    def metered(self, app, url_map, environ, start_response):
+        """Call a sub-app, recording latency, sizes, status and in-flight count"""
+        method = environ.get('REQUEST_METHOD', 'GET')
+        route = self.route_for(url_map, method, environ.get('PATH_INFO', ''))
+        try:
+            request_size = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            request_size = 0
+        
+        started = time.perf_counter()
+        status = [500]
+        metrics.http_in_flight.inc(method=method, route=route)
+        
+        def capture_status(status_line, headers, exc_info=None):
+            status[0] = int(status_line.split(' ', 1)[0])
+            return start_response(status_line, headers, exc_info)
+        
+        def finish(response_size, failed=False):
+            metrics.http_in_flight.dec(method=method, route=route)
+            metrics.record_request(method, route, status[0], time.perf_counter() - started,
+                                   request_size, response_size, failed)
+        
+        try:
+            body = app(environ, capture_status)
+        except Exception:
+            finish(0, failed=True)
+            raise
+        return MeteredBody(body, finish)
 
 # Create the merged application
 # Note: We use the WSGI interface of the Flask apps
-application = MergedApp(interview_app.wsgi_app, ranker_app.wsgi_app)
+application = MergedApp(interview_app.wsgi_app, ranker_app.wsgi_app,
+                        interview_app.url_map, ranker_app.url_map)
 
 # For Gunicorn, we usually expose 'app' or 'application'
 # But Flask's 'run' method expects a Flask object, not a WSGI callable directly for dev.
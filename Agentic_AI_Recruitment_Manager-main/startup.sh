@@ -8,7 +8,12 @@ cd beckend
 # pip install -r requirements.txt
 
 # Start the Unified Backend using Gunicorn
-# -w 4: 4 worker processes
-# -b 0.0.0.0:8000: Bind to port 8000 (Azure expects this)
+# -c gunicorn.conf.py: 4 workers (WEB_CONCURRENCY) bound to 0.0.0.0:8000 (Azure expects this)
 # unified_app:application: Module 'unified_app', object 'application'
-gunicorn -w 4 -b 0.0.0.0:8000 unified_app:application
+# Set PRELOAD_MODELS=minilm (and/or sentiment) to load the models once in the
+# master so the workers share one copy; see benchmarks/memory_report.py
+gunicorn -c gunicorn.conf.py unified_app:application
+
+# Alternative: the ASGI backend (asgi_app.py) serves the same routes with async
+# LLM calls, so in-flight interview turns don't each hold a worker thread
+# gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi_app:application